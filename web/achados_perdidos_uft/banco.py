@@ -0,0 +1,92 @@
+"""
+Configuração do SQLite para produção
+
+Com vários workers do gunicorn, o SQLite no modo padrão (journal em
+rollback, sem espera por bloqueio) devolve "database is locked" a cada
+escrita concorrente (visualizações, comentários, fila de tarefas). Cada
+conexão nova recebe aqui os PRAGMAs que resolvem isso:
+
+- ``journal_mode=WAL``: leitores não bloqueiam o escritor nem vice-versa
+- ``synchronous=NORMAL``: seguro em WAL, sem fsync a cada commit
+- ``mmap_size``, ``cache_size`` e ``temp_store``: menos leituras de disco
+
+A espera por bloqueio é o ``timeout`` do driver (em segundos) e as
+transações começam com ``BEGIN IMMEDIATE``: a transação que vai escrever
+reserva o banco logo no início e espera na fila, em vez de falhar com
+"database is locked" ao tentar promover uma leitura a escrita no meio.
+
+Todos os valores podem ser trocados por variáveis de ambiente
+(``SQLITE_JOURNAL_MODE``, ``SQLITE_SYNCHRONOUS``, ``SQLITE_MMAP_SIZE``,
+``SQLITE_CACHE_SIZE``, ``SQLITE_TEMP_STORE``, ``SQLITE_TIMEOUT`` e
+``SQLITE_TRANSACAO``). O comando ``verificar_banco`` mostra os valores em vigor.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# PRAGMA -> (variável de ambiente, valor padrão, valores aceitos ou None para inteiros)
+PRAGMAS = {
+    'journal_mode': ('SQLITE_JOURNAL_MODE', 'WAL', ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')),
+    'synchronous': ('SQLITE_SYNCHRONOUS', 'NORMAL', ('OFF', 'NORMAL', 'FULL', 'EXTRA')),
+    # 256 MB mapeados em memória
+    'mmap_size': ('SQLITE_MMAP_SIZE', 256 * 1024 * 1024, None),
+    # Negativo: em KiB (64 MB por conexão)
+    'cache_size': ('SQLITE_CACHE_SIZE', -64 * 1024, None),
+    'temp_store': ('SQLITE_TEMP_STORE', 'MEMORY', ('DEFAULT', 'FILE', 'MEMORY')),
+}
+
+TRANSACOES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def _valor(nome, ambiente, padrao, aceitos):
+    valor = ambiente.get(nome)
+    if valor is None:
+        return padrao
+    if aceitos is None:
+        try:
+            return int(valor)
+        except ValueError:
+            raise ImproperlyConfigured(f'{nome} deve ser um número inteiro (recebido: {valor!r})')
+    valor = valor.upper()
+    if valor not in aceitos:
+        raise ImproperlyConfigured(f'{nome} deve ser um de {", ".join(aceitos)} (recebido: {valor!r})')
+    return valor
+
+
+def pragmas(ambiente=None):
+    """{PRAGMA: valor} a aplicar em cada conexão"""
+    ambiente = os.environ if ambiente is None else ambiente
+    return {
+        pragma: _valor(nome, ambiente, padrao, aceitos)
+        for pragma, (nome, padrao, aceitos) in PRAGMAS.items()
+    }
+
+
+def opcoes_sqlite(ambiente=None):
+    """``OPTIONS`` do banco SQLite em ``settings.DATABASES``"""
+    ambiente = os.environ if ambiente is None else ambiente
+    try:
+        timeout = float(ambiente.get('SQLITE_TIMEOUT', 20))
+    except ValueError:
+        raise ImproperlyConfigured(f'SQLITE_TIMEOUT deve ser um número (recebido: {ambiente["SQLITE_TIMEOUT"]!r})')
+    return {
+        'init_command': ';'.join(f'PRAGMA {pragma}={valor}' for pragma, valor in pragmas(ambiente).items()),
+        'timeout': timeout,
+        'transaction_mode': _valor('SQLITE_TRANSACAO', ambiente, 'IMMEDIATE', TRANSACOES),
+    }
+
+
+def pragmas_em_vigor(conexao):
+    """
+    {PRAGMA: valor} lidos da conexão (inclui ``busy_timeout``, em ms)
+
+    O valor é None quando o PRAGMA não se aplica (ex.: ``mmap_size`` em banco em memória).
+    """
+    valores = {}
+    with conexao.cursor() as cursor:
+        for pragma in (*PRAGMAS, 'busy_timeout'):
+            cursor.execute(f'PRAGMA {pragma}')
+            linha = cursor.fetchone()
+            valores[pragma] = linha[0] if linha else None
+    return valores
@@ -0,0 +1,72 @@
+"""
+Configuração do cache a partir do ambiente
+
+``CACHE_BACKEND`` escolhe o backend e ``CACHE_LOCAL`` o ``LOCATION`` dele:
+
+- ``locmem`` (padrão): memória do processo; cada worker do gunicorn tem o seu
+- ``arquivo``: diretório compartilhado entre os workers (padrão: ``<BASE_DIR>/cache``)
+- ``redis``: servidor Redis (``CACHE_LOCAL`` é a URL; requer o pacote ``redis``)
+
+Com mais de um worker use ``arquivo`` ou ``redis``: as invalidações (páginas
+em cache, contadores, visualizações acumuladas) precisam ser vistas por todos.
+Num cache do processo, as entradas que só sairiam por invalidação (contadores,
+notificações e gerações) ganham o prazo ``CACHE_PRAZO_LOCAL`` (ver
+``prazo_invalidacao``), que limita o tempo em que um worker exibe dados
+invalidados por outro.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'arquivo': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+
+
+def configuracao_cache(base_dir, ambiente=None):
+    """``settings.CACHES`` conforme ``CACHE_BACKEND`` e ``CACHE_LOCAL``"""
+    ambiente = os.environ if ambiente is None else ambiente
+    nome = ambiente.get('CACHE_BACKEND', 'locmem').lower()
+    if nome not in BACKENDS:
+        raise ImproperlyConfigured(
+            f'CACHE_BACKEND deve ser um de {", ".join(BACKENDS)} (recebido: {nome!r})'
+        )
+    padroes = {
+        'locmem': 'achados-perdidos',
+        'arquivo': str(base_dir / 'cache'),
+        'redis': 'redis://127.0.0.1:6379/1',
+    }
+    return {
+        'default': {
+            'BACKEND': BACKENDS[nome],
+            'LOCATION': ambiente.get('CACHE_LOCAL', padroes[nome]),
+            # Entradas sem prazo (None) só saem por invalidação ou despejo
+            'OPTIONS': {'MAX_ENTRIES': 10000} if nome != 'redis' else {},
+        }
+    }
+
+
+def compartilhado():
+    """Indica se o cache padrão é visto por todos os processos (não é ``locmem``)"""
+    # Importados aqui: este módulo é carregado pelo próprio settings
+    from django.core.cache import caches
+    from django.core.cache.backends.locmem import LocMemCache
+
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def prazo_invalidacao():
+    """
+    Prazo (segundos) das entradas mantidas atualizadas por invalidação
+
+    Sem prazo (None) num cache compartilhado entre os processos; num cache do
+    processo (``locmem``), ``CACHE_PRAZO_LOCAL``.
+    """
+    from django.conf import settings
+
+    if compartilhado():
+        return None
+    return getattr(settings, 'CACHE_PRAZO_LOCAL', 30)
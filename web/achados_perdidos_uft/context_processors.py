@@ -2,24 +2,26 @@
 Context Processors para o sistema de Achados & Perdidos da UFT Palmas
 """
 
-from django.db.models import Count, Q
-from itens.models import ContatoItem
+from django.utils.functional import SimpleLazyObject
+
+from itens import notificacoes
+
 
 def notificacoes_usuario(request):
     """
     Adiciona contagem de notificações ao contexto global dos templates
-    """
-    context = {
-        'total_contatos_nao_lidos': 0
-    }
     
-    if request.user.is_authenticated:
-        # Contagem de contatos não lidos para itens do usuário
-        contatos_nao_lidos = ContatoItem.objects.filter(
-            item__usuario=request.user,
-            visualizado=False
-        ).count()
+    A contagem é preguiçosa (só é obtida se o template usar a variável) e
+    memorizada no request, valendo para todos os templates renderizados nele.
+    """
+    if not hasattr(request, '_total_contatos_nao_lidos'):
+        def contar():
+            if request.user.is_authenticated:
+                return notificacoes.contatos_nao_lidos(request.user.pk)
+            return 0
         
-        context['total_contatos_nao_lidos'] = contatos_nao_lidos
+        request._total_contatos_nao_lidos = SimpleLazyObject(contar)
     
-    return context
+    return {
+        'total_contatos_nao_lidos': request._total_contatos_nao_lidos
+    }
@@ -0,0 +1,33 @@
+"""
+Middleware que resolve as requisições ASGI com as views assíncronas
+
+O mesmo projeto atende WSGI (gunicorn, ``wsgi.py``) e ASGI (``asgi.py``).
+Sob WSGI as views são as síncronas de sempre; sob ASGI cada requisição é
+resolvida por ``ROOT_URLCONF_ASGI`` (padrão: achados_perdidos_uft.urls_asgi),
+em que as páginas de leitura são assíncronas e não passam pelas trocas de
+thread do ``sync_to_async`` a cada consulta.
+"""
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.decorators import sync_and_async_middleware
+
+
+def definir_urlconf(request):
+    """Faz as requisições ASGI serem resolvidas por ``ROOT_URLCONF_ASGI``"""
+    if isinstance(request, ASGIRequest):
+        request.urlconf = getattr(settings, 'ROOT_URLCONF_ASGI', 'achados_perdidos_uft.urls_asgi')
+
+
+@sync_and_async_middleware
+def RotasAsgiMiddleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            definir_urlconf(request)
+            return await get_response(request)
+    else:
+        def middleware(request):
+            definir_urlconf(request)
+            return get_response(request)
+    return middleware
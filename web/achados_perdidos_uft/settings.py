@@ -5,6 +5,9 @@ Configurações do Django para o Sistema de Achados & Perdidos da UFT Palmas
 import os
 from pathlib import Path
 
+from achados_perdidos_uft.banco import opcoes_sqlite
+from achados_perdidos_uft.caches import configuracao_cache
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -37,10 +40,14 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'achados_perdidos_uft.rotas_asgi.RotasAsgiMiddleware',
 ]
 
 ROOT_URLCONF = 'achados_perdidos_uft.urls'
 
+# URLs das requisições ASGI: páginas de leitura com views assíncronas (ver achados_perdidos_uft.rotas_asgi)
+ROOT_URLCONF_ASGI = 'achados_perdidos_uft.urls_asgi'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -65,9 +72,27 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # WAL, espera por bloqueio e BEGIN IMMEDIATE (variáveis SQLITE_*, ver banco.py)
+        'OPTIONS': opcoes_sqlite(),
     }
 }
 
+# Cache (variáveis CACHE_BACKEND e CACHE_LOCAL, ver caches.py). Com mais de um
+# worker (gunicorn/uvicorn) use CACHE_BACKEND=arquivo ou redis: no locmem cada
+# processo tem o seu cache e as invalidações feitas por um não chegam aos
+# outros, que exibem contadores, notificações e páginas desatualizados por até
+# CACHE_PRAZO_LOCAL segundos (e não acumulam visualizações em comum)
+CACHES = configuracao_cache(BASE_DIR)
+CACHE_PRAZO_LOCAL = int(os.environ.get('CACHE_PRAZO_LOCAL', 30))
+
+# Páginas inteiras em cache para visitantes anônimos (ver itens.cache_paginas):
+# prazo máximo, em segundos, e páginas da listagem sem filtros guardadas
+CACHE_PAGINAS_TEMPO = int(os.environ.get('CACHE_PAGINAS_TEMPO', 3600))
+CACHE_PAGINAS_LISTAGEM = int(os.environ.get('CACHE_PAGINAS_LISTAGEM', 3))
+
+# Ids guardados por combinação de filtros da listagem (ver itens.cache_filtros)
+CACHE_FILTROS_IDS = int(os.environ.get('CACHE_FILTROS_IDS', 1200))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -125,8 +150,65 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 # Configurações específicas do sistema
 SITE_NAME = 'Sistema de Achados & Perdidos UFT Palmas'
+# Endereço público do site, usado nos links dos e-mails
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
 ITEMS_PER_PAGE = 12
 
+# Intervalo (segundos) entre gravações em lote das visualizações acumuladas
+VISUALIZACOES_INTERVALO_DESCARGA = int(os.environ.get('VISUALIZACOES_INTERVALO_DESCARGA', 60))
+
+# Uploads de fotos: tamanho máximo do arquivo (bytes), máximo de pixels da
+# imagem decodificada e maior dimensão (px) após a recodificação
+UPLOAD_FOTO_TAMANHO_MAXIMO = int(os.environ.get('UPLOAD_FOTO_TAMANHO_MAXIMO', 5 * 1024 * 1024))
+UPLOAD_FOTO_PIXELS_MAXIMO = int(os.environ.get('UPLOAD_FOTO_PIXELS_MAXIMO', 50_000_000))
+UPLOAD_FOTO_DIMENSAO_MAXIMA = int(os.environ.get('UPLOAD_FOTO_DIMENSAO_MAXIMA', 2560))
+
+# O primeiro handler descarta arquivos acima do limite enquanto são recebidos
+FILE_UPLOAD_HANDLERS = [
+    'itens.uploads.LimiteTamanhoUpload',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Sincronização do aplicativo: atraso (segundos) antes de entregar uma
+# alteração e dias de retenção dos registros de itens removidos
+SINCRONIZACAO_MARGEM = int(os.environ.get('SINCRONIZACAO_MARGEM', 5))
+SINCRONIZACAO_RETENCAO_DIAS = int(os.environ.get('SINCRONIZACAO_RETENCAO_DIAS', 30))
+
+# Motor de correspondência perdido <-> encontrado: pontuação mínima (0 a 1)
+# para sugerir um par e janela (dias) entre as datas de ocorrência
+CORRESPONDENCIA_PONTUACAO_MINIMA = float(os.environ.get('CORRESPONDENCIA_PONTUACAO_MINIMA', 0.35))
+CORRESPONDENCIA_JANELA_DIAS = int(os.environ.get('CORRESPONDENCIA_JANELA_DIAS', 30))
+
+# Vizinhos mais próximos guardados por item no índice de itens similares
+SIMILARES_VIZINHOS = int(os.environ.get('SIMILARES_VIZINHOS', 8))
+
+# Expiração automática (comando expirar_itens): dias desde o cadastro até um
+# item ativo expirar, com exceções por 'categoria:tipo', 'categoria' ou 'tipo'
+EXPIRACAO_DIAS = int(os.environ.get('EXPIRACAO_DIAS', 90))
+EXPIRACAO_DIAS_POR_REGRA = {
+    'documentos': 180,
+    'chaves': 120,
+    'medicamentos': 30,
+}
+
+# Arquivamento (comando arquivar_itens): dias sem atualização até um item
+# resolvido, spam ou expirado sair da tabela principal
+ARQUIVAMENTO_DIAS = int(os.environ.get('ARQUIVAMENTO_DIAS', 180))
+
+# Eventos em tempo real (ver itens.eventos): backend de distribuição, Redis do
+# EventosRedis, intervalo (segundos) dos pings e duração máxima de cada conexão
+EVENTOS_BACKEND = os.environ.get('EVENTOS_BACKEND', 'itens.eventos.EventosLocais')
+EVENTOS_REDIS_URL = os.environ.get('EVENTOS_REDIS_URL', 'redis://127.0.0.1:6379/2')
+EVENTOS_INTERVALO_PING = int(os.environ.get('EVENTOS_INTERVALO_PING', 15))
+EVENTOS_DURACAO_MAXIMA = int(os.environ.get('EVENTOS_DURACAO_MAXIMA', 300))
+
+# Buscas salvas (ver itens.alertas): máximo por usuário; os alertas saem pelo
+# comando enviar_alertas e pela fila de tarefas, com os itens cadastrados há
+# mais de ALERTAS_MARGEM segundos
+BUSCAS_SALVAS_MAXIMO = int(os.environ.get('BUSCAS_SALVAS_MAXIMO', 20))
+ALERTAS_MARGEM = int(os.environ.get('ALERTAS_MARGEM', 60))
+
 # Logging configuration
 LOGGING = {
     'version': 1,
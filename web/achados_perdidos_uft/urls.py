@@ -26,6 +26,9 @@ urlpatterns = [
     
     # App de itens (achados e perdidos)
     path('itens/', include('itens.urls')),
+    
+    # API JSON versionada (aplicativo móvel)
+    path('api/v1/', include('itens.urls_api')),
 ]
 
 # Servir arquivos de media em desenvolvimento
@@ -0,0 +1,42 @@
+"""
+URLs usadas sob ASGI (ver achados_perdidos_uft.rotas_asgi)
+
+As mesmas rotas e nomes de achados_perdidos_uft.urls, com as páginas de
+leitura trocadas pelas views assíncronas (itens.views_assincronas).
+"""
+
+from django.urls import URLResolver, include, path
+
+from achados_perdidos_uft import urls
+from achados_perdidos_uft.views import PaginaInicialAssincrona
+from itens.views_assincronas import (
+    ListarItensAssincrona, DetalheItemAssincrona, itens_recentes_api_assincrona, eventos_assincrona
+)
+
+# Nome da rota -> view assíncrona
+VIEWS_RAIZ = {
+    'pagina-inicial': PaginaInicialAssincrona.as_view(),
+}
+
+VIEWS_ITENS = {
+    'listar-itens': ListarItensAssincrona.as_view(),
+    'detalhe-item': DetalheItemAssincrona.as_view(),
+    'itens-recentes-api': itens_recentes_api_assincrona,
+    'eventos': eventos_assincrona,
+}
+
+
+def trocar_views(padroes, views):
+    """Copia os padrões de URL trocando a view das rotas nomeadas em ``views``"""
+    return [
+        path(str(padrao.pattern), views[padrao.name], name=padrao.name)
+        if getattr(padrao, 'name', None) in views else padrao
+        for padrao in padroes
+    ]
+
+
+urlpatterns = []
+for padrao in trocar_views(urls.urlpatterns, VIEWS_RAIZ):
+    if isinstance(padrao, URLResolver) and padrao.app_name == 'itens':
+        padrao = path(str(padrao.pattern), include((trocar_views(padrao.url_patterns, VIEWS_ITENS), 'itens')))
+    urlpatterns.append(padrao)
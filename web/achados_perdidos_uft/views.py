@@ -11,23 +11,39 @@ from django.conf import settings
 from django.contrib import messages
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
+from django.template.response import TemplateResponse
+import asyncio
 import logging
 
+from itens.cache_paginas import PaginaEmCache
+
 logger = logging.getLogger('achados_perdidos_uft')
 
-class PaginaInicial(View):
+def contexto_pagina_inicial(totais, itens_recentes, categorias_populares):
+    """Contexto da página inicial (views síncrona e assíncrona)"""
+    return {
+        'total_perdidos': totais['total_perdidos'],
+        'total_encontrados': totais['total_encontrados'],
+        'total_resolvidos': totais['total_resolvidos'],
+        'total_usuarios': totais['total_usuarios'],
+        'itens_recentes': itens_recentes,
+        'categorias_populares': categorias_populares,
+        'campus': 'Campus Palmas',
+        'universidade': 'Universidade Federal do Tocantins',
+    }
+
+class PaginaInicial(PaginaEmCache, View):
     """
     Página inicial do sistema com estatísticas e itens recentes
+    (visitantes anônimos recebem a página do cache, ver itens.cache_paginas)
     """
     def get(self, request):
         # Importar aqui para evitar circular import
         from itens.models import Item
+        from itens import contadores
         
-        # Calcular estatísticas do sistema
-        total_perdidos = Item.objects.filter(tipo='perdido', status='ativo').count()
-        total_encontrados = Item.objects.filter(tipo='encontrado', status='ativo').count()
-        total_resolvidos = Item.objects.filter(status='resolvido').count()
-        total_usuarios = User.objects.filter(is_active=True).count()
+        # Estatísticas do sistema (contadores em cache, ver itens.contadores)
+        totais = contadores.totais()
         
         # Itens recentes para exibir na página inicial
         itens_recentes = Item.objects.filter(status='ativo').order_by('-data_postagem')[:6]
@@ -35,19 +51,31 @@ class PaginaInicial(View):
         # Estatísticas por categoria
         categorias_populares = Item.objects.filter(status='ativo').values('categoria').distinct()[:5]
         
-        contexto = {
-            'total_perdidos': total_perdidos,
-            'total_encontrados': total_encontrados,
-            'total_resolvidos': total_resolvidos,
-            'total_usuarios': total_usuarios,
-            'itens_recentes': itens_recentes,
-            'categorias_populares': categorias_populares,
-            'campus': 'Campus Palmas',
-            'universidade': 'Universidade Federal do Tocantins',
-        }
+        contexto = contexto_pagina_inicial(totais, itens_recentes, categorias_populares)
         
         return render(request, 'index.html', contexto)
 
+class PaginaInicialAssincrona(PaginaEmCache, View):
+    """
+    Versão assíncrona da página inicial (sob ASGI, ver itens.views_assincronas)
+    com contadores, itens recentes e categorias consultados juntos
+    """
+    async def get(self, request):
+        from itens.models import Item
+        from itens import contadores
+        from itens.views_assincronas import listar
+        
+        totais, itens_recentes, categorias_populares = await asyncio.gather(
+            contadores.atotais(),
+            listar(Item.objects.filter(status='ativo').order_by('-data_postagem')[:6]),
+            listar(Item.objects.filter(status='ativo').values('categoria').distinct()[:5]),
+        )
+        
+        contexto = contexto_pagina_inicial(totais, itens_recentes, categorias_populares)
+        
+        # Renderizada pelo handler, fora do loop de eventos
+        return TemplateResponse(request, 'index.html', contexto)
+
 class LoginView(View):
     """
     View para autenticação de usuários da UFT
@@ -111,7 +139,7 @@ class LogoutView(View):
         # Redireciona para a página inicial
         return redirect('pagina-inicial')
 
-class SobreView(View):
+class SobreView(PaginaEmCache, View):
     """
     Página com informações sobre o sistema e a UFT
     """
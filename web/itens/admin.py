@@ -6,7 +6,10 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils import timezone
-from itens.models import Item, Comentario, ContatoItem
+from itens.models import (
+    Item, Comentario, ContatoItem, ItemArquivado, SugestaoCorrespondencia, Tarefa, BuscaSalva
+)
+from itens import em_lote
 
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
@@ -97,31 +100,31 @@ class ItemAdmin(admin.ModelAdmin):
     
     def marcar_como_resolvido(self, request, queryset):
         """Ação para marcar itens como resolvidos"""
-        count = queryset.update(status='resolvido', data_resolucao=timezone.now())
+        count = em_lote.atualizar(queryset, status='resolvido', data_resolucao=timezone.now())
         self.message_user(request, f'{count} itens marcados como resolvidos.')
     marcar_como_resolvido.short_description = "Marcar como resolvido"
     
     def marcar_como_spam(self, request, queryset):
         """Ação para marcar itens como spam"""
-        count = queryset.update(status='spam')
+        count = em_lote.atualizar(queryset, status='spam')
         self.message_user(request, f'{count} itens marcados como spam.')
     marcar_como_spam.short_description = "Marcar como spam"
     
     def marcar_como_ativo(self, request, queryset):
         """Ação para marcar itens como ativos"""
-        count = queryset.update(status='ativo')
+        count = em_lote.atualizar(queryset, status='ativo')
         self.message_user(request, f'{count} itens marcados como ativos.')
     marcar_como_ativo.short_description = "Marcar como ativo"
     
     def marcar_como_prioritario(self, request, queryset):
         """Ação para marcar itens como prioritários"""
-        count = queryset.update(prioridade=True)
+        count = em_lote.atualizar(queryset, prioridade=True)
         self.message_user(request, f'{count} itens marcados como prioritários.')
     marcar_como_prioritario.short_description = "Marcar como prioritário"
     
     def remover_prioridade(self, request, queryset):
         """Ação para remover prioridade dos itens"""
-        count = queryset.update(prioridade=False)
+        count = em_lote.atualizar(queryset, prioridade=False)
         self.message_user(request, f'Prioridade removida de {count} itens.')
     remover_prioridade.short_description = "Remover prioridade"
 
@@ -165,9 +168,68 @@ class ContatoItemAdmin(admin.ModelAdmin):
     mensagem_truncada.short_description = "Mensagem"
 
 
+@admin.register(Tarefa)
+class TarefaAdmin(admin.ModelAdmin):
+    """
+    Configuração do admin para a fila de tarefas em segundo plano
+    """
+    list_display = ['nome', 'chave', 'status', 'tentativas', 'executar_apos', 'data_atualizacao']
+    list_filter = ['status', 'nome']
+    search_fields = ['nome', 'chave']
+    readonly_fields = ['data_criacao', 'data_atualizacao', 'erro']
+    actions = ['reenfileirar']
+    
+    def reenfileirar(self, request, queryset):
+        """Devolver tarefas à fila para nova execução"""
+        count = queryset.exclude(status='executando').update(
+            status='pendente', tentativas=0, executar_apos=timezone.now()
+        )
+        self.message_user(request, f'{count} tarefas devolvidas à fila.')
+    reenfileirar.short_description = "Devolver à fila"
+
+@admin.register(SugestaoCorrespondencia)
+class SugestaoCorrespondenciaAdmin(admin.ModelAdmin):
+    """
+    Configuração do admin para as sugestões do motor de correspondência
+    """
+    list_display = ['perdido', 'encontrado', 'pontuacao', 'data_calculo']
+    search_fields = ['perdido__titulo', 'encontrado__titulo']
+    list_select_related = ['perdido', 'encontrado']
+    raw_id_fields = ['perdido', 'encontrado']
+    readonly_fields = ['pontuacao', 'detalhes', 'data_calculo']
+
+@admin.register(ItemArquivado)
+class ItemArquivadoAdmin(admin.ModelAdmin):
+    """
+    Configuração do admin para os itens arquivados (somente consulta)
+    """
+    list_display = ['titulo', 'tipo', 'categoria', 'status', 'usuario', 'data_arquivamento']
+    list_filter = ['status', 'tipo', 'categoria']
+    search_fields = ['titulo', 'descricao', 'usuario__username']
+    list_select_related = ['usuario']
+    date_hierarchy = 'data_arquivamento'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(BuscaSalva)
+class BuscaSalvaAdmin(admin.ModelAdmin):
+    """
+    Configuração do admin para as buscas salvas com alerta
+    """
+    list_display = ['nome', 'usuario', 'busca', 'tipo', 'categoria', 'bloco', 'alerta', 'data_criacao']
+    list_filter = ['alerta', 'tipo', 'categoria']
+    search_fields = ['nome', 'busca', 'usuario__username']
+    list_select_related = ['usuario']
+    raw_id_fields = ['usuario']
+    readonly_fields = ['ultimo_item', 'data_criacao']
+
 # Fim das classes de administração
 
 # Customizações gerais do admin
 admin.site.site_header = "Sistema de Achados & Perdidos - UFT Palmas"
 admin.site.site_title = "Achados & Perdidos UFT"
-admin.site.index_title = "Painel de Administração"
\ No newline at end of file
+admin.site.index_title = "Painel de Administração"
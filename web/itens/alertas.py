@@ -0,0 +1,216 @@
+"""
+Alertas das buscas salvas: e-mail com os itens novos que atendem cada busca
+
+O comando ``enviar_alertas`` (ex.: a cada hora via cron) avalia de uma vez
+todas as buscas salvas com alerta, numa única passada pelos itens cadastrados
+desde a execução anterior, em vez de rodar a consulta da listagem uma vez por
+busca. Cada busca guarda o id do último item já avaliado (``ultimo_item``),
+que começa no maior id existente quando ela é salva.
+
+Itens cadastrados há menos de ``ALERTAS_MARGEM`` segundos ficam para a
+próxima execução, assim como os de id maior que eles: uma transação ainda
+não confirmada pode ter reservado um id menor que o de outra já visível, e o
+item dela seria pulado quando ``ultimo_item`` passasse desse id.
+
+Para não comparar cada item com todas as buscas, as buscas ficam num índice
+por (tipo, categoria, bloco, primeiro termo do texto), em que um campo vazio
+vale para qualquer valor. Cada item consulta só as chaves que ele pode
+atender: o custo por item não cresce com o número de buscas salvas.
+
+O texto segue a regra da busca da listagem no SQLite (ver itens.busca): os
+termos normalizados (itens.texto) precisam todos aparecer, cada um como
+prefixo de alguma palavra do título, da descrição ou do local.
+
+Cada usuário recebe um único e-mail por execução, com os itens de todas as
+suas buscas, enviado pela fila de tarefas (com novas tentativas em caso de
+falha). O enfileiramento e o avanço de ``ultimo_item`` são feitos na mesma
+transação: um item não é avisado duas vezes nem perdido. Se duas execuções
+se sobrepõem, só avisa cada busca a que ainda encontrar o ``ultimo_item``
+lido no início; a outra já a avisou.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import send_mail
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from itens import tarefas
+from itens.models import BuscaSalva, Item
+from itens.texto import documento_item, tokenizar
+
+# Itens listados por busca no e-mail (o restante fica no link da busca)
+ITENS_POR_BUSCA = 10
+
+
+def maximo_por_usuario():
+    return getattr(settings, 'BUSCAS_SALVAS_MAXIMO', 20)
+
+
+def margem():
+    return timedelta(seconds=getattr(settings, 'ALERTAS_MARGEM', 60))
+
+
+def prefixos(item):
+    """Todos os prefixos das palavras normalizadas do item"""
+    return {
+        palavra[:tamanho]
+        for palavra in tokenizar(documento_item(item))
+        for tamanho in range(1, len(palavra) + 1)
+    }
+
+
+class IndiceBuscas:
+    """Buscas salvas indexadas pelos filtros e pelo primeiro termo do texto"""
+
+    def __init__(self, buscas):
+        self.indice = defaultdict(list)
+        for busca in buscas:
+            busca.termos = tokenizar(busca.busca)
+            # Texto só com palavras vazias: a listagem também não devolve nada
+            if busca.busca and not busca.termos:
+                continue
+            chave = (
+                busca.tipo or None,
+                busca.categoria or None,
+                busca.bloco or None,
+                busca.termos[0] if busca.termos else None,
+            )
+            self.indice[chave].append(busca)
+
+    def correspondentes(self, item):
+        """Buscas atendidas pelo item (ainda não avaliado para elas)"""
+        termos_item = prefixos(item)
+        for tipo in (item.tipo, None):
+            for categoria in (item.categoria, None):
+                for bloco in (item.bloco, None):
+                    for termo in chain((None,), termos_item):
+                        for busca in self.indice.get((tipo, categoria, bloco, termo), ()):
+                            if (
+                                item.pk > busca.ultimo_item
+                                and (item.prioridade or not busca.prioridade)
+                                and all(t in termos_item for t in busca.termos[1:])
+                            ):
+                                yield busca
+
+
+def buscas_com_alerta():
+    return list(
+        BuscaSalva.objects.filter(alerta=True, usuario__is_active=True)
+        .exclude(usuario__email='')
+        .only('id', 'usuario_id', 'busca', 'tipo', 'categoria', 'bloco', 'prioridade', 'ultimo_item')
+    )
+
+
+def avaliar(lote=500, buscas=None):
+    """
+    Passa uma vez pelos itens novos e os distribui entre as buscas salvas
+
+    Retorna ({id do usuário: {id da busca: [ids dos itens]}}, id do último
+    item avaliado ou None se não houver buscas com alerta).
+    """
+    if buscas is None:
+        buscas = buscas_com_alerta()
+    if not buscas:
+        return {}, None
+    # Para na margem: os itens abaixo dela já estão todos confirmados, e os
+    # cadastrados durante a avaliação ficam para a próxima execução
+    fim = Item.objects.filter(
+        data_postagem__lte=timezone.now() - margem()
+    ).order_by('-pk').values_list('pk', flat=True).first() or 0
+    indice = IndiceBuscas(buscas)
+
+    encontrados = defaultdict(lambda: defaultdict(list))
+    novos = Item.objects.filter(
+        pk__gt=min(busca.ultimo_item for busca in buscas), pk__lte=fim, status='ativo'
+    ).only(
+        'id', 'titulo', 'descricao', 'local_especifico', 'tipo', 'categoria', 'bloco', 'prioridade', 'usuario_id'
+    ).order_by('pk')
+    for item in novos.iterator(chunk_size=lote):
+        for busca in indice.correspondentes(item):
+            # Os próprios itens do usuário não entram no alerta dele
+            if item.usuario_id != busca.usuario_id:
+                encontrados[busca.usuario_id][busca.pk].append(item.pk)
+    return {usuario_id: dict(por_busca) for usuario_id, por_busca in encontrados.items()}, fim
+
+
+def executar(lote=500):
+    """
+    Avalia as buscas salvas e enfileira um e-mail por usuário
+
+    Retorna {id do usuário: {id da busca: [ids dos itens]}}.
+    """
+    buscas = buscas_com_alerta()
+    encontrados, fim = avaliar(lote, buscas)
+    if fim is None:
+        return {}
+    lidas = {busca.pk: busca.ultimo_item for busca in buscas}
+    with transaction.atomic():
+        # Buscas que outra execução avançou enquanto esta avaliava já foram
+        # avisadas por ela. O select_for_update espera essa execução no
+        # PostgreSQL; no SQLite a transação já começa reservando a escrita.
+        atuais = BuscaSalva.objects.select_for_update().filter(alerta=True).values_list('pk', 'ultimo_item')
+        puladas = {pk for pk, ultimo_item in atuais if pk in lidas and ultimo_item != lidas[pk]}
+        for por_busca in encontrados.values():
+            for busca_id in puladas.intersection(por_busca):
+                del por_busca[busca_id]
+        encontrados = {usuario_id: por_busca for usuario_id, por_busca in encontrados.items() if por_busca}
+        for usuario_id, por_busca in encontrados.items():
+            tarefas.enfileirar(
+                'enviar_alerta_buscas',
+                usuario_id=usuario_id,
+                # Chaves de JSON são texto
+                itens_por_busca={str(busca_id): ids for busca_id, ids in por_busca.items()},
+            )
+        # Também as buscas sem alerta: ao religar, só os itens dali em diante contam
+        BuscaSalva.objects.filter(ultimo_item__lt=fim).exclude(pk__in=puladas).update(ultimo_item=fim)
+    return encontrados
+
+
+@tarefas.registrar('enviar_alerta_buscas')
+def tarefa_enviar_alerta(usuario_id, itens_por_busca):
+    """Tarefa em segundo plano: envia ao usuário o resumo dos itens novos das suas buscas"""
+    usuario = User.objects.filter(pk=usuario_id, is_active=True).first()
+    if usuario is None or not usuario.email:
+        return
+    buscas = BuscaSalva.objects.filter(usuario=usuario, alerta=True).in_bulk(
+        [int(busca_id) for busca_id in itens_por_busca]
+    )
+    todos = set(chain.from_iterable(itens_por_busca.values()))
+    # Itens resolvidos ou removidos desde a avaliação ficam de fora
+    itens = Item.objects.filter(pk__in=todos, status='ativo').in_bulk()
+
+    site_url = getattr(settings, 'SITE_URL', '').rstrip('/')
+    grupos, avisados = [], set()
+    for busca_id, ids in itens_por_busca.items():
+        busca = buscas.get(int(busca_id))
+        encontrados = [itens[pk] for pk in ids if pk in itens]
+        if busca is None or not encontrados:
+            continue
+        avisados.update(item.pk for item in encontrados)
+        grupos.append({
+            'busca': busca,
+            'itens': [
+                (item, site_url + reverse('itens:detalhe-item', kwargs={'pk': item.pk}))
+                for item in encontrados[:ITENS_POR_BUSCA]
+            ],
+            'restantes': max(len(encontrados) - ITENS_POR_BUSCA, 0),
+            'url': site_url + busca.get_absolute_url(),
+        })
+    if not grupos:
+        return
+
+    mensagem = render_to_string('itens/emails/alerta_buscas.txt', {
+        'usuario': usuario,
+        'grupos': grupos,
+        'site_name': settings.SITE_NAME,
+        'url_buscas': site_url + reverse('itens:buscas-salvas'),
+    })
+    assunto = f'{len(avisados)} item(ns) novo(s) para as suas buscas no {settings.SITE_NAME}'
+    send_mail(assunto, mensagem, None, [usuario.email])
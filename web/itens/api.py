@@ -0,0 +1,281 @@
+"""
+API JSON somente leitura (versão 1) usada pelo aplicativo móvel
+
+As respostas são compactas: códigos em vez de rótulos, datas em ISO 8601 e
+apenas os campos pedidos em ``campos`` (separados por vírgula). Todas as
+respostas levam ETag e Last-Modified derivados de ``data_atualizacao``
+(ou ``data_comentario``), então o cliente pode revalidar com
+If-None-Match/If-Modified-Since e receber um 304 sem corpo.
+
+Para manter uma cópia local, o cliente usa ``alteracoes/``: com o token da
+resposta anterior recebe só o que mudou desde então (ver itens.sincronizacao).
+
+A listagem também atende o endereço antigo ``/itens/api/itens/`` (rota
+``itens:itens-api``), com a mesma representação.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_GET
+
+from itens.forms import FormularioFiltro
+from itens.models import Item, Comentario
+from itens.paginacao import PaginadorCursor, CursorInvalido
+from itens.sincronizacao import alteracoes, TokenInvalido, TokenExpirado
+from itens.views import filtrar_itens
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 100
+
+STATUS_PUBLICOS = ['ativo', 'resolvido']
+
+
+def data_iso(valor):
+    return valor.isoformat() if valor else None
+
+
+# Campos disponíveis na representação do item (nome -> função que extrai o valor).
+# As visualizações ficam de fora: são gravadas em lote sem alterar
+# ``data_atualizacao`` (ver itens.visualizacoes), então não mudariam a ETag
+# nem o Last-Modified, e o cliente as receberia desatualizadas num 304.
+CAMPOS_ITEM = {
+    'id': lambda item: item.pk,
+    'titulo': lambda item: item.titulo,
+    'descricao': lambda item: item.descricao,
+    'tipo': lambda item: item.tipo,
+    'categoria': lambda item: item.categoria,
+    'bloco': lambda item: item.bloco,
+    'local_especifico': lambda item: item.local_especifico,
+    'status': lambda item: item.status,
+    'prioridade': lambda item: item.prioridade,
+    'foto': lambda item: item.foto.url if item.foto else None,
+    'usuario': lambda item: item.usuario.get_full_name() or item.usuario.username,
+    'data_ocorrencia': lambda item: data_iso(item.data_ocorrencia),
+    'data_postagem': lambda item: data_iso(item.data_postagem),
+    'data_atualizacao': lambda item: data_iso(item.data_atualizacao),
+    'data_resolucao': lambda item: data_iso(item.data_resolucao),
+}
+
+CAMPOS_LISTA = ['id', 'titulo', 'tipo', 'categoria', 'bloco', 'status', 'foto', 'data_postagem', 'data_atualizacao']
+CAMPOS_DETALHE = list(CAMPOS_ITEM)
+
+CAMPOS_COMENTARIO = {
+    'id': lambda comentario: comentario.pk,
+    'usuario': lambda comentario: comentario.usuario.get_full_name() or comentario.usuario.username,
+    'texto': lambda comentario: comentario.texto,
+    'data_comentario': lambda comentario: data_iso(comentario.data_comentario),
+}
+
+
+class ParametroInvalido(ValueError):
+    """Parâmetro da query string inválido (resposta 400)"""
+
+
+def resposta(dados, status=200):
+    """JsonResponse sem espaços entre os separadores"""
+    return JsonResponse(dados, status=status, json_dumps_params={'separators': (',', ':')})
+
+
+def resposta_erro(erro, status=400):
+    return resposta({'erro': erro}, status=status)
+
+
+def selecionar_campos(request, disponiveis, padrao):
+    """Lista de campos pedida em ``campos`` (ou a padrão)"""
+    campos = request.GET.get('campos')
+    if not campos:
+        return padrao
+    campos = [campo.strip() for campo in campos.split(',') if campo.strip()]
+    desconhecidos = [campo for campo in campos if campo not in disponiveis]
+    if desconhecidos:
+        raise ParametroInvalido(f'Campos desconhecidos: {", ".join(desconhecidos)}')
+    return campos
+
+
+def obter_limite(request):
+    """Tamanho da página pedido em ``limite``"""
+    try:
+        limite = int(request.GET.get('limite', LIMITE_PADRAO))
+    except ValueError:
+        raise ParametroInvalido('Limite inválido')
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise ParametroInvalido(f'O limite deve estar entre 1 e {LIMITE_MAXIMO}')
+    return limite
+
+
+def serializar(objeto, campos, disponiveis):
+    return {campo: disponiveis[campo](objeto) for campo in campos}
+
+
+def gerar_etag(request, *partes):
+    """ETag a partir do estado dos dados e da query string (outra representação, outra ETag)"""
+    texto = '|'.join(str(parte) for parte in (request.GET.urlencode(), *partes))
+    return hashlib.md5(texto.encode()).hexdigest()
+
+
+def itens_filtrados(request):
+    """Queryset da listagem com os filtros de FormularioFiltro validados"""
+    form = FormularioFiltro(request.GET)
+    if not form.is_valid():
+        raise ParametroInvalido(form.errors.get_json_data())
+    return filtrar_itens(form.cleaned_data)
+
+
+def estado_lista(request):
+    """
+    (última atualização, quantidade) dos itens filtrados, calculado uma vez por request
+
+    A quantidade entra na ETag para que itens que saem do filtro (ou são
+    removidos) também invalidem a listagem.
+    """
+    if not hasattr(request, '_estado_lista_api'):
+        try:
+            request._estado_lista_api = itens_filtrados(request).order_by().aggregate(
+                ultima=Max('data_atualizacao'), quantidade=Count('id')
+            )
+        except ParametroInvalido:
+            request._estado_lista_api = None
+    return request._estado_lista_api
+
+
+def etag_lista(request):
+    estado = estado_lista(request)
+    return estado and gerar_etag(request, estado['ultima'], estado['quantidade'])
+
+
+def ultima_modificacao_lista(request):
+    estado = estado_lista(request)
+    return estado and estado['ultima']
+
+
+@gzip_page
+@require_GET
+@cache_control(no_cache=True)
+@condition(etag_func=etag_lista, last_modified_func=ultima_modificacao_lista)
+def listar_itens(request):
+    """
+    Lista de itens com os filtros da listagem, paginada por cursor
+
+    Parâmetros: os de FormularioFiltro, ``campos``, ``cursor``, ``limite``
+    (até 100) e ``total=1`` para incluir a contagem.
+    """
+    try:
+        campos = selecionar_campos(request, CAMPOS_ITEM, CAMPOS_LISTA)
+        paginador = PaginadorCursor(
+            itens_filtrados(request), obter_limite(request),
+            contar=bool(request.GET.get('total'))
+        )
+        pagina = paginador.pagina(request.GET.get('cursor'))
+    except (ParametroInvalido, CursorInvalido) as erro:
+        return resposta_erro(erro.args[0])
+
+    dados = {
+        'itens': [serializar(item, campos, CAMPOS_ITEM) for item in pagina],
+        'cursor_proximo': pagina.cursor_proximo,
+        'cursor_anterior': pagina.cursor_anterior,
+    }
+    if pagina.total is not None:
+        dados['total'] = pagina.total
+    return resposta(dados)
+
+
+def ultima_modificacao_item(request, pk):
+    """Data de atualização do item público, consultada uma vez por request"""
+    if not hasattr(request, '_estado_item_api'):
+        request._estado_item_api = Item.objects.filter(pk=pk, status__in=STATUS_PUBLICOS).values_list(
+            'data_atualizacao', flat=True
+        ).first()
+    return request._estado_item_api
+
+
+def etag_item(request, pk):
+    ultima = ultima_modificacao_item(request, pk)
+    return ultima and gerar_etag(request, pk, ultima)
+
+
+@gzip_page
+@require_GET
+@cache_control(no_cache=True)
+@condition(etag_func=etag_item, last_modified_func=ultima_modificacao_item)
+def detalhe_item(request, pk):
+    """Detalhe de um item público (dados de contato ficam de fora)"""
+    try:
+        campos = selecionar_campos(request, CAMPOS_ITEM, CAMPOS_DETALHE)
+    except ParametroInvalido as erro:
+        return resposta_erro(erro.args[0])
+
+    item = Item.objects.filter(pk=pk, status__in=STATUS_PUBLICOS).select_related('usuario').first()
+    if item is None:
+        return resposta_erro('Item não encontrado', status=404)
+
+    dados = serializar(item, campos, CAMPOS_ITEM)
+    dados['comentarios'] = reverse('api-v1:comentarios-item', kwargs={'pk': item.pk})
+    return resposta(dados)
+
+
+def estado_comentarios(request, pk):
+    if not hasattr(request, '_estado_comentarios_api'):
+        request._estado_comentarios_api = Comentario.objects.filter(
+            item_id=pk, item__status__in=STATUS_PUBLICOS
+        ).order_by().aggregate(ultima=Max('data_comentario'), quantidade=Count('id'))
+    return request._estado_comentarios_api
+
+
+def etag_comentarios(request, pk):
+    estado = estado_comentarios(request, pk)
+    return gerar_etag(request, pk, estado['ultima'], estado['quantidade'])
+
+
+def ultima_modificacao_comentarios(request, pk):
+    return estado_comentarios(request, pk)['ultima']
+
+
+@gzip_page
+@require_GET
+@cache_control(no_cache=True)
+@condition(etag_func=etag_comentarios, last_modified_func=ultima_modificacao_comentarios)
+def comentarios_item(request, pk):
+    """Comentários de um item público, do mais antigo para o mais recente"""
+    try:
+        campos = selecionar_campos(request, CAMPOS_COMENTARIO, list(CAMPOS_COMENTARIO))
+    except ParametroInvalido as erro:
+        return resposta_erro(erro.args[0])
+
+    if not Item.objects.filter(pk=pk, status__in=STATUS_PUBLICOS).exists():
+        return resposta_erro('Item não encontrado', status=404)
+
+    comentarios = Comentario.objects.filter(item_id=pk).select_related('usuario')
+    return resposta({
+        'comentarios': [serializar(comentario, campos, CAMPOS_COMENTARIO) for comentario in comentarios],
+    })
+
+
+@gzip_page
+@require_GET
+@cache_control(no_cache=True)
+def alteracoes_itens(request):
+    """
+    Alterações nos itens desde ``token`` (sem token: sincronização completa)
+
+    Parâmetros: ``token``, ``limite`` (até 100) e ``campos``. Enquanto ``mais``
+    for verdadeiro, o cliente deve chamar de novo com o token recebido.
+    """
+    try:
+        campos = selecionar_campos(request, CAMPOS_ITEM, CAMPOS_DETALHE)
+        resultado = alteracoes(request.GET.get('token'), obter_limite(request))
+    except (ParametroInvalido, TokenInvalido) as erro:
+        return resposta_erro(erro.args[0])
+    except TokenExpirado as erro:
+        return resposta_erro(erro.args[0], status=410)
+
+    return resposta({
+        'alterados': [serializar(item, campos, CAMPOS_ITEM) for item in resultado['alterados']],
+        'removidos': resultado['removidos'],
+        'token': resultado['token'],
+        'mais': resultado['mais'],
+    })
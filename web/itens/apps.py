@@ -11,6 +11,8 @@ class ItensConfig(AppConfig):
     def ready(self):
         """
         Método executado quando o app está pronto
-        Pode ser usado para registrar signals, etc.
+        Registra os signals e as tarefas em segundo plano do app
         """
-        pass
\ No newline at end of file
+        from itens import signals  # noqa: F401
+        # Módulos com tarefas que o processar_tarefas não importaria sozinho
+        from itens import alertas, expiracao  # noqa: F401
\ No newline at end of file
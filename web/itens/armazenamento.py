@@ -0,0 +1,64 @@
+"""
+Storage das fotos dos itens endereçado pelo conteúdo
+
+Cada foto é gravada como ``itens/fotos/<ab>/<sha256>.<ext>``, em que ``ab``
+são os dois primeiros caracteres do hash. A mesma foto enviada de novo (ao
+editar o item, ou no item perdido e no encontrado) resolve para o mesmo nome e
+não é gravada outra vez: os itens passam a compartilhar o arquivo.
+
+Como um arquivo pode ser usado por vários itens, ele só é apagado quando o
+último item que o referencia é excluído ou troca de foto (ver
+itens.imagens.liberar_foto). Arquivos que já estavam no disco sem referência
+são apagados pelo comando ``limpar_fotos_orfas``.
+"""
+
+import hashlib
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+
+DIRETORIO = 'itens/fotos'
+
+
+def hash_conteudo(conteudo):
+    """SHA-256 (hexadecimal) do arquivo, lido em blocos"""
+    resumo = hashlib.sha256()
+    for bloco in conteudo.chunks():
+        resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+class ArmazenamentoConteudo(FileSystemStorage):
+    """
+    FileSystemStorage que nomeia pelo hash do conteúdo os arquivos gravados em ``diretorio``
+
+    Os demais caminhos (como as rendições, gravadas no mesmo storage) mantêm
+    o nome pedido.
+    """
+    def __init__(self, diretorio=DIRETORIO, **kwargs):
+        super().__init__(**kwargs)
+        self.diretorio = diretorio.rstrip('/')
+
+    def enderecado(self, nome):
+        return nome.replace('\\', '/').startswith(self.diretorio + '/')
+
+    def nome_por_conteudo(self, nome, conteudo):
+        resumo = hash_conteudo(conteudo)
+        extensao = posixpath.splitext(nome)[1].lower()
+        return f'{self.diretorio}/{resumo[:2]}/{resumo}{extensao}'
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not self.enderecado(name):
+            return super().save(name, content, max_length)
+        nome = self.nome_por_conteudo(name, content)
+        if self.exists(nome):
+            # Mesmo hash, mesmo conteúdo: reaproveita o arquivo existente
+            return nome
+        return super().save(nome, content, max_length)
+
+
+def armazenamento_fotos():
+    """Storage do campo Item.foto (callable: a migração guarda o caminho, não a instância)"""
+    return ArmazenamentoConteudo(DIRETORIO)
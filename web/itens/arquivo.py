@@ -0,0 +1,83 @@
+"""
+Arquivamento dos itens que saíram de circulação
+
+Itens resolvidos, spam ou expirados sem atualização há mais de
+``ARQUIVAMENTO_DIAS`` dias são movidos, com comentários e contatos, para as
+tabelas ItemArquivado, ComentarioArquivado e ContatoArquivado. A tabela
+principal (e os índices dela) fica só com o que ainda é consultado no dia a
+dia; o item arquivado continua acessível pelo link permanente e na aba
+"Arquivados" de "Meus itens".
+
+Cada lote é copiado e apagado da tabela principal na mesma transação: se o
+comando ``arquivar_itens`` for interrompido, os lotes concluídos ficam
+arquivados e a próxima execução continua dos itens que restaram.
+
+Durante o arquivamento os contadores do painel não são descontados (um item
+resolvido e arquivado continua contando como resolvido). Os demais efeitos
+da exclusão seguem normalmente: o item sai da busca e das sugestões e a
+sincronização do aplicativo o informa como removido.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from itens import em_lote
+from itens.models import (
+    Item, Comentario, ContatoItem, ItemArquivado, ComentarioArquivado, ContatoArquivado
+)
+
+STATUS_ARQUIVAVEIS = ('resolvido', 'spam', 'expirado')
+
+def dias():
+    return getattr(settings, 'ARQUIVAMENTO_DIAS', 180)
+
+
+def candidatos(agora=None):
+    limite = (agora or timezone.now()) - timedelta(days=dias())
+    return Item.objects.filter(status__in=STATUS_ARQUIVAVEIS, data_atualizacao__lt=limite)
+
+
+def copiar(objeto, modelo, **extras):
+    """Instância de ``modelo`` com os mesmos valores (e o mesmo id) de ``objeto``"""
+    valores = {campo.attname: getattr(objeto, campo.attname) for campo in objeto._meta.concrete_fields}
+    return modelo(**valores, **extras)
+
+
+def arquivar_lote(ids):
+    """Move os itens (ainda arquiváveis) para as tabelas de arquivo; retorna quantos"""
+    agora = timezone.now()
+    with transaction.atomic():
+        itens = list(Item.objects.filter(pk__in=ids, status__in=STATUS_ARQUIVAVEIS))
+        if not itens:
+            return 0
+        ids = [item.pk for item in itens]
+        ItemArquivado.objects.bulk_create([
+            copiar(item, ItemArquivado, data_arquivamento=agora) for item in itens
+        ])
+        ComentarioArquivado.objects.bulk_create([
+            copiar(comentario, ComentarioArquivado)
+            for comentario in Comentario.objects.filter(item_id__in=ids)
+        ])
+        ContatoArquivado.objects.bulk_create([
+            copiar(contato, ContatoArquivado)
+            for contato in ContatoItem.objects.filter(item_id__in=ids)
+        ])
+        em_lote.excluir(Item.objects.filter(pk__in=ids), descontar=False)
+    return len(itens)
+
+
+def arquivar(lote=200, pausa=0, agora=None):
+    """Arquiva todos os candidatos, ``lote`` por transação; retorna o total arquivado"""
+    total = 0
+    consulta = candidatos(agora)
+    while True:
+        ids = list(consulta.order_by('pk').values_list('pk', flat=True)[:lote])
+        if not ids:
+            return total
+        total += arquivar_lote(ids)
+        if pausa:
+            time.sleep(pausa)
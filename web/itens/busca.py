@@ -0,0 +1,216 @@
+"""
+Motor de busca textual para o modelo Item
+
+O índice é mantido em uma tabela auxiliar (FTS5 no SQLite, tsvector/GIN no
+PostgreSQL) e sincronizado pelos signals de save/delete do Item. O texto é
+normalizado em Python (sem acentos e reduzido ao radical), por isso a busca é
+insensível a acentos e a variações de plural/gênero em qualquer backend.
+
+A tabela auxiliar é mapeada por modelos não gerenciados (IndiceBuscaSQLite e
+IndiceBuscaPostgres), ligados ao Item por uma relação um-para-um: a busca
+filtra e anota a relevância através dessa relação, numa junção direta.
+
+O backend pode ser trocado pela configuração ``BUSCA_BACKEND`` (caminho
+pontuado para a classe). Sem ela, o backend é escolhido pelo banco em uso.
+"""
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Func, Lookup, Q, TextField, Value
+from django.utils.module_loading import import_string
+
+from itens.texto import tokenizar
+
+TABELA_BUSCA = 'itens_item_busca'
+
+# Pesos dos campos na relevância: título, descrição, local específico
+PESOS_CAMPOS = (10.0, 3.0, 1.0)
+
+
+class CampoBusca(TextField):
+    """Documento da tabela de busca; aceita o lookup ``corresponde``"""
+
+
+@CampoBusca.register_lookup
+class Corresponde(Lookup):
+    """Documento atende à consulta de texto completo (já montada pelo backend)"""
+    lookup_name = 'corresponde'
+
+    def as_sql(self, compiler, connection):
+        raise NotImplementedError('Busca de texto completo sem suporte neste banco')
+
+    def as_sqlite(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} @@ to_tsquery('simple', {rhs})", [*lhs_params, *rhs_params]
+
+
+def normalizar_campos(item):
+    """Retorna os campos pesquisáveis do item já normalizados"""
+    return [
+        ' '.join(tokenizar(item.titulo)),
+        ' '.join(tokenizar(item.descricao)),
+        ' '.join(tokenizar(item.local_especifico)),
+    ]
+
+
+class BuscaBase:
+    """
+    Interface comum dos backends de busca
+
+    ``conexao`` é a conexão usada na manutenção do índice (padrão: a do
+    banco ``default``; nas migrações, a do ``schema_editor``).
+    """
+    def __init__(self, conexao=None):
+        self.conexao = conexao or connection
+
+    def indexar(self, item):
+        """Insere ou atualiza o item no índice"""
+
+    def remover(self, item_id):
+        """Remove o item do índice"""
+
+    def limpar(self):
+        """Remove todos os itens do índice"""
+
+    def filtrar(self, queryset, termo):
+        """
+        Filtra o queryset pelo termo de busca, anotando ``relevancia``
+        (quanto maior, mais relevante)
+        """
+        raise NotImplementedError
+
+    def reconstruir(self, queryset=None, lote=500):
+        """Reconstrói o índice inteiro e retorna o número de itens indexados"""
+        from itens.models import Item
+
+        queryset = queryset if queryset is not None else Item.objects.all()
+        self.limpar()
+        total = 0
+        for item in queryset.only('id', 'titulo', 'descricao', 'local_especifico').iterator(chunk_size=lote):
+            self.indexar(item)
+            total += 1
+        return total
+
+
+class BuscaSimples(BuscaBase):
+    """
+    Busca por ``icontains`` sem índice auxiliar (bancos sem suporte a texto completo)
+    """
+    def filtrar(self, queryset, termo):
+        return queryset.filter(
+            Q(titulo__icontains=termo) |
+            Q(descricao__icontains=termo) |
+            Q(local_especifico__icontains=termo)
+        ).annotate(relevancia=Value(0.0, output_field=FloatField()))
+
+
+class BuscaSQLite(BuscaBase):
+    """
+    Busca com tabela virtual FTS5 do SQLite, ordenada por bm25
+    """
+    def indexar(self, item):
+        with self.conexao.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABELA_BUSCA} WHERE rowid = %s', [item.pk])
+            cursor.execute(
+                f'INSERT INTO {TABELA_BUSCA} (rowid, titulo, descricao, local_especifico) '
+                'VALUES (%s, %s, %s, %s)',
+                [item.pk, *normalizar_campos(item)]
+            )
+
+    def remover(self, item_id):
+        with self.conexao.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABELA_BUSCA} WHERE rowid = %s', [item_id])
+
+    def limpar(self):
+        with self.conexao.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABELA_BUSCA}')
+
+    @staticmethod
+    def montar_consulta(termos):
+        """Cada termo vira um prefixo entre aspas, combinados com AND"""
+        return ' '.join(f'"{termo}"*' for termo in termos)
+
+    def filtrar(self, queryset, termo):
+        termos = tokenizar(termo)
+        if not termos:
+            return queryset.none()
+
+        # Junção direta com a tabela FTS5: a expressão MATCH é avaliada uma
+        # única vez. Uma subconsulta correlacionada reavaliaria o MATCH para
+        # cada linha, o que fica quadrático em buscas com muitos resultados.
+        return queryset.filter(
+            indice_sqlite__documento__corresponde=self.montar_consulta(termos)
+        ).annotate(
+            relevancia=-Func(
+                F('indice_sqlite__documento'), *[Value(peso) for peso in PESOS_CAMPOS],
+                function='bm25', output_field=FloatField()
+            )
+        )
+
+
+class BuscaPostgres(BuscaBase):
+    """
+    Busca com coluna tsvector e índice GIN no PostgreSQL, ordenada por ts_rank
+    """
+    def indexar(self, item):
+        titulo, descricao, local = normalizar_campos(item)
+        with self.conexao.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {TABELA_BUSCA} (item_id, documento) VALUES (%s, '
+                "setweight(to_tsvector('simple', %s), 'A') || "
+                "setweight(to_tsvector('simple', %s), 'B') || "
+                "setweight(to_tsvector('simple', %s), 'C')) "
+                'ON CONFLICT (item_id) DO UPDATE SET documento = EXCLUDED.documento',
+                [item.pk, titulo, descricao, local]
+            )
+
+    def remover(self, item_id):
+        with self.conexao.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABELA_BUSCA} WHERE item_id = %s', [item_id])
+
+    def limpar(self):
+        with self.conexao.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABELA_BUSCA}')
+
+    @staticmethod
+    def montar_consulta(termos):
+        """Cada termo vira um prefixo, combinados com AND"""
+        return ' & '.join(f'{termo}:*' for termo in termos)
+
+    def filtrar(self, queryset, termo):
+        termos = tokenizar(termo)
+        if not termos:
+            return queryset.none()
+
+        consulta = self.montar_consulta(termos)
+        # Junção direta, como no SQLite: sem subconsulta correlacionada por linha
+        return queryset.filter(
+            indice_postgres__documento__corresponde=consulta
+        ).annotate(
+            relevancia=Func(
+                F('indice_postgres__documento'),
+                Func(Value('simple'), Value(consulta), function='to_tsquery'),
+                function='ts_rank', output_field=FloatField()
+            )
+        )
+
+
+BACKENDS_POR_BANCO = {
+    'sqlite': BuscaSQLite,
+    'postgresql': BuscaPostgres,
+}
+
+
+def obter_backend(conexao=None):
+    """Retorna a instância do backend de busca configurado (para a conexão dada)"""
+    conexao = conexao or connection
+    caminho = getattr(settings, 'BUSCA_BACKEND', None)
+    if caminho:
+        return import_string(caminho)(conexao)
+    return BACKENDS_POR_BANCO.get(conexao.vendor, BuscaSimples)(conexao)
@@ -0,0 +1,152 @@
+"""
+Listas de ids da listagem em cache, por combinação de filtros
+
+Muitos usuários repetem as mesmas combinações de filtros (ex.: tipo=perdido
+e categoria=documentos). Para cada combinação normalizada (campos de
+FormularioFiltro em ordem fixa, sem vazios nem parâmetros desconhecidos) e
+ordenação permitida, a lista ordenada de ids fica no cache; cada página é
+montada com uma única consulta ``id__in``.
+
+As entradas levam na chave uma geração trocada a cada escrita em itens
+(signals do Item e ``em_lote.atualizar``), então uma lista nunca
+fica desatualizada. A ordenação por visualizações fica de fora: as
+visualizações são gravadas em lote sem passar pelos signals (ver
+itens.visualizacoes).
+
+Só os primeiros ``CACHE_FILTROS_IDS`` ids são guardados; páginas além deles
+consultam o banco como antes.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from achados_perdidos_uft.caches import prazo_invalidacao
+from itens.models import Item
+
+PREFIXO = 'itens:filtros'
+CHAVE_GERACAO = f'{PREFIXO}:geracao'
+
+# Campos de FormularioFiltro aplicados por filtrar_itens
+CAMPOS = ('busca', 'tipo', 'categoria', 'bloco', 'status', 'prioridade', 'data_inicio', 'data_fim')
+
+ORDENACOES = {'-data_postagem', 'data_postagem', 'titulo', '-relevancia'}
+
+# Entradas de gerações antigas não são lidas de novo; o prazo só evita que se acumulem
+TEMPO = 24 * 3600
+
+
+def limite_ids():
+    return getattr(settings, 'CACHE_FILTROS_IDS', 1200)
+
+
+def geracao():
+    valor = cache.get(CHAVE_GERACAO)
+    if valor is None:
+        cache.add(CHAVE_GERACAO, uuid.uuid4().hex, prazo_invalidacao())
+        valor = cache.get(CHAVE_GERACAO)
+    return valor
+
+
+async def ageracao():
+    valor = await cache.aget(CHAVE_GERACAO)
+    if valor is None:
+        await cache.aadd(CHAVE_GERACAO, uuid.uuid4().hex, prazo_invalidacao())
+        valor = await cache.aget(CHAVE_GERACAO)
+    return valor
+
+
+def invalidar():
+    """Troca a geração agora e após o commit (ver cache_paginas.invalidar)"""
+    def trocar():
+        cache.set(CHAVE_GERACAO, uuid.uuid4().hex, prazo_invalidacao())
+    trocar()
+    transaction.on_commit(trocar)
+
+
+def _chave(parametros, ordenacao, geracao_atual):
+    # Valores exatamente como filtrar_itens os usa: só os vazios (ignorados por ela) saem
+    filtros = '&'.join(f'{campo}={parametros.get(campo)}' for campo in CAMPOS if parametros.get(campo))
+    texto = f'{filtros}|{",".join(ordenacao)}|{geracao_atual}'
+    return f'{PREFIXO}:{hashlib.md5(texto.encode()).hexdigest()}'
+
+
+def chave(parametros, ordenacao):
+    """Chave da combinação de filtros; None se a ordenação não for cacheável"""
+    if ordenacao[0] not in ORDENACOES:
+        return None
+    return _chave(parametros, ordenacao, geracao())
+
+
+async def achave(parametros, ordenacao):
+    """Versão assíncrona de ``chave``"""
+    if ordenacao[0] not in ORDENACOES:
+        return None
+    return _chave(parametros, ordenacao, await ageracao())
+
+
+class ListaIds:
+    """
+    Sequência para o Paginator: total e ids vêm do cache, os itens de cada
+    página são buscados com ``id__in`` na ordem da lista
+    """
+    model = Item
+    ordered = True
+
+    def __init__(self, queryset, chave):
+        self.queryset = queryset
+        self.chave = chave
+        self._dados = None
+
+    def dados(self):
+        """(total, ids) do cache, ou da consulta de ids (e da contagem, se passar do limite)"""
+        if self._dados is None:
+            dados = cache.get(self.chave)
+            if dados is None:
+                limite = limite_ids()
+                ids = list(self.queryset.values_list('pk', flat=True)[:limite])
+                total = len(ids) if len(ids) < limite else self.queryset.count()
+                dados = (total, ids)
+                cache.set(self.chave, dados, TEMPO)
+            self._dados = dados
+        return self._dados
+
+    async def adados(self):
+        """Versão assíncrona de ``dados``"""
+        if self._dados is None:
+            dados = await cache.aget(self.chave)
+            if dados is None:
+                limite = limite_ids()
+                ids = [pk async for pk in self.queryset.values_list('pk', flat=True)[:limite]]
+                total = len(ids) if len(ids) < limite else await self.queryset.acount()
+                dados = (total, ids)
+                await cache.aset(self.chave, dados, TEMPO)
+            self._dados = dados
+        return self._dados
+
+    async def afatia(self, inicio, fim):
+        """Itens de ``[inicio:fim]`` (versão assíncrona do fatiamento)"""
+        total, ids = await self.adados()
+        inicio, fim, _ = slice(inicio, fim).indices(total)
+        if fim > len(ids):
+            return [item async for item in self.queryset[inicio:fim]]
+        fatia = ids[inicio:fim]
+        itens = await Item.objects.select_related('usuario').ain_bulk(fatia)
+        return [itens[pk] for pk in fatia if pk in itens]
+
+    def __len__(self):
+        return self.dados()[0]
+
+    def __getitem__(self, indice):
+        if not isinstance(indice, slice):
+            return self[indice:indice + 1][0]
+        total, ids = self.dados()
+        inicio, fim, _ = indice.indices(total)
+        if fim > len(ids):
+            return list(self.queryset[inicio:fim])
+        fatia = ids[inicio:fim]
+        itens = Item.objects.select_related('usuario').in_bulk(fatia)
+        return [itens[pk] for pk in fatia if pk in itens]
@@ -0,0 +1,183 @@
+"""
+Páginas inteiras em cache para visitantes anônimos
+
+A página inicial, a página "Sobre", as primeiras páginas da listagem sem
+filtros e o detalhe dos itens são guardados já renderizados, com a query
+string normalizada (parâmetros ordenados, vazios descartados) na chave.
+
+A invalidação é por geração, sem depender de prazos curtos: a chave de cada
+página inclui o valor atual de um contador de geração, e trocar o valor torna
+todas as páginas antigas inalcançáveis (saem do cache por despejo ou pelo
+prazo ``CACHE_PAGINAS_TEMPO``). Há duas gerações:
+
+- a global, trocada quando qualquer item muda (signals do Item, ações em massa
+  via ``em_lote.atualizar``, cadastro de usuários e o recálculo das sugestões
+  e dos itens similares), pois listagens, contadores e listas de
+  similares podem exibir qualquer item;
+- a de cada item, trocada pelos comentários dele, que só aparecem no detalhe.
+
+O prazo serve apenas de teto para as datas relativas ("há 2 horas") e para o
+número de visualizações exibido, que não invalidam as páginas. Num cache do
+processo (``locmem``) as gerações também expiram, após ``CACHE_PRAZO_LOCAL``
+segundos (ver achados_perdidos_uft.caches.prazo_invalidacao).
+
+Não são guardadas respostas de usuários logados, com mensagens pendentes
+(ex.: "Logout realizado"), com token CSRF ou que gravam cookies.
+
+O mixin serve tanto as views síncronas quanto as assíncronas (usadas sob
+ASGI, ver achados_perdidos_uft.rotas_asgi).
+"""
+
+import hashlib
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+from achados_perdidos_uft.caches import prazo_invalidacao
+
+PREFIXO = 'itens:paginas'
+CHAVE_GERACAO = f'{PREFIXO}:geracao'
+
+
+def chave_geracao_item(item_id):
+    return f'{CHAVE_GERACAO}:{item_id}'
+
+
+def tempo():
+    return getattr(settings, 'CACHE_PAGINAS_TEMPO', 3600)
+
+
+def geracao(chave=CHAVE_GERACAO):
+    """Valor atual da geração (criado na primeira leitura ou após despejo)"""
+    valor = cache.get(chave)
+    if valor is None:
+        cache.add(chave, uuid.uuid4().hex, prazo_invalidacao())
+        valor = cache.get(chave)
+    return valor
+
+
+def _trocar(chaves):
+    cache.set_many({chave: uuid.uuid4().hex for chave in chaves}, prazo_invalidacao())
+
+
+def invalidar(item_id=None):
+    """
+    Troca a geração global (ou só a do item) agora e após o commit
+
+    A segunda troca descarta páginas renderizadas por outra requisição entre a
+    alteração e o commit, ainda com os dados antigos.
+    """
+    chaves = [CHAVE_GERACAO if item_id is None else chave_geracao_item(item_id)]
+    _trocar(chaves)
+    transaction.on_commit(lambda: _trocar(chaves))
+
+
+def query_normalizada(request):
+    """Query string com parâmetros ordenados e sem valores vazios"""
+    return '&'.join(
+        f'{chave}={valor}'
+        for chave, valores in sorted(request.GET.lists())
+        for valor in valores
+        if valor
+    )
+
+
+def chave_pagina(request, itens=()):
+    """Chave da página: caminho, query normalizada e gerações de que depende"""
+    partes = [request.path, query_normalizada(request), geracao()]
+    partes += [geracao(chave_geracao_item(item_id)) for item_id in itens]
+    return f'{PREFIXO}:{hashlib.md5("|".join(partes).encode()).hexdigest()}'
+
+
+class PaginaEmCache:
+    """
+    Mixin de view: responde o GET de visitantes anônimos a partir do cache
+
+    As views podem restringir as requisições guardadas (``pagina_cacheavel``),
+    declarar os itens exibidos (``itens_da_pagina``) e agir nos acertos
+    (``ao_servir_do_cache``), por exemplo para contar visualizações.
+    """
+
+    def pagina_cacheavel(self):
+        return True
+
+    def itens_da_pagina(self):
+        return ()
+
+    def ao_servir_do_cache(self):
+        pass
+
+    def usa_cache(self, request):
+        """Indica se a requisição pode ser respondida pelo cache"""
+        return not (
+            request.method != 'GET'
+            or request.user.is_authenticated
+            # Contar as mensagens não as marca como lidas
+            or len(messages.get_messages(request))
+            or not self.pagina_cacheavel()
+        )
+
+    def consultar_cache(self, request):
+        """(chave, página guardada ou None); chave None se a requisição não usa o cache"""
+        if not self.usa_cache(request):
+            return None, None
+        chave = chave_pagina(request, self.itens_da_pagina())
+        guardada = cache.get(chave)
+        if guardada is not None:
+            self.ao_servir_do_cache()
+        return chave, guardada
+
+    def guardar_depois(self, request, response, chave):
+        """Guarda a resposta no cache quando ela for renderizada"""
+        def guardar(response):
+            if (
+                response.status_code == 200
+                and not response.cookies
+                and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+            ):
+                cache.set(chave, (response['Content-Type'], response.content), tempo())
+
+        if getattr(response, 'is_rendered', True):
+            guardar(response)
+        else:
+            response.add_post_render_callback(guardar)
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.dispatch_assincrono(request, *args, **kwargs)
+
+        chave, guardada = self.consultar_cache(request)
+        if guardada is not None:
+            content_type, conteudo = guardada
+            return HttpResponse(conteudo, content_type=content_type)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if chave is not None:
+            self.guardar_depois(request, response, chave)
+        return response
+
+    async def dispatch_assincrono(self, request, *args, **kwargs):
+        """
+        ``dispatch`` das views assíncronas
+
+        Sessão, mensagens e cache não têm API assíncrona nativa: a consulta
+        inteira é feita numa única passagem por ``sync_to_async``.
+        """
+        chave, guardada = await sync_to_async(self.consultar_cache)(request)
+        if guardada is not None:
+            content_type, conteudo = guardada
+            return HttpResponse(conteudo, content_type=content_type)
+
+        response = await super().dispatch(request, *args, **kwargs)
+        if chave is not None:
+            # TemplateResponse: guardada pelo handler ao renderizar, fora do loop de eventos
+            if getattr(response, 'is_rendered', True):
+                await sync_to_async(self.guardar_depois)(request, response, chave)
+            else:
+                self.guardar_depois(request, response, chave)
+        return response
@@ -0,0 +1,127 @@
+"""
+Contadores do painel (itens perdidos, encontrados, resolvidos e usuários)
+
+Os totais por (tipo, status) ficam na tabela ContadorItens, atualizada de
+forma incremental pelos signals do Item e pelas escritas em lote (ver
+itens.em_lote). Itens arquivados (ver itens.arquivo) continuam contando. A
+leitura é feita de uma única entrada de cache, reconstruída com uma consulta
+à tabela de contadores quando invalidada.
+"""
+
+import asyncio
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+
+from achados_perdidos_uft.caches import prazo_invalidacao
+from itens.models import Item, ItemArquivado, ContadorItens
+
+CHAVE_CACHE = 'itens:contadores'
+
+
+def invalidar_cache():
+    """Descarta os totais em cache (agora e após o commit da transação)"""
+    cache.delete(CHAVE_CACHE)
+    transaction.on_commit(lambda: cache.delete(CHAVE_CACHE))
+
+
+def ajustar(tipo, status, delta):
+    """Soma ``delta`` ao contador de (tipo, status)"""
+    if not delta:
+        return
+    atualizados = ContadorItens.objects.filter(tipo=tipo, status=status).update(
+        total=F('total') + delta
+    )
+    if not atualizados:
+        ContadorItens.objects.get_or_create(tipo=tipo, status=status)
+        ContadorItens.objects.filter(tipo=tipo, status=status).update(total=F('total') + delta)
+    invalidar_cache()
+
+
+def registrar_transicao(anterior, atual, quantidade=1):
+    """Move ``quantidade`` itens do par (tipo, status) anterior para o atual"""
+    if anterior == atual:
+        return
+    if anterior is not None:
+        ajustar(*anterior, -quantidade)
+    if atual is not None:
+        ajustar(*atual, quantidade)
+
+
+def montar(contadores, total_usuarios):
+    """Totais do painel a partir dos registros de ContadorItens"""
+    por_tipo_status = {(contador.tipo, contador.status): contador.total for contador in contadores}
+    return {
+        'total_perdidos': por_tipo_status.get(('perdido', 'ativo'), 0),
+        'total_encontrados': por_tipo_status.get(('encontrado', 'ativo'), 0),
+        'total_resolvidos': sum(
+            total for (tipo, status), total in por_tipo_status.items() if status == 'resolvido'
+        ),
+        'total_usuarios': total_usuarios,
+    }
+
+
+def calcular():
+    """Lê os contadores do banco (sem cache)"""
+    return montar(ContadorItens.objects.all(), User.objects.filter(is_active=True).count())
+
+
+async def acalcular():
+    """Versão assíncrona de ``calcular``: as duas consultas são disparadas juntas"""
+    async def listar_contadores():
+        return [contador async for contador in ContadorItens.objects.all()]
+
+    contadores, total_usuarios = await asyncio.gather(
+        listar_contadores(), User.objects.filter(is_active=True).acount()
+    )
+    return montar(contadores, total_usuarios)
+
+
+def totais():
+    """Retorna os totais do painel, do cache sempre que possível"""
+    valores = cache.get(CHAVE_CACHE)
+    if valores is None:
+        valores = calcular()
+        cache.set(CHAVE_CACHE, valores, prazo_invalidacao())
+    return valores
+
+
+async def atotais():
+    """Versão assíncrona de ``totais`` (views assíncronas)"""
+    valores = await cache.aget(CHAVE_CACHE)
+    if valores is None:
+        valores = await acalcular()
+        await cache.aset(CHAVE_CACHE, valores, prazo_invalidacao())
+    return valores
+
+
+def reconciliar():
+    """
+    Recalcula todos os contadores a partir das tabelas de itens e de itens arquivados
+
+    Retorna a lista de (tipo, status, anterior, atual) dos contadores que divergiam.
+    """
+    with transaction.atomic():
+        anteriores = {
+            (contador.tipo, contador.status): contador.total
+            for contador in ContadorItens.objects.select_for_update()
+        }
+        atuais = {}
+        for modelo in (Item, ItemArquivado):
+            for grupo in modelo.objects.order_by().values('tipo', 'status').annotate(quantidade=Count('id')):
+                chave = (grupo['tipo'], grupo['status'])
+                atuais[chave] = atuais.get(chave, 0) + grupo['quantidade']
+        ContadorItens.objects.all().delete()
+        ContadorItens.objects.bulk_create([
+            ContadorItens(tipo=tipo, status=status, total=total)
+            for (tipo, status), total in atuais.items()
+        ])
+        invalidar_cache()
+
+    return [
+        (tipo, status, anteriores.get((tipo, status), 0), atuais.get((tipo, status), 0))
+        for tipo, status in sorted(set(anteriores) | set(atuais))
+        if anteriores.get((tipo, status), 0) != atuais.get((tipo, status), 0)
+    ]
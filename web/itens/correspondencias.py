@@ -0,0 +1,195 @@
+"""
+Motor de correspondência entre itens perdidos e encontrados
+
+Cada item perdido ativo é comparado com os itens encontrados ativos (e
+vice-versa) e os pares prováveis ficam na tabela SugestaoCorrespondencia,
+exibida na página do item e em "Meus itens".
+
+O cálculo é incremental: quando um item é cadastrado ou muda algum campo
+relevante, só os pares dele são recalculados, em segundo plano pela fila de
+tarefas. Para não comparar todos com todos, os candidatos são restritos
+(bloqueio) à mesma categoria, ao tipo oposto e a ocorrências dentro de
+``CORRESPONDENCIA_JANELA_DIAS`` dias, consulta coberta por um índice.
+
+A pontuação (0 a 1) é a soma ponderada de três critérios:
+
+* texto: semelhança (Dice) entre os radicais do título e da descrição;
+* tempo: proximidade das datas de ocorrência (um item encontrado bem antes
+  de o outro ser perdido não combina);
+* bloco: mesmo local, ou local "outro" em um dos lados.
+
+Pares sem nenhum termo em comum ou abaixo de
+``CORRESPONDENCIA_PONTUACAO_MINIMA`` não são guardados.
+"""
+
+import copy
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from itens import cache_paginas, tarefas
+from itens.models import Item, SugestaoCorrespondencia
+from itens.texto import tokenizar
+
+PESOS = {'texto': 0.5, 'tempo': 0.3, 'bloco': 0.2}
+
+# Peso do título na semelhança de texto (o restante vai para título + descrição)
+PESO_TITULO = 0.6
+
+# Um item pode ser encontrado (e cadastrado) com data um pouco anterior à
+# informada por quem o perdeu: datas aproximadas
+TOLERANCIA = timedelta(days=1)
+
+# Campos que alteram a pontuação: mudou algum, os pares são recalculados
+CAMPOS = ('titulo', 'descricao', 'categoria', 'tipo', 'bloco', 'data_ocorrencia', 'status')
+
+OPOSTO = {'perdido': 'encontrado', 'encontrado': 'perdido'}
+
+
+def janela():
+    return timedelta(days=getattr(settings, 'CORRESPONDENCIA_JANELA_DIAS', 30))
+
+
+def pontuacao_minima():
+    return getattr(settings, 'CORRESPONDENCIA_PONTUACAO_MINIMA', 0.35)
+
+
+def termos(item):
+    """(radicais do título, radicais do título e da descrição)"""
+    titulo = set(tokenizar(item.titulo))
+    return titulo, titulo | set(tokenizar(item.descricao))
+
+
+def dice(a, b):
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def semelhanca_texto(termos_a, termos_b):
+    return PESO_TITULO * dice(termos_a[0], termos_b[0]) + (1 - PESO_TITULO) * dice(termos_a[1], termos_b[1])
+
+
+def proximidade_tempo(perdido, encontrado):
+    diferenca = encontrado.data_ocorrencia - perdido.data_ocorrencia
+    if diferenca < -TOLERANCIA:
+        return 0.0
+    return max(0.0, 1 - abs(diferenca) / janela())
+
+
+def proximidade_bloco(a, b):
+    if a.bloco == b.bloco:
+        return 1.0
+    if 'outro' in (a.bloco, b.bloco):
+        return 0.5
+    return 0.0
+
+
+def pontuar(perdido, encontrado, termos_perdido=None, termos_encontrado=None):
+    """Retorna (pontuação, detalhes por critério) do par"""
+    detalhes = {
+        'texto': semelhanca_texto(termos_perdido or termos(perdido), termos_encontrado or termos(encontrado)),
+        'tempo': proximidade_tempo(perdido, encontrado),
+        'bloco': proximidade_bloco(perdido, encontrado),
+    }
+    pontuacao = sum(PESOS[criterio] * valor for criterio, valor in detalhes.items())
+    return round(pontuacao, 4), {criterio: round(valor, 4) for criterio, valor in detalhes.items()}
+
+
+def candidatos(item):
+    """Itens ativos que podem corresponder ao item (bloqueio por categoria, tipo e data)"""
+    return Item.objects.filter(
+        categoria=item.categoria,
+        tipo=OPOSTO[item.tipo],
+        status='ativo',
+        data_ocorrencia__range=(item.data_ocorrencia - janela(), item.data_ocorrencia + janela()),
+    ).exclude(usuario_id=item.usuario_id).only(
+        'id', 'titulo', 'descricao', 'tipo', 'bloco', 'data_ocorrencia'
+    ).order_by()
+
+
+def remover(item_ids):
+    """Apaga as sugestões que envolvem os itens"""
+    SugestaoCorrespondencia.objects.filter(Q(perdido_id__in=item_ids) | Q(encontrado_id__in=item_ids)).delete()
+
+
+def atualizar(item):
+    """Recalcula os pares do item; retorna quantas sugestões foram gravadas"""
+    with transaction.atomic():
+        # As sugestões aparecem no detalhe dos dois itens do par
+        cache_paginas.invalidar()
+        remover([item.pk])
+        if item.status != 'ativo':
+            return 0
+
+        termos_item = termos(item)
+        minima = pontuacao_minima()
+        sugestoes = []
+        for candidato in candidatos(item).iterator():
+            if item.tipo == 'perdido':
+                perdido, encontrado = item, candidato
+                pontuacao, detalhes = pontuar(perdido, encontrado, termos_perdido=termos_item)
+            else:
+                perdido, encontrado = candidato, item
+                pontuacao, detalhes = pontuar(perdido, encontrado, termos_encontrado=termos_item)
+            if detalhes['texto'] and pontuacao >= minima:
+                sugestoes.append(SugestaoCorrespondencia(
+                    perdido=perdido, encontrado=encontrado, pontuacao=pontuacao, detalhes=detalhes
+                ))
+        SugestaoCorrespondencia.objects.bulk_create(sugestoes)
+    return len(sugestoes)
+
+
+@tarefas.registrar('calcular_correspondencias')
+def tarefa_calcular(item_id):
+    """Tarefa em segundo plano: recalcula as sugestões do item"""
+    item = Item.objects.filter(pk=item_id).first()
+    if item is not None:
+        atualizar(item)
+
+
+def solicitar(item):
+    """Enfileira o recálculo das sugestões do item (uma tarefa pendente por item)"""
+    tarefas.enfileirar('calcular_correspondencias', chave=f'correspondencias:{item.pk}', item_id=item.pk)
+
+
+def sugestoes_de(itens, limite=3):
+    """
+    Sugestões dos itens (ativos) em uma única consulta
+
+    Retorna {id do item: [sugestões]}, cada sugestão com o atributo ``outro``
+    (o item do tipo oposto), da maior para a menor pontuação.
+    """
+    ids = [item.pk for item in itens if item.status == 'ativo']
+    resultado = {pk: [] for pk in ids}
+    if not ids:
+        return resultado
+    consulta = SugestaoCorrespondencia.objects.filter(
+        Q(perdido_id__in=ids, encontrado__status='ativo') | Q(encontrado_id__in=ids, perdido__status='ativo')
+    ).select_related('perdido', 'encontrado').order_by('-pontuacao')
+    for sugestao in consulta:
+        for pk, outro in ((sugestao.perdido_id, sugestao.encontrado), (sugestao.encontrado_id, sugestao.perdido)):
+            if pk in resultado and len(resultado[pk]) < limite:
+                # Cópia: os dois itens do par podem estar na lista
+                sugestao_item = copy.copy(sugestao)
+                sugestao_item.outro = outro
+                resultado[pk].append(sugestao_item)
+    return resultado
+
+
+def sugestoes(item, limite=4):
+    """Sugestões de um item, da maior para a menor pontuação"""
+    if item.status != 'ativo':
+        return []
+    if item.tipo == 'perdido':
+        consulta = item.sugestoes_como_perdido.filter(encontrado__status='ativo').select_related('encontrado')
+        lado = 'encontrado'
+    else:
+        consulta = item.sugestoes_como_encontrado.filter(perdido__status='ativo').select_related('perdido')
+        lado = 'perdido'
+    resultado = list(consulta.order_by('-pontuacao')[:limite])
+    for sugestao in resultado:
+        sugestao.outro = getattr(sugestao, lado)
+    return resultado
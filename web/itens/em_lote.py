@@ -0,0 +1,99 @@
+"""
+Escritas em lote nos itens (ações em massa do admin, expiração e arquivamento)
+
+``QuerySet.update`` não dispara os signals do Item: ``atualizar`` refaz para
+o lote o que itens.signals faz item a item (contadores do painel, caches da
+listagem e estruturas derivadas). ``QuerySet.delete`` dispara os signals de
+cada item; ``excluir`` só permite manter os itens nos contadores do painel,
+como no arquivamento.
+"""
+
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from itens import cache_filtros, cache_paginas, contadores, correspondencias, similares
+from itens.models import Item
+
+# Módulos com estruturas derivadas dos itens (``CAMPOS``, ``remover`` e ``solicitar``)
+DERIVADOS = (correspondencias, similares)
+
+_mantendo_contadores = ContextVar('itens_mantendo_contadores', default=False)
+
+
+@contextmanager
+def mantendo_contadores():
+    """Marca o contexto atual como exclusão que não desconta os contadores (consultado pelos signals)"""
+    token = _mantendo_contadores.set(True)
+    try:
+        yield
+    finally:
+        _mantendo_contadores.reset(token)
+
+
+def contadores_mantidos():
+    return _mantendo_contadores.get()
+
+
+def atualizar(queryset, **campos):
+    """
+    Executa ``queryset.update(**campos)`` com os efeitos dos signals do Item
+
+    Deve ser usado no lugar de ``update`` sempre que tipo ou status puderem mudar.
+    Como ``update`` ignora ``auto_now``, também atualiza ``data_atualizacao``
+    (usada pela sincronização do aplicativo). Ajusta os contadores do painel,
+    invalida as páginas e listas de ids em cache (ver itens.cache_paginas e
+    itens.cache_filtros) e, quando os campos alterados as afetam, refaz as
+    estruturas derivadas (ver ``atualizar_derivados``). Retorna o número de
+    itens atualizados.
+    """
+    campos.setdefault('data_atualizacao', timezone.now())
+    derivados = [modulo for modulo in DERIVADOS if set(campos) & set(modulo.CAMPOS)]
+    with transaction.atomic():
+        grupos = []
+        if 'tipo' in campos or 'status' in campos:
+            grupos = list(
+                queryset.order_by().values('tipo', 'status').annotate(quantidade=Count('id'))
+            )
+        # Lidos antes do update, que pode tirar os itens do filtro do queryset
+        ids = list(queryset.values_list('pk', flat=True)) if derivados else []
+        total = queryset.update(**campos)
+        cache_paginas.invalidar()
+        cache_filtros.invalidar()
+        atualizar_derivados(ids, campos, derivados)
+        for grupo in grupos:
+            anterior = (grupo['tipo'], grupo['status'])
+            atual = (campos.get('tipo', grupo['tipo']), campos.get('status', grupo['status']))
+            contadores.registrar_transicao(anterior, atual, grupo['quantidade'])
+    return total
+
+
+def atualizar_derivados(ids, campos, modulos):
+    """
+    Refaz as estruturas derivadas dos itens alterados em lote, como os signals
+    fariam item a item
+
+    Itens que saem de "ativo" só são removidos delas, na hora; os demais têm
+    o recálculo enfileirado (``solicitar`` de cada módulo).
+    """
+    if not ids:
+        return
+    if campos.get('status', 'ativo') != 'ativo':
+        for modulo in modulos:
+            modulo.remover(ids)
+        return
+    for item in Item.objects.filter(pk__in=ids).only('pk'):
+        for modulo in modulos:
+            modulo.solicitar(item)
+
+
+def excluir(queryset, descontar=True):
+    """
+    Executa ``queryset.delete()``; com ``descontar=False`` os itens excluídos
+    continuam nos contadores do painel (ver itens.arquivo)
+    """
+    with nullcontext() if descontar else mantendo_contadores():
+        return queryset.delete()
@@ -0,0 +1,243 @@
+"""
+Eventos em tempo real (server-sent events) para novos itens e novos contatos
+
+A listagem e a página de contatos recebidos abrem uma conexão ``EventSource``
+com ``itens:eventos`` e avisam quando chega algo novo, no lugar de recarregar
+a página. O stream só é servido sob ASGI (ver itens.views_assincronas); sob
+WSGI a rota responde 204, que faz o navegador desistir da conexão.
+
+Os signals publicam, após o commit, um evento ``item`` no canal ``itens``
+para cada item ativo cadastrado e um evento ``contato`` no canal do dono do
+item para cada contato recebido. Cada conexão assina os canais que lhe
+interessam e filtra os itens por categoria, bloco e tipo.
+
+A distribuição (fan-out) é feita pelo backend de ``EVENTOS_BACKEND``:
+
+- ``EventosLocais`` (padrão): filas em memória no próprio processo; só serve
+  quando o mesmo processo atende as escritas e os streams (um único worker ASGI);
+- ``EventosRedis``: pub/sub do Redis (``EVENTOS_REDIS_URL``, requer o pacote
+  ``redis``) entre todos os processos, com um único ouvinte por processo
+  repassando às filas locais.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('achados_perdidos_uft')
+
+CANAL_ITENS = 'itens'
+
+# Filtros aceitos pelo stream, aplicados aos eventos de item
+FILTROS = ('categoria', 'bloco', 'tipo')
+
+# Eventos aguardando entrega por conexão; uma conexão lenta perde os excedentes
+LIMITE_FILA = 100
+
+# Espera (ms) sugerida ao navegador antes de reconectar
+RECONEXAO_MS = 5000
+
+
+def canal_usuario(usuario_id):
+    return f'usuario:{usuario_id}'
+
+
+def intervalo_ping():
+    return getattr(settings, 'EVENTOS_INTERVALO_PING', 15)
+
+
+def duracao_maxima():
+    return getattr(settings, 'EVENTOS_DURACAO_MAXIMA', 300)
+
+
+class Assinatura:
+    """Fila de eventos de uma conexão, alimentada pelo backend"""
+
+    def __init__(self, backend, canais):
+        self.backend = backend
+        self.canais = tuple(canais)
+        self.loop = asyncio.get_running_loop()
+        self.fila = asyncio.Queue(LIMITE_FILA)
+
+    def entregar(self, evento):
+        # Chamado no loop da conexão (ver EventosLocais.publicar)
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            logger.warning('Evento descartado: conexão de eventos sem consumir a fila')
+
+    async def proximo(self, espera):
+        """Próximo evento, ou None se nenhum chegar em ``espera`` segundos"""
+        try:
+            return await asyncio.wait_for(self.fila.get(), espera)
+        except asyncio.TimeoutError:
+            return None
+
+    def fechar(self):
+        self.backend.remover(self)
+
+
+class EventosLocais:
+    """
+    Fan-out em memória, no próprio processo
+
+    ``publicar`` pode ser chamado de qualquer thread (views síncronas,
+    ``on_commit``); a entrega é agendada no loop de cada conexão.
+    """
+
+    def __init__(self):
+        self._assinaturas = {}
+        self._trava = threading.Lock()
+
+    def assinar(self, canais):
+        """Nova assinatura dos canais (chamar dentro do loop de eventos)"""
+        assinatura = Assinatura(self, canais)
+        with self._trava:
+            for canal in assinatura.canais:
+                self._assinaturas.setdefault(canal, set()).add(assinatura)
+        return assinatura
+
+    def remover(self, assinatura):
+        with self._trava:
+            for canal in assinatura.canais:
+                assinaturas = self._assinaturas.get(canal, set())
+                assinaturas.discard(assinatura)
+                if not assinaturas:
+                    self._assinaturas.pop(canal, None)
+
+    def assinantes(self, canal):
+        with self._trava:
+            return len(self._assinaturas.get(canal, ()))
+
+    def publicar(self, canal, evento):
+        """Entrega o evento às assinaturas do canal neste processo"""
+        with self._trava:
+            assinaturas = list(self._assinaturas.get(canal, ()))
+        for assinatura in assinaturas:
+            try:
+                assinatura.loop.call_soon_threadsafe(assinatura.entregar, evento)
+            except RuntimeError:
+                # Loop já encerrado: a conexão caiu sem passar pelo fechar()
+                self.remover(assinatura)
+
+
+class EventosRedis(EventosLocais):
+    """
+    Fan-out entre processos pelo pub/sub do Redis
+
+    A publicação vai para o Redis; em cada processo, uma tarefa ouve todos os
+    canais e repassa os eventos às assinaturas locais.
+    """
+    PREFIXO = 'achados:eventos:'
+
+    def __init__(self):
+        super().__init__()
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('EventosRedis requer o pacote redis (pip install redis).')
+        self.url = getattr(settings, 'EVENTOS_REDIS_URL', 'redis://127.0.0.1:6379/2')
+        self.cliente = redis.Redis.from_url(self.url)
+        self._ouvinte = None
+
+    def assinar(self, canais):
+        if self._ouvinte is None or self._ouvinte.done():
+            self._ouvinte = asyncio.get_running_loop().create_task(self.ouvir())
+        return super().assinar(canais)
+
+    def publicar(self, canal, evento):
+        self.cliente.publish(self.PREFIXO + canal, json.dumps(evento))
+
+    async def ouvir(self):
+        from redis import asyncio as redis_assincrono
+
+        conexao = redis_assincrono.Redis.from_url(self.url)
+        async with conexao.pubsub() as pubsub:
+            await pubsub.psubscribe(self.PREFIXO + '*')
+            async for mensagem in pubsub.listen():
+                if mensagem['type'] != 'pmessage':
+                    continue
+                canal = mensagem['channel'].decode().removeprefix(self.PREFIXO)
+                EventosLocais.publicar(self, canal, json.loads(mensagem['data']))
+
+
+@lru_cache(maxsize=None)
+def _instanciar(caminho):
+    return import_string(caminho)()
+
+
+def obter_backend():
+    """Instância (única por processo) do backend configurado em ``EVENTOS_BACKEND``"""
+    return _instanciar(getattr(settings, 'EVENTOS_BACKEND', 'itens.eventos.EventosLocais'))
+
+
+def publicar(canal, tipo, dados):
+    """Publica o evento após o commit da transação atual"""
+    evento = {'tipo': tipo, 'dados': dados}
+    transaction.on_commit(lambda: obter_backend().publicar(canal, evento))
+
+
+def publicar_item(item):
+    """Evento de novo item, para todas as conexões do canal de itens"""
+    publicar(CANAL_ITENS, 'item', {
+        'id': item.pk,
+        'titulo': item.titulo,
+        'tipo': item.tipo,
+        'categoria': item.categoria,
+        'bloco': item.bloco,
+        'url': reverse('itens:detalhe-item', kwargs={'pk': item.pk}),
+    })
+
+
+def publicar_contato(contato, dono_id):
+    """Evento de novo contato, só para o dono do item"""
+    publicar(canal_usuario(dono_id), 'contato', {
+        'id': contato.pk,
+        'item_id': contato.item_id,
+        'url': reverse('itens:contatos-recebidos'),
+    })
+
+
+def combina(evento, filtros):
+    """Indica se o evento passa pelos filtros da conexão (só eventos de item são filtrados)"""
+    if evento['tipo'] != 'item':
+        return True
+    return all(evento['dados'].get(campo) == valor for campo, valor in filtros.items())
+
+
+def formatar(evento):
+    """Evento no formato text/event-stream"""
+    return f'event: {evento["tipo"]}\ndata: {json.dumps(evento["dados"])}\n\n'
+
+
+async def transmitir(canais, filtros=None):
+    """
+    Corpo do stream: eventos dos canais, com comentários de ping enquanto não
+    chega nada (mantêm a conexão aberta nos proxies)
+
+    A conexão é encerrada depois de ``EVENTOS_DURACAO_MAXIMA`` segundos e o
+    navegador reconecta sozinho, o que redistribui as conexões entre os
+    workers após um deploy.
+    """
+    filtros = filtros or {}
+    loop = asyncio.get_running_loop()
+    fim = loop.time() + duracao_maxima()
+    assinatura = obter_backend().assinar(canais)
+    try:
+        yield f'retry: {RECONEXAO_MS}\n\n'
+        while (restante := fim - loop.time()) > 0:
+            evento = await assinatura.proximo(min(intervalo_ping(), restante))
+            if evento is None:
+                yield ': ping\n\n'
+            elif combina(evento, filtros):
+                yield formatar(evento)
+    finally:
+        assinatura.fechar()
@@ -0,0 +1,116 @@
+"""
+Expiração automática dos itens ativos antigos
+
+Um item ativo cadastrado há mais de N dias passa para ``expirado``: sai das
+listagens, das buscas, das sugestões de correspondência e do índice de
+similares, e o dono recebe um e-mail (um por pessoa, com todos os seus itens
+expirados na execução).
+
+N vem de ``EXPIRACAO_DIAS``, com exceções em ``EXPIRACAO_DIAS_POR_REGRA``,
+cujas chaves são ``'categoria:tipo'``, ``'categoria'`` ou ``'tipo'`` (a mais
+específica vale). Ex.: ``{'documentos': 180, 'medicamentos:encontrado': 15}``.
+
+A atualização é feita em lotes pequenos de ids, cada um na sua transação
+(via ``em_lote.atualizar``, que mantém o painel correto e tira os
+itens das sugestões e do índice de similares), para não segurar o bloqueio de
+escrita do banco por muito tempo.
+"""
+
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import send_mail
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from itens import em_lote, tarefas
+from itens.models import Item, CATEGORIA_CHOICES, TIPO_ITEM_CHOICES
+
+
+def dias_padrao():
+    return getattr(settings, 'EXPIRACAO_DIAS', 90)
+
+
+def regras():
+    return getattr(settings, 'EXPIRACAO_DIAS_POR_REGRA', {})
+
+
+def dias_para(categoria, tipo):
+    """Dias até expirar um item da categoria e tipo (regra mais específica)"""
+    por_regra = regras()
+    for chave in (f'{categoria}:{tipo}', categoria, tipo):
+        if chave in por_regra:
+            return por_regra[chave]
+    return dias_padrao()
+
+
+def grupos(agora=None):
+    """[(categoria, tipo, data limite de postagem)] para cada combinação"""
+    agora = agora or timezone.now()
+    return [
+        (categoria, tipo, agora - timedelta(days=dias_para(categoria, tipo)))
+        for categoria, _ in CATEGORIA_CHOICES
+        for tipo, _ in TIPO_ITEM_CHOICES
+    ]
+
+
+def vencidos(categoria, tipo, limite):
+    return Item.objects.filter(
+        categoria=categoria, tipo=tipo, status='ativo', data_postagem__lt=limite
+    )
+
+
+def expirar(lote=500, pausa=0, agora=None):
+    """
+    Expira os itens vencidos, ``lote`` por vez, esperando ``pausa`` segundos entre os lotes
+
+    Retorna {id do dono: [ids dos itens expirados]}.
+    """
+    expirados = defaultdict(list)
+    for categoria, tipo, limite in grupos(agora):
+        consulta = vencidos(categoria, tipo, limite)
+        while True:
+            linhas = list(consulta.order_by('pk').values_list('pk', 'usuario_id')[:lote])
+            if not linhas:
+                break
+            ids = [pk for pk, _ in linhas]
+            # Revalida o status: o item pode ter mudado desde a leitura
+            em_lote.atualizar(
+                Item.objects.filter(pk__in=ids, status='ativo'), status='expirado'
+            )
+            for pk, usuario_id in linhas:
+                expirados[usuario_id].append(pk)
+            if pausa:
+                time.sleep(pausa)
+    return dict(expirados)
+
+
+def notificar(expirados):
+    """Enfileira um e-mail por dono com os itens expirados dele"""
+    for usuario_id, item_ids in expirados.items():
+        tarefas.enfileirar('notificar_expiracao', usuario_id=usuario_id, item_ids=item_ids)
+
+
+@tarefas.registrar('notificar_expiracao')
+def tarefa_notificar(usuario_id, item_ids):
+    """Tarefa em segundo plano: envia ao dono o resumo dos itens expirados"""
+    usuario = User.objects.filter(pk=usuario_id, is_active=True).first()
+    if usuario is None or not usuario.email:
+        return
+    itens = list(Item.objects.filter(pk__in=item_ids, status='expirado').order_by('-data_postagem'))
+    if not itens:
+        return
+    site_url = getattr(settings, 'SITE_URL', '').rstrip('/')
+    mensagem = render_to_string('itens/emails/itens_expirados.txt', {
+        'usuario': usuario,
+        'itens': itens,
+        'site_name': settings.SITE_NAME,
+        'url_novo_item': site_url + reverse('itens:criar-item'),
+        'url_meus_itens': site_url + reverse('itens:meus-itens'),
+    })
+    assunto = f'{len(itens)} item(ns) expirado(s) no {settings.SITE_NAME}'
+    send_mail(assunto, mensagem, None, [usuario.email])
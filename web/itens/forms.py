@@ -2,10 +2,17 @@
 Formulários do sistema de Achados & Perdidos da UFT Palmas
 """
 
+import os
+
 from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
+from PIL import Image
+
+from itens.imagens import recodificar
 from itens.models import (
-    Item, Comentario, ContatoItem,
+    Item, Comentario, ContatoItem, BuscaSalva,
     TIPO_ITEM_CHOICES, CATEGORIA_CHOICES, BLOCO_CHOICES, STATUS_CHOICES
 )
 
@@ -72,12 +79,20 @@ class FormularioItem(forms.ModelForm):
         help_texts = {
             'titulo': 'Seja específico mas conciso',
             'descricao': 'Quanto mais detalhes, maior a chance de recuperação',
-            'foto': 'Uma foto ajuda muito na identificação (formatos aceitos: JPG, PNG - máx. 5MB)',
+            'foto': 'Uma foto ajuda muito na identificação (formatos aceitos: JPG, PNG, WEBP - máx. 5MB)',
             'data_ocorrencia': 'Quando aproximadamente o item foi perdido/encontrado',
             'prioridade': 'Marque se for um item de extrema importância',
         }
     
-    def __init__(self, *args, **kwargs):
+    # Formatos de imagem aceitos no upload (nomes do Pillow)
+    FORMATOS_FOTO = {'JPEG': 'JPG', 'PNG': 'PNG', 'WEBP': 'WEBP'}
+    
+    def __init__(self, *args, uploads_recusados=None, **kwargs):
+        """
+        ``uploads_recusados``: campos descartados por tamanho durante o upload
+        (``request.uploads_recusados``, ver itens.uploads)
+        """
+        self.uploads_recusados = uploads_recusados or {}
         super().__init__(*args, **kwargs)
         
         # Aplicar classes CSS automaticamente
@@ -98,6 +113,43 @@ class FormularioItem(forms.ModelForm):
         if len(descricao) < 20:
             raise forms.ValidationError('A descrição deve ter pelo menos 20 caracteres para facilitar a identificação.')
         return descricao
+    
+    def clean_foto(self):
+        """
+        Valida tamanho, formato e dimensões da foto e a recodifica em JPEG
+        reduzido e sem metadados
+        """
+        limite_mb = settings.UPLOAD_FOTO_TAMANHO_MAXIMO / (1024 * 1024)
+        if 'foto' in self.uploads_recusados:
+            raise forms.ValidationError(f'A foto deve ter no máximo {limite_mb:.0f}MB.')
+        
+        foto = self.cleaned_data.get('foto')
+        if not isinstance(foto, UploadedFile):
+            return foto  # sem upload novo (foto atual mantida ou removida)
+        
+        if foto.size > settings.UPLOAD_FOTO_TAMANHO_MAXIMO:
+            raise forms.ValidationError(f'A foto deve ter no máximo {limite_mb:.0f}MB.')
+        
+        # O ImageField já abriu a imagem: formato e dimensões vêm do cabeçalho,
+        # antes de qualquer decodificação dos pixels
+        imagem = foto.image
+        if imagem.format not in self.FORMATOS_FOTO:
+            raise forms.ValidationError(
+                f'Formato não aceito. Envie {", ".join(self.FORMATOS_FOTO.values())}.'
+            )
+        largura, altura = imagem.size
+        if largura * altura > settings.UPLOAD_FOTO_PIXELS_MAXIMO:
+            raise forms.ValidationError(
+                f'A foto tem resolução muito alta ({largura}x{altura}). Reduza-a antes de enviar.'
+            )
+        
+        try:
+            conteudo = recodificar(foto, settings.UPLOAD_FOTO_DIMENSAO_MAXIMA)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            raise forms.ValidationError('Não foi possível processar a imagem enviada.')
+        
+        nome = os.path.splitext(os.path.basename(foto.name))[0] or 'foto'
+        return SimpleUploadedFile(f'{nome}.jpg', conteudo, content_type='image/jpeg')
 
 class FormularioComentario(forms.ModelForm):
     """
@@ -265,4 +317,26 @@ class FormularioContato(forms.ModelForm):
             }),
         }
 
+class FormularioBuscaSalva(forms.ModelForm):
+    """
+    Formulário para salvar a busca atual da listagem (os filtros vêm em campos
+    ocultos, só o nome é digitado)
+    """
+    class Meta:
+        model = BuscaSalva
+        fields = ['nome', 'busca', 'tipo', 'categoria', 'bloco', 'prioridade']
+        widgets = {
+            'nome': forms.TextInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Ex.: Minha carteira preta'
+            }),
+        }
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        # Sem nenhum critério o alerta avisaria sobre todos os itens
+        if not any(cleaned_data.get(campo) for campo in ['busca', 'tipo', 'categoria', 'bloco', 'prioridade']):
+            raise forms.ValidationError('Informe um texto ou algum filtro antes de salvar a busca.')
+        return cleaned_data
+
 # Fim do arquivo
@@ -0,0 +1,264 @@
+"""
+Rendições (versões redimensionadas) das fotos dos itens
+
+Cada foto original gera, em WebP e JPEG, as larguras de cada rendição:
+uma miniatura para os cards, um tamanho para a página de detalhe e um
+placeholder minúsculo exibido enquanto a imagem carrega. A orientação EXIF
+é aplicada e os metadados descartados. As rendições ficam em
+``itens/rendicoes/<hash do nome da foto>/<largura>.<formato>`` no mesmo storage
+da foto; o hash é do caminho completo, com subdiretórios e extensão, para que
+fotos antigas como ``foo.jpg`` e ``foo.png`` não dividam o mesmo diretório.
+
+A geração é feita em segundo plano pela fila de tarefas (itens.tarefas):
+é enfileirada ao salvar um item com foto nova e, para fotos antigas, na
+primeira vez em que são exibidas (ou de uma vez pelo comando
+``gerar_rendicoes``). Até lá os templates exibem a foto original. A remoção
+das fotos sem itens (e das suas rendições) também passa pela fila.
+"""
+
+import hashlib
+import logging
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from itens import tarefas
+from itens.models import Item, ItemArquivado, Tarefa
+
+logger = logging.getLogger('achados_perdidos_uft')
+
+# Larguras (px) geradas para cada rendição; a primeira é a usada no ``src``
+RENDICOES = {
+    'placeholder': (24,),
+    'card': (320, 640),
+    'detalhe': (800, 1600),
+}
+
+# Extensão -> (formato do Pillow, parâmetros de gravação)
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+DIRETORIO = 'itens/rendicoes'
+
+# A última rendição gravada marca que o conjunto está completo
+MARCADOR = ('placeholder', RENDICOES['placeholder'][-1], 'jpg')
+
+# Espera antes de apagar uma foto que ficou sem itens: um upload simultâneo do
+# mesmo conteúdo pode ter reaproveitado o arquivo sem ter sido confirmado ainda
+ATRASO_REMOCAO = timedelta(minutes=10)
+
+
+def storage_fotos():
+    return Item._meta.get_field('foto').storage
+
+
+def diretorio_rendicoes(nome):
+    """Diretório das rendições da foto ``nome`` (caminho no storage)"""
+    return f'{DIRETORIO}/{hashlib.md5(nome.encode()).hexdigest()}'
+
+
+def caminho_rendicao(nome, largura, extensao):
+    return f'{diretorio_rendicoes(nome)}/{largura}.{extensao}'
+
+
+def chave_cache(nome):
+    return f'itens:rendicoes:{nome}'
+
+
+def chave_falha(nome):
+    return f'itens:rendicoes:falha:{nome}'
+
+
+def chave_pedido(nome):
+    return f'itens:rendicoes:pedido:{nome}'
+
+
+def chave_tarefa(nome):
+    return f'rendicoes:{nome}'
+
+
+def em_rgb(imagem):
+    """Converte para RGB, compondo a transparência sobre fundo branco"""
+    if imagem.mode in ('RGBA', 'LA', 'P'):
+        imagem = imagem.convert('RGBA')
+        fundo = Image.new('RGB', imagem.size, (255, 255, 255))
+        fundo.paste(imagem, mask=imagem.getchannel('A'))
+        return fundo
+    return imagem.convert('RGB')
+
+
+def abrir_original(nome, storage):
+    """Abre a foto original já na orientação correta e em RGB"""
+    with storage.open(nome) as arquivo:
+        imagem = Image.open(arquivo)
+        imagem = ImageOps.exif_transpose(imagem)
+        imagem.load()
+    return em_rgb(imagem)
+
+
+def recodificar(arquivo, dimensao_maxima):
+    """
+    Recodifica a imagem enviada como JPEG com no máximo ``dimensao_maxima`` px
+    no maior lado, na orientação correta e sem metadados (EXIF, GPS...)
+
+    Retorna os bytes do JPEG. Em JPEGs, o ``draft`` faz o decodificador já
+    reduzir a imagem, sem alocar a resolução original inteira.
+    """
+    arquivo.seek(0)
+    with Image.open(arquivo) as imagem:
+        imagem.draft('RGB', (dimensao_maxima, dimensao_maxima))
+        imagem = em_rgb(ImageOps.exif_transpose(imagem))
+    imagem.thumbnail((dimensao_maxima, dimensao_maxima), Image.Resampling.LANCZOS)
+    conteudo = BytesIO()
+    formato, parametros = FORMATOS['jpg']
+    imagem.save(conteudo, formato, **parametros)
+    return conteudo.getvalue()
+
+
+def gerar_rendicoes(nome, storage=None):
+    """
+    Gera (ou regera) todas as rendições da foto ``nome``
+
+    Retorna o número de arquivos gravados.
+    """
+    storage = storage or default_storage
+    original = abrir_original(nome, storage)
+
+    arquivos = [
+        (rendicao, largura, extensao)
+        for rendicao, larguras in RENDICOES.items()
+        for largura in larguras
+        for extensao in FORMATOS
+        if (rendicao, largura, extensao) != MARCADOR
+    ] + [MARCADOR]
+
+    for rendicao, largura, extensao in arquivos:
+        imagem = original.copy()
+        # Só reduz: fotos menores que a largura ficam no tamanho original
+        imagem.thumbnail((largura, largura * 4), Image.Resampling.LANCZOS)
+        formato, parametros = FORMATOS[extensao]
+        conteudo = BytesIO()
+        imagem.save(conteudo, formato, **parametros)
+
+        caminho = caminho_rendicao(nome, largura, extensao)
+        if storage.exists(caminho):
+            storage.delete(caminho)
+        storage.save(caminho, ContentFile(conteudo.getvalue()))
+
+    cache.set(chave_cache(nome), True, None)
+    cache.delete(chave_falha(nome))
+    return len(arquivos)
+
+
+def rendicoes_prontas(nome, storage=None):
+    """Indica se as rendições da foto já existem (consulta o storage uma vez)"""
+    if cache.get(chave_cache(nome)):
+        return True
+    storage = storage or default_storage
+    if storage.exists(caminho_rendicao(nome, *MARCADOR[1:])):
+        cache.set(chave_cache(nome), True, None)
+        return True
+    return False
+
+
+def garantir_rendicoes(nome, storage=None):
+    """
+    Gera as rendições que ainda não existem
+
+    Retorna False se a foto não puder ser processada (arquivo ausente ou
+    corrompido); nesse caso os templates exibem a foto original.
+    """
+    if rendicoes_prontas(nome, storage):
+        return True
+    # Evita reprocessar a cada exibição uma foto que acabou de falhar
+    if cache.get(chave_falha(nome)):
+        return False
+    try:
+        gerar_rendicoes(nome, storage)
+    except (OSError, Image.DecompressionBombError, ValueError):
+        logger.warning('Não foi possível gerar as rendições de %s', nome, exc_info=True)
+        cache.set(chave_falha(nome), True, 3600)
+        return False
+    return True
+
+
+@tarefas.registrar('gerar_rendicoes')
+def tarefa_gerar_rendicoes(nome):
+    """Tarefa em segundo plano: gera as rendições se ainda não existirem"""
+    storage = storage_fotos()
+    if not rendicoes_prontas(nome, storage):
+        gerar_rendicoes(nome, storage)
+
+
+def solicitar_rendicoes(nome):
+    """
+    Enfileira a geração das rendições da foto (uma vez por foto)
+
+    O marcador no cache poupa o banco quando a mesma foto é exibida várias
+    vezes antes de a tarefa rodar; a chave de idempotência cobre o resto.
+    """
+    if cache.add(chave_pedido(nome), 1, 3600):
+        tarefas.enfileirar('gerar_rendicoes', chave=chave_tarefa(nome), nome=nome)
+
+
+def foto_em_uso(nome):
+    """Indica se algum item (ativo ou arquivado) usa o arquivo de foto"""
+    return Item.objects.filter(foto=nome).exists() or ItemArquivado.objects.filter(foto=nome).exists()
+
+
+def liberar_foto(nome):
+    """
+    Agenda a remoção do arquivo de foto se nenhum item o usa mais
+
+    As fotos são compartilhadas entre itens com o mesmo conteúdo (ver
+    itens.armazenamento); o arquivo só sai do disco junto com a última referência.
+    """
+    if nome and not foto_em_uso(nome):
+        tarefas.enfileirar('remover_foto', atraso=ATRASO_REMOCAO, nome=nome)
+
+
+@tarefas.registrar('remover_foto')
+def remover_foto(nome):
+    """Tarefa em segundo plano: apaga a foto e as rendições se continuar sem referências"""
+    if foto_em_uso(nome):
+        return
+    storage = storage_fotos()
+    if storage.exists(nome):
+        storage.delete(nome)
+    remover_rendicoes(nome, storage)
+    # Se o mesmo conteúdo for enviado de novo, as rendições são pedidas de novo
+    cache.delete_many([chave_pedido(nome), chave_falha(nome)])
+    Tarefa.objects.filter(chave=chave_tarefa(nome)).delete()
+
+
+def remover_rendicoes(nome, storage=None):
+    """Apaga as rendições da foto ``nome``"""
+    storage = storage or default_storage
+    for larguras in RENDICOES.values():
+        for largura in larguras:
+            for extensao in FORMATOS:
+                caminho = caminho_rendicao(nome, largura, extensao)
+                if storage.exists(caminho):
+                    storage.delete(caminho)
+    cache.delete(chave_cache(nome))
+
+
+def url_rendicao(nome, rendicao, extensao, storage=None):
+    """URL da menor largura da rendição"""
+    storage = storage or default_storage
+    return storage.url(caminho_rendicao(nome, RENDICOES[rendicao][0], extensao))
+
+
+def srcset(nome, rendicao, extensao, storage=None):
+    """Valor do atributo ``srcset`` com todas as larguras da rendição"""
+    storage = storage or default_storage
+    return ', '.join(
+        f'{storage.url(caminho_rendicao(nome, largura, extensao))} {largura}w'
+        for largura in RENDICOES[rendicao]
+    )
@@ -0,0 +1,39 @@
+"""
+Comando para arquivar os itens resolvidos, spam e expirados antigos (ex.: via cron)
+"""
+
+from django.core.management.base import BaseCommand
+
+from itens import arquivo
+
+
+class Command(BaseCommand):
+    help = 'Move os itens fora de circulação há mais de ARQUIVAMENTO_DIAS dias para as tabelas de arquivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=200,
+            help='Itens movidos por transação (padrão: 200)'
+        )
+        parser.add_argument(
+            '--pausa',
+            type=float,
+            default=0.1,
+            help='Segundos de espera entre os lotes (padrão: 0.1)'
+        )
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Apenas conta os itens que seriam arquivados'
+        )
+
+    def handle(self, *args, **options):
+        if options['simular']:
+            total = arquivo.candidatos().count()
+            self.stdout.write(self.style.SUCCESS(f'{total} item(ns) seriam arquivados.'))
+            return
+        # Interrompido no meio, basta rodar de novo: os lotes concluídos já saíram da tabela
+        total = arquivo.arquivar(lote=options['lote'], pausa=options['pausa'])
+        self.stdout.write(self.style.SUCCESS(f'{total} item(ns) arquivado(s).'))
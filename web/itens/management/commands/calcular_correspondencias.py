@@ -0,0 +1,24 @@
+"""
+Comando para recalcular as sugestões de correspondência de todos os itens ativos
+"""
+
+from django.core.management.base import BaseCommand
+
+from itens import correspondencias
+from itens.models import Item, SugestaoCorrespondencia
+
+
+class Command(BaseCommand):
+    help = 'Recalcula as sugestões de correspondência entre itens perdidos e encontrados'
+
+    def handle(self, *args, **options):
+        SugestaoCorrespondencia.objects.exclude(perdido__status='ativo', encontrado__status='ativo').delete()
+        # Todo par tem exatamente um item perdido: recalcular os perdidos cobre todos
+        itens = Item.objects.filter(tipo='perdido', status='ativo').order_by('pk')
+        total = sugestoes = 0
+        for item in itens.iterator():
+            sugestoes += correspondencias.atualizar(item)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'{sugestoes} sugestão(ões) para {total} item(ns) perdido(s).'
+        ))
@@ -0,0 +1,251 @@
+"""
+Comando que compara a vazão das páginas de leitura sob WSGI e sob ASGI
+
+As duas aplicações rodam no próprio processo, sobre o banco configurado (o
+mesmo conjunto de dados para as duas): o handler WSGI atendido por um pool
+de threads, como um worker ``gthread`` do gunicorn, e o handler ASGI por um
+loop de eventos com o mesmo número de requisições simultâneas, como um
+worker do uvicorn. Sob ASGI as páginas usam as views assíncronas (ver
+achados_perdidos_uft.rotas_asgi). Não mede a rede nem o servidor em si.
+
+Visitantes anônimos recebem as páginas do cache (ver itens.cache_paginas);
+com ``--usuario`` as requisições vão logadas e passam pelas views.
+"""
+
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from itens.models import Item
+
+
+def ambiente_wsgi(url, host, cookie):
+    partes = urlsplit(url)
+    ambiente = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': partes.path,
+        'QUERY_STRING': partes.query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': BytesIO(),
+        'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    if cookie:
+        ambiente['HTTP_COOKIE'] = cookie
+    return ambiente
+
+
+def escopo_asgi(url, host, cookie):
+    partes = urlsplit(url)
+    cabecalhos = [(b'host', host.encode())]
+    if cookie:
+        cabecalhos.append((b'cookie', cookie.encode()))
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': partes.path,
+        'raw_path': partes.path.encode(),
+        'root_path': '',
+        'query_string': partes.query.encode(),
+        'headers': cabecalhos,
+        'client': ('127.0.0.1', 0),
+        'server': (host, 80),
+    }
+
+
+def requisicao_wsgi(aplicacao, url, host, cookie):
+    """Executa uma requisição no handler WSGI; retorna o status HTTP"""
+    status = []
+    resposta = aplicacao(ambiente_wsgi(url, host, cookie), lambda linha, cabecalhos: status.append(linha))
+    try:
+        for _ in resposta:
+            pass
+    finally:
+        # Dispara request_finished (fecha a conexão com o banco, como o servidor faria)
+        resposta.close()
+    return int(status[0].split()[0])
+
+
+async def requisicao_asgi(aplicacao, url, host, cookie):
+    """Executa uma requisição no handler ASGI; retorna o status HTTP"""
+    status = []
+    corpo_enviado = False
+    desconectar = asyncio.Event()
+
+    async def receber():
+        nonlocal corpo_enviado
+        if not corpo_enviado:
+            corpo_enviado = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Cliente só "desconecta" depois de receber a resposta inteira
+        await desconectar.wait()
+        return {'type': 'http.disconnect'}
+
+    async def enviar(mensagem):
+        if mensagem['type'] == 'http.response.start':
+            status.append(mensagem['status'])
+        elif mensagem['type'] == 'http.response.body' and not mensagem.get('more_body'):
+            desconectar.set()
+
+    await aplicacao(escopo_asgi(url, host, cookie), receber, enviar)
+    return status[0]
+
+
+def resumo(latencias, duracao):
+    """(requisições/s, média e p95 em ms)"""
+    ordenadas = sorted(latencias)
+    p95 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.95))]
+    return len(latencias) / duracao, statistics.mean(latencias) * 1000, p95 * 1000
+
+
+def medir_wsgi(aplicacao, url, requisicoes, concorrencia, host, cookie):
+    latencias, erros = [], 0
+
+    def uma(_):
+        inicio = time.perf_counter()
+        status = requisicao_wsgi(aplicacao, url, host, cookie)
+        return status, time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(concorrencia) as executor:
+        for status, latencia in executor.map(uma, range(requisicoes)):
+            latencias.append(latencia)
+            erros += status != 200
+    return resumo(latencias, time.perf_counter() - inicio), erros
+
+
+async def medir_asgi(aplicacao, url, requisicoes, concorrencia, host, cookie):
+    latencias, erros = [], 0
+    vagas = asyncio.Semaphore(concorrencia)
+
+    async def uma():
+        nonlocal erros
+        async with vagas:
+            inicio = time.perf_counter()
+            status = await requisicao_asgi(aplicacao, url, host, cookie)
+            latencias.append(time.perf_counter() - inicio)
+            erros += status != 200
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(uma() for _ in range(requisicoes)))
+    return resumo(latencias, time.perf_counter() - inicio), erros
+
+
+class Command(BaseCommand):
+    help = 'Compara requisições por segundo das páginas de leitura sob WSGI e ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requisicoes',
+            type=int,
+            default=200,
+            help='Requisições por URL em cada servidor (padrão: 200)'
+        )
+        parser.add_argument(
+            '--concorrencia',
+            type=int,
+            default=8,
+            help='Requisições simultâneas: threads no WSGI, tarefas no ASGI (padrão: 8)'
+        )
+        parser.add_argument(
+            '--url',
+            action='append',
+            dest='urls',
+            help='URL a medir (pode ser repetido; padrão: páginas de leitura principais)'
+        )
+        parser.add_argument(
+            '--usuario',
+            help='Envia as requisições logadas como este usuário (fora do cache de páginas)'
+        )
+        parser.add_argument(
+            '--host',
+            default='localhost',
+            help='Cabeçalho Host das requisições (precisa estar em ALLOWED_HOSTS)'
+        )
+
+    def handle(self, *args, **options):
+        if options['requisicoes'] < 1 or options['concorrencia'] < 1:
+            raise CommandError('--requisicoes e --concorrencia devem ser positivos.')
+
+        urls = options['urls'] or self.urls_padrao()
+        sessao = self.criar_sessao(options['usuario']) if options['usuario'] else None
+        cookie = f'{settings.SESSION_COOKIE_NAME}={sessao.session_key}' if sessao else ''
+        host = options['host']
+
+        wsgi = WSGIHandler()
+        asgi = ASGIHandler()
+        self.stdout.write(
+            f'{options["requisicoes"]} requisições por URL, {options["concorrencia"]} simultâneas'
+            f'{" (logado como " + options["usuario"] + ")" if sessao else " (anônimo)"}'
+        )
+        self.stdout.write(f'{"URL":<32} {"servidor":<8} {"req/s":>9} {"média ms":>9} {"p95 ms":>9}')
+        try:
+            for url in urls:
+                # Aquecimento: imports, templates compilados, caches
+                requisicao_wsgi(wsgi, url, host, cookie)
+                asyncio.run(requisicao_asgi(asgi, url, host, cookie))
+
+                resultados = {
+                    'WSGI': medir_wsgi(wsgi, url, options['requisicoes'], options['concorrencia'], host, cookie),
+                    'ASGI': asyncio.run(
+                        medir_asgi(asgi, url, options['requisicoes'], options['concorrencia'], host, cookie)
+                    ),
+                }
+                for servidor, ((vazao, media, p95), erros) in resultados.items():
+                    linha = f'{url[:32]:<32} {servidor:<8} {vazao:>9.1f} {media:>9.1f} {p95:>9.1f}'
+                    if erros:
+                        linha += self.style.WARNING(f'  {erros} resposta(s) com status diferente de 200')
+                    self.stdout.write(linha)
+        finally:
+            if sessao:
+                sessao.delete()
+
+    def urls_padrao(self):
+        urls = [
+            reverse('pagina-inicial'),
+            reverse('itens:listar-itens'),
+            reverse('itens:listar-itens') + '?tipo=perdido&ordenacao=titulo',
+            reverse('itens:itens-recentes-api'),
+        ]
+        ultimo = Item.objects.filter(status='ativo').order_by('-pk').values_list('pk', flat=True).first()
+        if ultimo is None:
+            self.stdout.write(self.style.WARNING('Nenhum item ativo no banco: o detalhe fica de fora.'))
+        else:
+            urls.append(reverse('itens:detalhe-item', kwargs={'pk': ultimo}))
+        return urls
+
+    def criar_sessao(self, username):
+        try:
+            usuario = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f'Usuário {username!r} não encontrado.')
+        sessao = SessionStore()
+        sessao[SESSION_KEY] = str(usuario.pk)
+        sessao[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        sessao[HASH_SESSION_KEY] = usuario.get_session_auth_hash()
+        sessao.save()
+        return sessao
@@ -0,0 +1,24 @@
+"""
+Comando para gravar no banco as visualizações acumuladas no cache
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from achados_perdidos_uft.caches import compartilhado
+from itens import visualizacoes
+
+
+class Command(BaseCommand):
+    help = 'Grava no banco, em um único UPDATE, as visualizações acumuladas no cache'
+
+    def handle(self, *args, **options):
+        if not compartilhado():
+            # Este processo não enxerga as contagens acumuladas nos workers
+            raise CommandError(
+                'O cache padrão é do processo (locmem): cada worker já descarrega as próprias '
+                'visualizações. Use CACHE_BACKEND=arquivo ou redis para descarregar por este comando.'
+            )
+        total = visualizacoes.descarregar()
+        self.stdout.write(self.style.SUCCESS(
+            f'Visualizações descarregadas para {total} item(ns).'
+        ))
@@ -0,0 +1,35 @@
+"""
+Comando que avisa por e-mail os itens novos das buscas salvas (ex.: a cada hora via cron)
+"""
+
+from django.core.management.base import BaseCommand
+
+from itens import alertas
+
+
+class Command(BaseCommand):
+    help = 'Avalia todas as buscas salvas contra os itens novos e enfileira um e-mail por usuário'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Itens lidos do banco por vez (padrão: 500)'
+        )
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Apenas conta os avisos, sem enfileirar e-mails nem marcar os itens como avaliados'
+        )
+
+    def handle(self, *args, **options):
+        if options['simular']:
+            encontrados, _ = alertas.avaliar(lote=options['lote'])
+        else:
+            encontrados = alertas.executar(lote=options['lote'])
+        buscas = sum(len(por_busca) for por_busca in encontrados.values())
+        verbo = 'receberiam' if options['simular'] else 'receberão'
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(encontrados)} usuário(s) {verbo} aviso de {buscas} busca(s) com itens novos.'
+        ))
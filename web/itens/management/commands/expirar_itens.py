@@ -0,0 +1,54 @@
+"""
+Comando para expirar os itens ativos antigos (ex.: diariamente via cron)
+"""
+
+from django.core.management.base import BaseCommand
+
+from itens import expiracao
+
+
+class Command(BaseCommand):
+    help = 'Passa para "expirado" os itens ativos cadastrados há mais dias que o configurado e avisa os donos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Itens atualizados por transação (padrão: 500)'
+        )
+        parser.add_argument(
+            '--pausa',
+            type=float,
+            default=0.1,
+            help='Segundos de espera entre os lotes, para liberar o banco a outras escritas (padrão: 0.1)'
+        )
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Apenas conta os itens que expirariam'
+        )
+        parser.add_argument(
+            '--sem-aviso',
+            action='store_true',
+            help='Não envia e-mail aos donos'
+        )
+
+    def handle(self, *args, **options):
+        if options['simular']:
+            total = 0
+            for categoria, tipo, limite in expiracao.grupos():
+                quantidade = expiracao.vencidos(categoria, tipo, limite).count()
+                if quantidade:
+                    self.stdout.write(f'{categoria}/{tipo}: {quantidade}')
+                    total += quantidade
+            self.stdout.write(self.style.SUCCESS(f'{total} item(ns) expirariam.'))
+            return
+
+        expirados = expiracao.expirar(lote=options['lote'], pausa=options['pausa'])
+        if not options['sem_aviso']:
+            expiracao.notificar(expirados)
+        total = sum(len(ids) for ids in expirados.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} item(ns) expirado(s) de {len(expirados)} usuário(s).'
+        ))
@@ -0,0 +1,40 @@
+"""
+Comando para gerar as rendições das fotos já cadastradas
+"""
+
+from django.core.management.base import BaseCommand
+
+from itens import imagens
+from itens.models import Item
+
+
+class Command(BaseCommand):
+    help = 'Gera as rendições (miniatura, detalhe e placeholder) das fotos dos itens'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--forcar',
+            action='store_true',
+            help='Regera também as rendições que já existem'
+        )
+
+    def handle(self, *args, **options):
+        geradas = falhas = 0
+        # Itens com o mesmo conteúdo compartilham a foto (ver itens.armazenamento)
+        fotos = Item.objects.exclude(foto='').exclude(foto__isnull=True).order_by('foto').values_list(
+            'foto', flat=True
+        ).distinct()
+        storage = Item._meta.get_field('foto').storage
+        for nome in fotos.iterator():
+            if options['forcar']:
+                imagens.remover_rendicoes(nome, storage)
+            elif imagens.rendicoes_prontas(nome, storage):
+                continue
+            if imagens.garantir_rendicoes(nome, storage):
+                geradas += 1
+            else:
+                falhas += 1
+                self.stderr.write(f'Falha ao processar {nome}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendições geradas para {geradas} foto(s) ({falhas} falha(s)).'
+        ))
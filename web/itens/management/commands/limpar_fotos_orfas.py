@@ -0,0 +1,75 @@
+"""
+Comando para apagar arquivos de fotos (e rendições) que nenhum item usa
+"""
+
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from itens import armazenamento, imagens
+from itens.models import Item, ItemArquivado
+
+
+def listar_arquivos(storage, diretorio):
+    """Caminhos de todos os arquivos sob ``diretorio``, recursivamente"""
+    if not storage.exists(diretorio):
+        return
+    subdiretorios, arquivos = storage.listdir(diretorio)
+    for arquivo in arquivos:
+        yield f'{diretorio}/{arquivo}'
+    for subdiretorio in subdiretorios:
+        yield from listar_arquivos(storage, f'{diretorio}/{subdiretorio}')
+
+
+class Command(BaseCommand):
+    help = 'Apaga as fotos e rendições sem nenhum item que as referencie'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--idade',
+            type=int,
+            default=60,
+            help='Só apaga arquivos modificados há mais de N minutos (padrão: 60)'
+        )
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Apenas lista o que seria apagado'
+        )
+
+    def handle(self, *args, **options):
+        storage = imagens.storage_fotos()
+        # Arquivos recentes podem ser de um upload ainda não confirmado
+        limite = timezone.now() - timedelta(minutes=options['idade'])
+        referenciadas = {
+            nome
+            for modelo in (Item, ItemArquivado)
+            for nome in modelo.objects.exclude(foto='').exclude(foto__isnull=True).values_list('foto', flat=True)
+        }
+        diretorios_rendicoes = {imagens.diretorio_rendicoes(nome) for nome in referenciadas}
+
+        orfaos = [
+            caminho for caminho in listar_arquivos(storage, armazenamento.DIRETORIO)
+            if caminho not in referenciadas
+        ] + [
+            caminho for caminho in listar_arquivos(storage, imagens.DIRETORIO)
+            if posixpath.dirname(caminho) not in diretorios_rendicoes
+        ]
+
+        apagados = tamanho = 0
+        for caminho in orfaos:
+            if storage.get_modified_time(caminho) > limite:
+                continue
+            tamanho += storage.size(caminho)
+            apagados += 1
+            if options['simular']:
+                self.stdout.write(caminho)
+            else:
+                storage.delete(caminho)
+
+        acao = 'seriam apagados' if options['simular'] else 'apagados'
+        self.stdout.write(self.style.SUCCESS(
+            f'{apagados} arquivo(s) sem referência {acao} ({tamanho / (1024 * 1024):.1f} MB).'
+        ))
@@ -0,0 +1,20 @@
+"""
+Comando para apagar registros antigos de itens removidos
+"""
+
+from django.core.management.base import BaseCommand
+
+from itens import sincronizacao
+
+
+class Command(BaseCommand):
+    help = (
+        'Apaga os registros de itens removidos mais antigos que '
+        'SINCRONIZACAO_RETENCAO_DIAS (usados pela sincronização do aplicativo)'
+    )
+
+    def handle(self, *args, **options):
+        total = sincronizacao.limpar_remocoes()
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} registro(s) de remoção apagado(s).'
+        ))
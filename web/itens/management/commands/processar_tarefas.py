@@ -0,0 +1,105 @@
+"""
+Comando que executa a fila de tarefas em segundo plano (ver itens.tarefas)
+"""
+
+import multiprocessing
+import signal
+import time
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def trabalhar(intervalo, lote, encerrar):
+    """Laço de um processo trabalhador: executa tarefas até ``encerrar`` ser sinalizado"""
+    # Em sistemas sem fork o processo filho começa do zero
+    django.setup()
+    from itens import tarefas
+
+    # O processo principal coordena o encerramento pelo evento
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    while not encerrar.is_set():
+        concluidas, falhas = tarefas.processar_pendentes(lote)
+        if not concluidas and not falhas:
+            encerrar.wait(intervalo)
+    connections.close_all()
+
+
+def interromper(numero, quadro):
+    raise KeyboardInterrupt
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas em segundo plano (rendições de fotos etc.) em um ou mais processos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processos',
+            type=int,
+            default=1,
+            help='Número de processos trabalhadores (padrão: 1)'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=2,
+            help='Segundos de espera quando a fila está vazia (padrão: 2)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=10,
+            help='Tarefas reservadas por vez em cada processo (padrão: 10)'
+        )
+        parser.add_argument(
+            '--uma-vez',
+            action='store_true',
+            help='Executa as tarefas prontas e termina (útil em cron e testes)'
+        )
+
+    def handle(self, *args, **options):
+        from itens import tarefas
+
+        if options['uma_vez']:
+            concluidas, falhas = tarefas.processar_pendentes(options['lote'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{concluidas} tarefa(s) concluída(s), {falhas} falha(s).'
+            ))
+            return
+
+        # Conexões abertas não podem ser compartilhadas com os processos filhos
+        connections.close_all()
+        encerrar = multiprocessing.Event()
+
+        def iniciar(numero):
+            processo = multiprocessing.Process(
+                target=trabalhar,
+                args=(options['intervalo'], options['lote'], encerrar),
+                name=f'trabalhador-{numero}'
+            )
+            processo.start()
+            return processo
+
+        # SIGTERM (systemd, docker stop) encerra como o Ctrl+C
+        signal.signal(signal.SIGTERM, interromper)
+        processos = [iniciar(numero) for numero in range(options['processos'])]
+        self.stdout.write(f'{len(processos)} processo(s) trabalhador(es) iniciado(s). Ctrl+C para encerrar.')
+
+        try:
+            while True:
+                time.sleep(1)
+                for numero, processo in enumerate(processos):
+                    if not processo.is_alive():
+                        self.stderr.write(
+                            f'{processo.name} terminou (código {processo.exitcode}); reiniciando.'
+                        )
+                        processos[numero] = iniciar(numero)
+        except KeyboardInterrupt:
+            self.stdout.write('Encerrando após as tarefas em andamento...')
+        finally:
+            encerrar.set()
+            for processo in processos:
+                processo.join()
+        self.stdout.write(self.style.SUCCESS('Trabalhadores encerrados.'))
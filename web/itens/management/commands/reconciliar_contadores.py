@@ -0,0 +1,28 @@
+"""
+Comando para recalcular os contadores do painel a partir da tabela de itens
+"""
+
+from django.core.management.base import BaseCommand
+
+from itens import contadores, notificacoes
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula do zero os contadores de itens por tipo e status '
+        'e os contadores de contatos não lidos por usuário'
+    )
+
+    def handle(self, *args, **options):
+        divergencias = contadores.reconciliar()
+        for tipo, status, anterior, atual in divergencias:
+            self.stdout.write(f'{tipo}/{status}: {anterior} -> {atual}')
+
+        divergencias_notificacoes = notificacoes.reconciliar()
+        for usuario_id, anterior, atual in divergencias_notificacoes:
+            self.stdout.write(f'usuário {usuario_id}: {anterior} -> {atual} contato(s) não lido(s)')
+
+        total = len(divergencias) + len(divergencias_notificacoes)
+        self.stdout.write(self.style.SUCCESS(
+            f'Contadores reconciliados ({total} divergência(s) corrigida(s)).'
+        ))
@@ -0,0 +1,17 @@
+"""
+Comando para reconstruir o índice de itens similares
+"""
+
+from django.core.management.base import BaseCommand
+
+from itens import similares
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os vetores TF-IDF e os vizinhos mais próximos de todos os itens ativos'
+
+    def handle(self, *args, **options):
+        total = similares.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f'Índice de similares reconstruído para {total} item(ns).'
+        ))
@@ -0,0 +1,24 @@
+"""
+Comando para reconstruir o índice de busca textual dos itens
+"""
+
+from django.core.management.base import BaseCommand
+
+from itens.busca import obter_backend
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca textual de todos os itens'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=500,
+            help='Quantidade de itens lidos do banco por vez (padrão: 500)'
+        )
+
+    def handle(self, *args, **options):
+        backend = obter_backend()
+        total = backend.reconstruir(lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Índice de busca reconstruído ({backend.__class__.__name__}): {total} itens indexados.'
+        ))
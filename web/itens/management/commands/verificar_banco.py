@@ -0,0 +1,67 @@
+"""
+Comando que mostra a configuração do SQLite em vigor (ver achados_perdidos_uft.banco)
+"""
+
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from achados_perdidos_uft import banco
+
+# Valores numéricos devolvidos pelo SQLite -> nomes usados na configuração
+NOMES = {
+    'synchronous': {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'},
+    'temp_store': {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Mostra os PRAGMAs em vigor na conexão com o banco e aponta divergências da configuração'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--integridade',
+            action='store_true',
+            help='Executa também o PRAGMA quick_check (lê o banco inteiro)'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'O banco configurado não é SQLite ({connection.vendor}).')
+
+        connection.ensure_connection()
+        opcoes = connection.settings_dict.get('OPTIONS', {})
+        self.stdout.write(f'Arquivo: {connection.settings_dict["NAME"]}')
+        self.stdout.write(f'SQLite {sqlite3.sqlite_version}')
+        self.stdout.write(f'Início das transações: {opcoes.get("transaction_mode") or "DEFERRED"}')
+
+        esperados = banco.pragmas()
+        divergencias = 0
+        for pragma, valor in banco.pragmas_em_vigor(connection).items():
+            valor = NOMES.get(pragma, {}).get(valor, valor)
+            linha = f'{pragma} = {valor}'
+            esperado = esperados.get(pragma)
+            if valor is None:
+                self.stdout.write(f'{pragma} = (não se aplica)')
+            elif esperado is not None and str(valor).upper() != str(esperado).upper():
+                divergencias += 1
+                self.stdout.write(self.style.WARNING(f'{linha} (configurado: {esperado})'))
+            else:
+                self.stdout.write(linha)
+
+        if options['integridade']:
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA quick_check')
+                resultado = [linha[0] for linha in cursor.fetchall()]
+            if resultado != ['ok']:
+                raise CommandError('Banco corrompido:\n' + '\n'.join(resultado))
+            self.stdout.write('quick_check = ok')
+
+        if divergencias:
+            self.stdout.write(self.style.WARNING(
+                f'{divergencias} PRAGMA(s) diferente(s) do configurado '
+                '(ex.: banco em memória não usa WAL).'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('Configuração do banco em vigor.'))
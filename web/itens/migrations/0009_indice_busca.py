@@ -0,0 +1,49 @@
+from django.db import migrations
+
+TABELA_BUSCA = "itens_item_busca"
+
+
+def criar_indice_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_BUSCA} USING fts5("
+            "titulo, descricao, local_especifico, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABELA_BUSCA} ("
+            "item_id bigint PRIMARY KEY REFERENCES itens_item (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "documento tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {TABELA_BUSCA}_documento_gin "
+            f"ON {TABELA_BUSCA} USING GIN (documento)"
+        )
+
+
+def remover_indice_busca(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {TABELA_BUSCA}")
+
+
+def popular_indice_busca(apps, schema_editor):
+    from itens.busca import obter_backend
+
+    Item = apps.get_model("itens", "Item")
+    conexao = schema_editor.connection
+    obter_backend(conexao).reconstruir(Item.objects.using(conexao.alias))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0008_add_contato_item"),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+        migrations.RunPython(popular_indice_busca, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:27
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def popular_contadores(apps, schema_editor):
+    Item = apps.get_model('itens', 'Item')
+    ContadorItens = apps.get_model('itens', 'ContadorItens')
+    grupos = Item.objects.order_by().values('tipo', 'status').annotate(quantidade=Count('id'))
+    ContadorItens.objects.bulk_create([
+        ContadorItens(tipo=grupo['tipo'], status=grupo['status'], total=grupo['quantidade'])
+        for grupo in grupos
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itens', '0009_indice_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorItens',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('perdido', 'Item Perdido'), ('encontrado', 'Item Encontrado')], max_length=10)),
+                ('status', models.CharField(choices=[('ativo', 'Ativo'), ('resolvido', 'Resolvido'), ('spam', 'Spam'), ('expirado', 'Expirado')], max_length=10)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contador de itens',
+                'verbose_name_plural': 'Contadores de itens',
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'status'), name='contador_tipo_status_unico')],
+            },
+        ),
+        migrations.RunPython(popular_contadores, migrations.RunPython.noop),
+    ]
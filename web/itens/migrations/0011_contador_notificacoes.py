@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("itens", "0010_contadores_itens"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContadorNotificacoes",
+            fields=[
+                (
+                    "usuario",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="contador_notificacoes",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("contatos_nao_lidos", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Contador de notificações",
+                "verbose_name_plural": "Contadores de notificações",
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:43
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0011_contador_notificacoes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemRemovido",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "item_id",
+                    models.PositiveIntegerField(help_text="Id do item excluído"),
+                ),
+                (
+                    "data_remocao",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "verbose_name": "Item removido",
+                "verbose_name_plural": "Itens removidos",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["data_atualizacao"], name="itens_item_data_at_024701_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="itemremovido",
+            index=models.Index(
+                fields=["data_remocao"], name="itens_itemr_data_re_f38b0e_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0012_sincronizacao_itens"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tarefa",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "nome",
+                    models.CharField(
+                        help_text="Nome da tarefa registrada", max_length=100
+                    ),
+                ),
+                ("argumentos", models.JSONField(blank=True, default=dict)),
+                (
+                    "chave",
+                    models.CharField(
+                        blank=True,
+                        help_text="Chave de idempotência: a mesma chave só é enfileirada uma vez",
+                        max_length=255,
+                        null=True,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pendente", "Pendente"),
+                            ("executando", "Executando"),
+                            ("concluida", "Concluída"),
+                            ("falhou", "Falhou"),
+                        ],
+                        default="pendente",
+                        max_length=10,
+                    ),
+                ),
+                ("tentativas", models.PositiveIntegerField(default=0)),
+                ("max_tentativas", models.PositiveIntegerField(default=3)),
+                (
+                    "executar_apos",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("erro", models.TextField(blank=True)),
+                ("data_criacao", models.DateTimeField(auto_now_add=True)),
+                ("data_atualizacao", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Tarefa",
+                "verbose_name_plural": "Tarefas",
+                "ordering": ["executar_apos", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "executar_apos"],
+                        name="itens_taref_status_fd39c4_idx",
+                    )
+                ],
+            },
+        ),
+    ]
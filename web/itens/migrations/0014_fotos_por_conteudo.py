@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:58
+
+import itens.armazenamento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0013_fila_tarefas"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="item",
+            name="foto",
+            field=models.ImageField(
+                blank=True,
+                help_text="Foto do item (opcional, mas recomendada)",
+                null=True,
+                storage=itens.armazenamento.armazenamento_fotos,
+                upload_to="itens/fotos/",
+            ),
+        ),
+    ]
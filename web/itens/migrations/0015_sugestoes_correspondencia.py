@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0014_fotos_por_conteudo"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SugestaoCorrespondencia",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("pontuacao", models.FloatField(help_text="Semelhança entre 0 e 1")),
+                (
+                    "detalhes",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Pontuação de cada critério (texto, bloco, tempo)",
+                    ),
+                ),
+                ("data_calculo", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Sugestão de correspondência",
+                "verbose_name_plural": "Sugestões de correspondência",
+                "ordering": ["-pontuacao"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["categoria", "tipo", "status", "data_ocorrencia"],
+                name="itens_item_categor_bc98bb_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sugestaocorrespondencia",
+            name="encontrado",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sugestoes_como_encontrado",
+                to="itens.item",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sugestaocorrespondencia",
+            name="perdido",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sugestoes_como_perdido",
+                to="itens.item",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sugestaocorrespondencia",
+            index=models.Index(
+                fields=["perdido", "-pontuacao"], name="itens_suges_perdido_b74ad9_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sugestaocorrespondencia",
+            index=models.Index(
+                fields=["encontrado", "-pontuacao"],
+                name="itens_suges_encontr_2e0c7a_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sugestaocorrespondencia",
+            constraint=models.UniqueConstraint(
+                fields=("perdido", "encontrado"), name="sugestao_par_unico"
+            ),
+        ),
+    ]
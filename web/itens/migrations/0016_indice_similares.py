@@ -0,0 +1,108 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0015_sugestoes_correspondencia"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemSimilar",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "pontuacao",
+                    models.FloatField(help_text="Similaridade de cosseno entre 0 e 1"),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similares",
+                        to="itens.item",
+                    ),
+                ),
+                (
+                    "similar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_a",
+                        to="itens.item",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Item similar",
+                "verbose_name_plural": "Itens similares",
+                "ordering": ["-pontuacao"],
+                "indexes": [
+                    models.Index(
+                        fields=["item", "-pontuacao"],
+                        name="itens_items_item_id_25c33e_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("item", "similar"), name="item_similar_unico"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="TermoItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("termo", models.CharField(max_length=50)),
+                (
+                    "peso",
+                    models.FloatField(
+                        help_text="Peso TF-IDF normalizado (vetor de norma 1)"
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="termos",
+                        to="itens.item",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Termo do item",
+                "verbose_name_plural": "Termos dos itens",
+                "indexes": [
+                    models.Index(
+                        fields=["termo", "item", "peso"],
+                        name="itens_termo_termo_886160_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("item", "termo"), name="termo_item_unico"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,238 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:13
+
+import django.db.models.deletion
+import django.utils.timezone
+import itens.armazenamento
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0016_indice_similares"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemArquivado",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("titulo", models.CharField(max_length=200)),
+                ("descricao", models.TextField(max_length=1000)),
+                (
+                    "categoria",
+                    models.CharField(
+                        choices=[
+                            ("eletronicos", "Eletrônicos"),
+                            ("documentos", "Documentos"),
+                            ("roupas_acessorios", "Roupas e Acessórios"),
+                            ("livros_material", "Livros e Material Escolar"),
+                            ("chaves", "Chaves"),
+                            ("carteira_bolsa", "Carteira/Bolsa"),
+                            ("joias_bijuterias", "Joias e Bijuterias"),
+                            ("oculos", "Óculos"),
+                            ("equipamentos_esportivos", "Equipamentos Esportivos"),
+                            ("instrumentos_musicais", "Instrumentos Musicais"),
+                            ("medicamentos", "Medicamentos"),
+                            ("outros", "Outros"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("perdido", "Item Perdido"),
+                            ("encontrado", "Item Encontrado"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "bloco",
+                    models.CharField(
+                        choices=[
+                            ("bloco_1", "Bloco 1"),
+                            ("bloco_2", "Bloco 2"),
+                            ("bloco_3", "Bloco 3"),
+                            ("bloco_a", "Bloco A"),
+                            ("bloco_b", "Bloco B"),
+                            ("bloco_c", "Bloco C"),
+                            ("bloco_d", "Bloco D"),
+                            ("bloco_e", "Bloco E"),
+                            ("bloco_f", "Bloco F"),
+                            ("bloco_g", "Bloco G"),
+                            ("bloco_h", "Bloco H"),
+                            ("bloco_i", "Bloco I"),
+                            ("bloco_j", "Bloco J"),
+                            ("calendoscopio", "Calendoscópio/Jornalismo"),
+                            ("biblioteca", "Biblioteca Central"),
+                            ("restaurante_ru", "RU - Restaurante Universitário"),
+                            ("restaurante_fa", "Restaurante Fazendinha"),
+                            ("secretaria", "Secretaria Acadêmica"),
+                            (
+                                "coordenacao_ccomp",
+                                "Coordenação de Curso Ciência da Computação",
+                            ),
+                            (
+                                "ca_ccomp",
+                                "CA - Centro Acadêmico de Ciência da Computação",
+                            ),
+                            ("dojo", "Dojô - Sala de Estudos"),
+                            ("diretoria", "Diretoria do Campus de Palmas"),
+                            ("reitoria", "Reitoria"),
+                            ("lanchonete", "Lanchonete"),
+                            ("cuica", "Cuica - CUICA"),
+                            ("labtec", "LabTec"),
+                            ("prainha", "Praianha"),
+                            ("pista_campo", "Pista de Corrida/Campo de Futebol"),
+                            ("ponto_onibus", "Ponto de Ônibus Principal"),
+                            ("ponto_onibus_reitoria", "Ponto de Ônibus Reitoria"),
+                            ("ponto_onibus_j", "Ponto de Ônibus Bloco J"),
+                            ("ponto_onibus_jornalismo", "Ponto de Ônibus Jornalismo"),
+                            ("outro", "Outro Local"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "local_especifico",
+                    models.CharField(blank=True, max_length=200, null=True),
+                ),
+                (
+                    "foto",
+                    models.ImageField(
+                        blank=True,
+                        null=True,
+                        storage=itens.armazenamento.armazenamento_fotos,
+                        upload_to="itens/fotos/",
+                    ),
+                ),
+                ("data_postagem", models.DateTimeField()),
+                ("data_ocorrencia", models.DateTimeField()),
+                ("data_atualizacao", models.DateTimeField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("ativo", "Ativo"),
+                            ("resolvido", "Resolvido"),
+                            ("spam", "Spam"),
+                            ("expirado", "Expirado"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("data_resolucao", models.DateTimeField(blank=True, null=True)),
+                (
+                    "telefone_contato",
+                    models.CharField(blank=True, max_length=20, null=True),
+                ),
+                (
+                    "email_contato",
+                    models.EmailField(blank=True, max_length=254, null=True),
+                ),
+                ("visualizacoes", models.PositiveIntegerField(default=0)),
+                ("prioridade", models.BooleanField(default=False)),
+                (
+                    "data_arquivamento",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "resolvido_por",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="itens_arquivados_resolvidos",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="itens_arquivados",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Item arquivado",
+                "verbose_name_plural": "Itens arquivados",
+                "ordering": ["-data_postagem"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ContatoArquivado",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("mensagem", models.TextField(max_length=500)),
+                ("data_contato", models.DateTimeField()),
+                ("visualizado", models.BooleanField(default=False)),
+                (
+                    "usuario_interessado",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contatos_arquivados",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contatos",
+                        to="itens.itemarquivado",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Contato arquivado",
+                "verbose_name_plural": "Contatos arquivados",
+                "ordering": ["-data_contato"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ComentarioArquivado",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("texto", models.TextField(max_length=500)),
+                ("data_comentario", models.DateTimeField()),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="comentarios",
+                        to="itens.itemarquivado",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Comentário arquivado",
+                "verbose_name_plural": "Comentários arquivados",
+                "ordering": ["data_comentario"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="itemarquivado",
+            index=models.Index(
+                fields=["usuario", "-data_arquivamento"],
+                name="itens_itema_usuario_897592_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="itemarquivado",
+            index=models.Index(fields=["foto"], name="itens_itema_foto_19d343_idx"),
+        ),
+    ]
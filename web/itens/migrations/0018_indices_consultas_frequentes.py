@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0017_arquivo_itens"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="item",
+            name="itens_item_tipo_ecaa8a_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="item",
+            name="itens_item_categor_0cd1d0_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="item",
+            name="itens_item_bloco_38e547_idx",
+        ),
+        migrations.AddIndex(
+            model_name="contatoitem",
+            index=models.Index(
+                fields=["item", "visualizado"], name="itens_conta_item_id_14977a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["status", "-data_postagem"], name="itens_item_status_311799_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["tipo", "status", "-data_postagem"],
+                name="itens_item_tipo_d18dd0_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["categoria", "status", "-data_postagem"],
+                name="itens_item_categor_245f23_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["bloco", "status", "-data_postagem"],
+                name="itens_item_bloco_27acf7_idx",
+            ),
+        ),
+    ]
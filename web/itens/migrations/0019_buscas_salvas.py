@@ -0,0 +1,157 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:56
+
+import django.db.models.deletion
+import itens.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0018_indices_consultas_frequentes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BuscaSalva",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("nome", models.CharField(max_length=100)),
+                (
+                    "busca",
+                    models.CharField(
+                        blank=True, help_text="Texto buscado", max_length=100
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("perdido", "Item Perdido"),
+                            ("encontrado", "Item Encontrado"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "categoria",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("eletronicos", "Eletrônicos"),
+                            ("documentos", "Documentos"),
+                            ("roupas_acessorios", "Roupas e Acessórios"),
+                            ("livros_material", "Livros e Material Escolar"),
+                            ("chaves", "Chaves"),
+                            ("carteira_bolsa", "Carteira/Bolsa"),
+                            ("joias_bijuterias", "Joias e Bijuterias"),
+                            ("oculos", "Óculos"),
+                            ("equipamentos_esportivos", "Equipamentos Esportivos"),
+                            ("instrumentos_musicais", "Instrumentos Musicais"),
+                            ("medicamentos", "Medicamentos"),
+                            ("outros", "Outros"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "bloco",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("bloco_1", "Bloco 1"),
+                            ("bloco_2", "Bloco 2"),
+                            ("bloco_3", "Bloco 3"),
+                            ("bloco_a", "Bloco A"),
+                            ("bloco_b", "Bloco B"),
+                            ("bloco_c", "Bloco C"),
+                            ("bloco_d", "Bloco D"),
+                            ("bloco_e", "Bloco E"),
+                            ("bloco_f", "Bloco F"),
+                            ("bloco_g", "Bloco G"),
+                            ("bloco_h", "Bloco H"),
+                            ("bloco_i", "Bloco I"),
+                            ("bloco_j", "Bloco J"),
+                            ("calendoscopio", "Calendoscópio/Jornalismo"),
+                            ("biblioteca", "Biblioteca Central"),
+                            ("restaurante_ru", "RU - Restaurante Universitário"),
+                            ("restaurante_fa", "Restaurante Fazendinha"),
+                            ("secretaria", "Secretaria Acadêmica"),
+                            (
+                                "coordenacao_ccomp",
+                                "Coordenação de Curso Ciência da Computação",
+                            ),
+                            (
+                                "ca_ccomp",
+                                "CA - Centro Acadêmico de Ciência da Computação",
+                            ),
+                            ("dojo", "Dojô - Sala de Estudos"),
+                            ("diretoria", "Diretoria do Campus de Palmas"),
+                            ("reitoria", "Reitoria"),
+                            ("lanchonete", "Lanchonete"),
+                            ("cuica", "Cuica - CUICA"),
+                            ("labtec", "LabTec"),
+                            ("prainha", "Praianha"),
+                            ("pista_campo", "Pista de Corrida/Campo de Futebol"),
+                            ("ponto_onibus", "Ponto de Ônibus Principal"),
+                            ("ponto_onibus_reitoria", "Ponto de Ônibus Reitoria"),
+                            ("ponto_onibus_j", "Ponto de Ônibus Bloco J"),
+                            ("ponto_onibus_jornalismo", "Ponto de Ônibus Jornalismo"),
+                            ("outro", "Outro Local"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "prioridade",
+                    models.BooleanField(
+                        default=False, help_text="Apenas itens prioritários"
+                    ),
+                ),
+                (
+                    "alerta",
+                    models.BooleanField(
+                        default=True, help_text="Enviar e-mail com os itens novos"
+                    ),
+                ),
+                (
+                    "ultimo_item",
+                    models.PositiveIntegerField(
+                        default=itens.models.ultimo_item_id,
+                        help_text="Id do último item já avaliado para o alerta",
+                    ),
+                ),
+                ("data_criacao", models.DateTimeField(auto_now_add=True)),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="buscas_salvas",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Busca salva",
+                "verbose_name_plural": "Buscas salvas",
+                "ordering": ["-data_criacao"],
+                "indexes": [
+                    models.Index(
+                        fields=["usuario", "-data_criacao"],
+                        name="itens_busca_usuario_bc4d84_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0019_buscas_salvas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tarefa",
+            name="repetir",
+            field=models.BooleanField(
+                default=False,
+                help_text="Enfileirada de novo durante a execução: volta para a fila ao terminar",
+            ),
+        ),
+    ]
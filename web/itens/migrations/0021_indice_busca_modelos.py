@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:31
+
+import django.db.models.deletion
+import itens.busca
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("itens", "0020_tarefa_repetir"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndiceBuscaPostgres",
+            fields=[
+                (
+                    "item",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="indice_postgres",
+                        serialize=False,
+                        to="itens.item",
+                    ),
+                ),
+                ("documento", itens.busca.CampoBusca()),
+            ],
+            options={
+                "db_table": "itens_item_busca",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="IndiceBuscaSQLite",
+            fields=[
+                (
+                    "item",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="indice_sqlite",
+                        serialize=False,
+                        to="itens.item",
+                    ),
+                ),
+                ("documento", itens.busca.CampoBusca(db_column="itens_item_busca")),
+            ],
+            options={
+                "db_table": "itens_item_busca",
+                "managed": False,
+            },
+        ),
+    ]
@@ -5,11 +5,17 @@ Este módulo contém os modelos de dados para gerenciar itens perdidos e encontr
 no campus da Universidade Federal do Tocantins.
 """
 
+from urllib.parse import urlencode
+
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.urls import reverse
 
+from itens.armazenamento import armazenamento_fotos
+from itens.busca import CampoBusca, TABELA_BUSCA
+
 # Choices para tipos de item
 TIPO_ITEM_CHOICES = [
     ('perdido', 'Item Perdido'),
@@ -96,6 +102,32 @@ class ItemManager(models.Manager):
     def recentes(self, limite=10):
         """Retorna itens mais recentes"""
         return self.filter(status='ativo').order_by('-data_postagem')[:limite]
+    
+    def com_contagens(self):
+        """
+        Anota num_comentarios, num_contatos e num_contatos_nao_lidos
+        (evita uma consulta COUNT por item nos templates)
+
+        Cada contagem é uma subconsulta por item: contar comentários e contatos
+        com dois LEFT JOINs no mesmo GROUP BY montaria comentários × contatos
+        linhas por item antes do DISTINCT.
+        """
+        return self.annotate(
+            num_comentarios=_contagem(Comentario.objects.all()),
+            num_contatos=_contagem(ContatoItem.objects.all()),
+            num_contatos_nao_lidos=_contagem(ContatoItem.objects.filter(visualizado=False)),
+        )
+
+
+def _contagem(relacionados):
+    """Subconsulta correlacionada com o número de linhas de ``relacionados`` do item"""
+    return Coalesce(
+        models.Subquery(
+            relacionados.filter(item=models.OuterRef('pk'))
+            .order_by().values('item').annotate(total=models.Count('*')).values('total')
+        ),
+        0,
+    )
 
 class Item(models.Model):
     """
@@ -138,6 +170,7 @@ class Item(models.Model):
     # Imagem do item
     foto = models.ImageField(
         upload_to='itens/fotos/', 
+        storage=armazenamento_fotos,
         blank=True, 
         null=True,
         help_text="Foto do item (opcional, mas recomendada)"
@@ -216,15 +249,32 @@ class Item(models.Model):
         verbose_name = 'Item'
         verbose_name_plural = 'Itens'
         indexes = [
-            models.Index(fields=['tipo', 'status']),
-            models.Index(fields=['categoria']),
-            models.Index(fields=['bloco']),
+            # Listagem pública: status IN (...) [AND tipo/categoria/bloco] ORDER BY
+            # data_postagem DESC; com um único status (ex.: página inicial, só ativos)
+            # a ordenação sai pronta do índice (ver test_desempenho.PlanosConsultaTest).
+            # Índices parciais por status não servem: o Django envia o status como
+            # parâmetro e o SQLite só usa um índice parcial quando a condição aparece
+            # literalmente na consulta.
+            models.Index(fields=['status', '-data_postagem']),
+            models.Index(fields=['tipo', 'status', '-data_postagem']),
+            models.Index(fields=['categoria', 'status', '-data_postagem']),
+            models.Index(fields=['bloco', 'status', '-data_postagem']),
             models.Index(fields=['-data_postagem']),
+            models.Index(fields=['data_atualizacao']),
+            # Candidatos do motor de correspondência (ver itens.correspondencias)
+            models.Index(fields=['categoria', 'tipo', 'status', 'data_ocorrencia']),
         ]
     
     def __str__(self):
         return f'{self.get_tipo_display()}: {self.titulo} - {self.get_bloco_display()}'
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Guarda os valores carregados do banco para detectar alterações no save"""
+        instance = super().from_db(db, field_names, values)
+        instance._valores_originais = dict(zip(field_names, values))
+        return instance
+    
     def get_absolute_url(self):
         """URL para visualizar o item"""
         return reverse('detalhe-item', kwargs={'pk': self.pk})
@@ -253,10 +303,15 @@ class Item(models.Model):
             self.resolvido_por = usuario
         self.save()
     
-    def incrementar_visualizacoes(self):
-        """Incrementa o contador de visualizações"""
-        self.visualizacoes += 1
-        self.save(update_fields=['visualizacoes'])
+    def incrementar_visualizacoes(self, quantidade=1):
+        """
+        Incrementa o contador de visualizações de forma atômica no banco
+        (as visualizações das páginas passam pelo buffer de itens.visualizacoes)
+        """
+        Item.objects.filter(pk=self.pk).update(
+            visualizacoes=models.F('visualizacoes') + quantidade
+        )
+        self.visualizacoes += quantidade
     
     def dias_desde_postagem(self):
         """Retorna quantos dias se passaram desde a postagem"""
@@ -282,6 +337,8 @@ class Item(models.Model):
     
     def contatos_nao_lidos(self):
         """Retorna o número de contatos não lidos para este item"""
+        if hasattr(self, 'num_contatos_nao_lidos'):
+            return self.num_contatos_nao_lidos
         return self.contatos.filter(visualizado=False).count()
 
 
@@ -335,6 +392,384 @@ class ContatoItem(models.Model):
         ordering = ['-data_contato']
         verbose_name = 'Contato'
         verbose_name_plural = 'Contatos'
+        indexes = [
+            # Contatos não lidos nos itens de um usuário (ver itens.notificacoes)
+            models.Index(fields=['item', 'visualizado']),
+        ]
         
     def __str__(self):
         return f'Contato de {self.usuario_interessado.username} sobre {self.item.titulo}'
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Guarda os valores carregados do banco para detectar alterações no save"""
+        instance = super().from_db(db, field_names, values)
+        instance._valores_originais = dict(zip(field_names, values))
+        return instance
+
+
+class IndiceBuscaSQLite(models.Model):
+    """
+    Tabela virtual FTS5 da busca no SQLite (criada pela migração 0009, ver
+    itens.busca); mapeada só para a junção com o Item
+    """
+    item = models.OneToOneField(
+        Item, primary_key=True, db_column='rowid', related_name='indice_sqlite',
+        on_delete=models.DO_NOTHING, db_constraint=False
+    )
+    # Coluna oculta do FTS5 com o nome da tabela: lado esquerdo do MATCH e
+    # primeiro argumento do bm25
+    documento = CampoBusca(db_column=TABELA_BUSCA)
+    
+    class Meta:
+        managed = False
+        db_table = TABELA_BUSCA
+
+
+class IndiceBuscaPostgres(models.Model):
+    """
+    Tabela com o tsvector da busca no PostgreSQL (criada pela migração 0009,
+    ver itens.busca); mapeada só para a junção com o Item
+    """
+    item = models.OneToOneField(
+        Item, primary_key=True, related_name='indice_postgres',
+        on_delete=models.DO_NOTHING, db_constraint=False
+    )
+    documento = CampoBusca()
+    
+    class Meta:
+        managed = False
+        db_table = TABELA_BUSCA
+
+
+class ContadorItens(models.Model):
+    """
+    Total de itens por (tipo, status), mantido de forma incremental pelos
+    signals do Item e pelas ações em lote (ver itens.contadores)
+    """
+    tipo = models.CharField(max_length=10, choices=TIPO_ITEM_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    total = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Contador de itens'
+        verbose_name_plural = 'Contadores de itens'
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'status'], name='contador_tipo_status_unico'),
+        ]
+    
+    def __str__(self):
+        return f'{self.get_tipo_display()} / {self.get_status_display()}: {self.total}'
+
+
+class ContadorNotificacoes(models.Model):
+    """
+    Contagem desnormalizada de contatos não lidos nos itens de cada usuário,
+    mantida pelos signals do ContatoItem (ver itens.notificacoes)
+    """
+    usuario = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name='contador_notificacoes',
+        on_delete=models.CASCADE
+    )
+    contatos_nao_lidos = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Contador de notificações'
+        verbose_name_plural = 'Contadores de notificações'
+    
+    def __str__(self):
+        return f'{self.usuario.username}: {self.contatos_nao_lidos} contato(s) não lido(s)'
+
+
+class ItemRemovido(models.Model):
+    """
+    Registro (tombstone) de um item excluído, para que clientes que
+    sincronizam por alterações saibam que devem removê-lo (ver itens.sincronizacao)
+    """
+    item_id = models.PositiveIntegerField(help_text="Id do item excluído")
+    data_remocao = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Item removido'
+        verbose_name_plural = 'Itens removidos'
+        indexes = [
+            models.Index(fields=['data_remocao']),
+        ]
+    
+    def __str__(self):
+        return f'Item {self.item_id} removido em {self.data_remocao:%d/%m/%Y %H:%M}'
+
+
+class SugestaoCorrespondencia(models.Model):
+    """
+    Par provável entre um item perdido e um encontrado, calculado pelo
+    motor de correspondência (ver itens.correspondencias)
+    """
+    perdido = models.ForeignKey(
+        Item,
+        related_name='sugestoes_como_perdido',
+        on_delete=models.CASCADE
+    )
+    encontrado = models.ForeignKey(
+        Item,
+        related_name='sugestoes_como_encontrado',
+        on_delete=models.CASCADE
+    )
+    pontuacao = models.FloatField(help_text="Semelhança entre 0 e 1")
+    detalhes = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Pontuação de cada critério (texto, bloco, tempo)"
+    )
+    data_calculo = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-pontuacao']
+        verbose_name = 'Sugestão de correspondência'
+        verbose_name_plural = 'Sugestões de correspondência'
+        constraints = [
+            models.UniqueConstraint(fields=['perdido', 'encontrado'], name='sugestao_par_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['perdido', '-pontuacao']),
+            models.Index(fields=['encontrado', '-pontuacao']),
+        ]
+    
+    def __str__(self):
+        return f'{self.perdido_id} ↔ {self.encontrado_id} ({self.pontuacao:.0%})'
+
+
+class ItemArquivado(models.Model):
+    """
+    Item resolvido, spam ou expirado retirado da tabela principal pelo
+    arquivamento (ver itens.arquivo). Mantém o id original, para que o link
+    permanente do item continue funcionando.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    titulo = models.CharField(max_length=200)
+    descricao = models.TextField(max_length=1000)
+    categoria = models.CharField(max_length=30, choices=CATEGORIA_CHOICES)
+    tipo = models.CharField(max_length=10, choices=TIPO_ITEM_CHOICES)
+    bloco = models.CharField(max_length=30, choices=BLOCO_CHOICES)
+    local_especifico = models.CharField(max_length=200, blank=True, null=True)
+    foto = models.ImageField(upload_to='itens/fotos/', storage=armazenamento_fotos, blank=True, null=True)
+    data_postagem = models.DateTimeField()
+    data_ocorrencia = models.DateTimeField()
+    data_atualizacao = models.DateTimeField()
+    usuario = models.ForeignKey(User, related_name='itens_arquivados', on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    resolvido_por = models.ForeignKey(
+        User,
+        related_name='itens_arquivados_resolvidos',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True
+    )
+    data_resolucao = models.DateTimeField(blank=True, null=True)
+    telefone_contato = models.CharField(max_length=20, blank=True, null=True)
+    email_contato = models.EmailField(blank=True, null=True)
+    visualizacoes = models.PositiveIntegerField(default=0)
+    prioridade = models.BooleanField(default=False)
+    data_arquivamento = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-data_postagem']
+        verbose_name = 'Item arquivado'
+        verbose_name_plural = 'Itens arquivados'
+        indexes = [
+            models.Index(fields=['usuario', '-data_arquivamento']),
+            models.Index(fields=['foto']),
+        ]
+    
+    def __str__(self):
+        return f'{self.get_tipo_display()}: {self.titulo} (arquivado)'
+    
+    def get_absolute_url(self):
+        """O link permanente é o mesmo do item original"""
+        return reverse('itens:detalhe-item', kwargs={'pk': self.pk})
+
+
+class ComentarioArquivado(models.Model):
+    """Comentário de um item arquivado"""
+    id = models.BigIntegerField(primary_key=True)
+    item = models.ForeignKey(ItemArquivado, related_name='comentarios', on_delete=models.CASCADE)
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE)
+    texto = models.TextField(max_length=500)
+    data_comentario = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['data_comentario']
+        verbose_name = 'Comentário arquivado'
+        verbose_name_plural = 'Comentários arquivados'
+    
+    def __str__(self):
+        return f'Comentário {self.pk} do item arquivado {self.item_id}'
+
+
+class ContatoArquivado(models.Model):
+    """Contato direto recebido por um item arquivado"""
+    id = models.BigIntegerField(primary_key=True)
+    item = models.ForeignKey(ItemArquivado, related_name='contatos', on_delete=models.CASCADE)
+    usuario_interessado = models.ForeignKey(
+        User,
+        related_name='contatos_arquivados',
+        on_delete=models.CASCADE
+    )
+    mensagem = models.TextField(max_length=500)
+    data_contato = models.DateTimeField()
+    visualizado = models.BooleanField(default=False)
+    
+    class Meta:
+        ordering = ['-data_contato']
+        verbose_name = 'Contato arquivado'
+        verbose_name_plural = 'Contatos arquivados'
+    
+    def __str__(self):
+        return f'Contato {self.pk} do item arquivado {self.item_id}'
+
+
+class TermoItem(models.Model):
+    """
+    Peso TF-IDF de um termo em um item ativo: os vetores esparsos do índice
+    de itens similares (ver itens.similares)
+    """
+    item = models.ForeignKey(Item, related_name='termos', on_delete=models.CASCADE)
+    termo = models.CharField(max_length=50)
+    peso = models.FloatField(help_text="Peso TF-IDF normalizado (vetor de norma 1)")
+    
+    class Meta:
+        verbose_name = 'Termo do item'
+        verbose_name_plural = 'Termos dos itens'
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'termo'], name='termo_item_unico'),
+        ]
+        indexes = [
+            # Cobre o produto escalar: lê item e peso sem acessar a tabela
+            models.Index(fields=['termo', 'item', 'peso']),
+        ]
+    
+    def __str__(self):
+        return f'{self.item_id}: {self.termo} ({self.peso:.3f})'
+
+
+class ItemSimilar(models.Model):
+    """
+    Vizinho mais próximo (similaridade de cosseno) de um item, pré-calculado
+    para a seção "Itens similares" (ver itens.similares)
+    """
+    item = models.ForeignKey(Item, related_name='similares', on_delete=models.CASCADE)
+    similar = models.ForeignKey(Item, related_name='similar_a', on_delete=models.CASCADE)
+    pontuacao = models.FloatField(help_text="Similaridade de cosseno entre 0 e 1")
+    
+    class Meta:
+        ordering = ['-pontuacao']
+        verbose_name = 'Item similar'
+        verbose_name_plural = 'Itens similares'
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'similar'], name='item_similar_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['item', '-pontuacao']),
+        ]
+    
+    def __str__(self):
+        return f'{self.item_id} ~ {self.similar_id} ({self.pontuacao:.2f})'
+
+
+STATUS_TAREFA_CHOICES = [
+    ('pendente', 'Pendente'),
+    ('executando', 'Executando'),
+    ('concluida', 'Concluída'),
+    ('falhou', 'Falhou'),
+]
+
+
+class Tarefa(models.Model):
+    """
+    Tarefa da fila local de processamento em segundo plano, executada pelo
+    comando ``processar_tarefas`` (ver itens.tarefas)
+    """
+    nome = models.CharField(max_length=100, help_text="Nome da tarefa registrada")
+    argumentos = models.JSONField(default=dict, blank=True)
+    chave = models.CharField(
+        max_length=255,
+        unique=True,
+        blank=True,
+        null=True,
+        help_text="Chave de idempotência: a mesma chave só é enfileirada uma vez"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_TAREFA_CHOICES, default='pendente')
+    repetir = models.BooleanField(
+        default=False,
+        help_text="Enfileirada de novo durante a execução: volta para a fila ao terminar"
+    )
+    tentativas = models.PositiveIntegerField(default=0)
+    max_tentativas = models.PositiveIntegerField(default=3)
+    executar_apos = models.DateTimeField(default=timezone.now)
+    erro = models.TextField(blank=True)
+    data_criacao = models.DateTimeField(auto_now_add=True)
+    data_atualizacao = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['executar_apos', 'id']
+        verbose_name = 'Tarefa'
+        verbose_name_plural = 'Tarefas'
+        indexes = [
+            models.Index(fields=['status', 'executar_apos']),
+        ]
+    
+    def __str__(self):
+        return f'{self.nome} ({self.get_status_display()})'
+
+
+def ultimo_item_id():
+    """Maior id de item cadastrado (ponto de partida dos alertas de uma busca nova)"""
+    return Item.objects.aggregate(maior=models.Max('pk'))['maior'] or 0
+
+
+class BuscaSalva(models.Model):
+    """
+    Busca da listagem (texto e filtros) salva pelo usuário, com alerta por
+    e-mail dos itens novos que passam a atendê-la (ver itens.alertas)
+    """
+    usuario = models.ForeignKey(User, related_name='buscas_salvas', on_delete=models.CASCADE)
+    nome = models.CharField(max_length=100)
+    busca = models.CharField(max_length=100, blank=True, help_text="Texto buscado")
+    tipo = models.CharField(max_length=10, choices=TIPO_ITEM_CHOICES, blank=True)
+    categoria = models.CharField(max_length=30, choices=CATEGORIA_CHOICES, blank=True)
+    bloco = models.CharField(max_length=30, choices=BLOCO_CHOICES, blank=True)
+    prioridade = models.BooleanField(default=False, help_text="Apenas itens prioritários")
+    alerta = models.BooleanField(default=True, help_text="Enviar e-mail com os itens novos")
+    ultimo_item = models.PositiveIntegerField(
+        default=ultimo_item_id,
+        help_text="Id do último item já avaliado para o alerta"
+    )
+    data_criacao = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-data_criacao']
+        verbose_name = 'Busca salva'
+        verbose_name_plural = 'Buscas salvas'
+        indexes = [
+            models.Index(fields=['usuario', '-data_criacao']),
+        ]
+    
+    def __str__(self):
+        return f'{self.nome} ({self.usuario.username})'
+    
+    def parametros(self):
+        """Filtros da busca como parâmetros da listagem (só os preenchidos)"""
+        valores = {
+            'busca': self.busca,
+            'tipo': self.tipo,
+            'categoria': self.categoria,
+            'bloco': self.bloco,
+            'prioridade': 'on' if self.prioridade else '',
+        }
+        return {campo: valor for campo, valor in valores.items() if valor}
+    
+    def get_absolute_url(self):
+        """Listagem com os filtros da busca"""
+        return f"{reverse('itens:listar-itens')}?{urlencode(self.parametros())}"
@@ -0,0 +1,95 @@
+"""
+Contagem de contatos não lidos exibida no menu (badge de notificações)
+
+O valor fica desnormalizado em ContadorNotificacoes (uma linha por usuário,
+criada sob demanda) e em cache por usuário. Os signals do ContatoItem
+ajustam o contador e invalidam o cache quando um contato é criado, removido
+ou marcado como visualizado; o caso comum é uma leitura de chave no cache.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from achados_perdidos_uft.caches import prazo_invalidacao
+from itens.models import ContatoItem, ContadorNotificacoes
+
+
+def chave_cache(usuario_id):
+    return f'itens:notificacoes:{usuario_id}'
+
+
+def invalidar(usuario_id):
+    """Descarta a contagem em cache do usuário (agora e após o commit)"""
+    cache.delete(chave_cache(usuario_id))
+    transaction.on_commit(lambda: cache.delete(chave_cache(usuario_id)))
+
+
+def contar(usuario_id):
+    """Conta no banco os contatos não lidos nos itens do usuário"""
+    return ContatoItem.objects.filter(item__usuario_id=usuario_id, visualizado=False).count()
+
+
+def contatos_nao_lidos(usuario_id):
+    """Retorna a contagem de contatos não lidos do usuário"""
+    valor = cache.get(chave_cache(usuario_id))
+    if valor is None:
+        contador = ContadorNotificacoes.objects.filter(usuario_id=usuario_id).first()
+        if contador is None:
+            contador, _ = ContadorNotificacoes.objects.get_or_create(
+                usuario_id=usuario_id,
+                defaults={'contatos_nao_lidos': contar(usuario_id)}
+            )
+        valor = contador.contatos_nao_lidos
+        cache.set(chave_cache(usuario_id), valor, prazo_invalidacao())
+    return valor
+
+
+def ajustar(usuario_id, delta):
+    """
+    Soma ``delta`` ao contador do usuário
+
+    Se o usuário ainda não tem contador, nada é feito: ele será criado com a
+    contagem correta na próxima leitura.
+    """
+    if not delta:
+        return
+    ContadorNotificacoes.objects.filter(usuario_id=usuario_id).update(
+        contatos_nao_lidos=F('contatos_nao_lidos') + delta
+    )
+    invalidar(usuario_id)
+
+
+def recalcular(usuario_id):
+    """Recalcula o contador do usuário a partir dos contatos"""
+    ContadorNotificacoes.objects.update_or_create(
+        usuario_id=usuario_id,
+        defaults={'contatos_nao_lidos': contar(usuario_id)}
+    )
+    invalidar(usuario_id)
+
+
+def reconciliar():
+    """
+    Recalcula todos os contadores existentes em uma única agregação
+
+    Retorna a lista de (usuario_id, anterior, atual) dos contadores que divergiam.
+    """
+    atuais = dict(
+        ContadorNotificacoes.objects.annotate(
+            real=Count(
+                'usuario__itens_postados__contatos',
+                filter=Q(usuario__itens_postados__contatos__visualizado=False)
+            )
+        ).values_list('usuario_id', 'real')
+    )
+    divergencias = []
+    for contador in ContadorNotificacoes.objects.all():
+        real = atuais.get(contador.usuario_id, 0)
+        if contador.contatos_nao_lidos != real:
+            divergencias.append((contador.usuario_id, contador.contatos_nao_lidos, real))
+            ContadorNotificacoes.objects.filter(usuario_id=contador.usuario_id).update(
+                contatos_nao_lidos=real
+            )
+            invalidar(contador.usuario_id)
+    return divergencias
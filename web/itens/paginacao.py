@@ -0,0 +1,141 @@
+"""
+Paginação por cursor (keyset) para a listagem de itens
+
+Em vez de ``OFFSET``, cada página é obtida a partir da chave do último item
+exibido, na ordem ``(-data_postagem, -id)``. O custo de uma página não cresce
+com a profundidade e o índice de ``data_postagem`` atende a consulta. A
+contagem total é opcional, pois um ``COUNT(*)`` sobre o queryset filtrado é
+justamente o que se quer evitar nas páginas comuns.
+
+O cursor é opaco para o cliente: JSON com a direção e a chave, em base64.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+ORDENACAO = ('-data_postagem', '-id')
+
+PROXIMA = 'p'
+ANTERIOR = 'a'
+
+
+class CursorInvalido(ValueError):
+    """Cursor malformado ou adulterado"""
+
+
+def codificar_cursor(direcao, item):
+    """Gera o cursor que continua a listagem a partir do item, na direção dada"""
+    return codificar_posicao(direcao, item.data_postagem, item.pk)
+
+
+def codificar_posicao(direcao, data, pk):
+    """Gera o cursor que continua a listagem a partir da chave (data_postagem, id)"""
+    dados = json.dumps([direcao, data.isoformat(), pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Retorna (direcao, data_postagem, id) do cursor"""
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        direcao, data, pk = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        if direcao not in (PROXIMA, ANTERIOR):
+            raise ValueError(direcao)
+        return direcao, datetime.fromisoformat(data), int(pk)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as erro:
+        raise CursorInvalido('Cursor de paginação inválido') from erro
+
+
+class PaginaCursor:
+    """
+    Uma página da paginação por cursor
+    """
+    def __init__(self, itens, cursor_proximo, cursor_anterior, total=None):
+        self.itens = itens
+        self.cursor_proximo = cursor_proximo
+        self.cursor_anterior = cursor_anterior
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __len__(self):
+        return len(self.itens)
+
+    def __bool__(self):
+        # Sem isso uma página vazia seria falsa e o template omitiria o total
+        # e o link de volta
+        return True
+
+    @property
+    def has_next(self):
+        return self.cursor_proximo is not None
+
+    @property
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class PaginadorCursor:
+    """
+    Pagina um queryset de itens na ordem ``(-data_postagem, -id)``
+
+    Com ``contar=True`` a página também traz o total de itens do queryset.
+    """
+    def __init__(self, queryset, por_pagina, contar=False):
+        self.queryset = queryset
+        self.por_pagina = por_pagina
+        self.contar = contar
+
+    def pagina(self, cursor=None):
+        """Retorna a página indicada pelo cursor (a primeira, se não houver)"""
+        queryset = self.queryset.order_by(*ORDENACAO)
+        direcao = PROXIMA
+        if cursor:
+            direcao, data, pk = decodificar_cursor(cursor)
+            if direcao == PROXIMA:
+                # O primeiro filtro limita a faixa do índice; o segundo desempata pelo id
+                queryset = queryset.filter(
+                    Q(data_postagem__lte=data) & (Q(data_postagem__lt=data) | Q(id__lt=pk))
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(data_postagem__gte=data) & (Q(data_postagem__gt=data) | Q(id__gt=pk))
+                ).reverse()
+
+        # Um item a mais indica se existe outra página na mesma direção
+        itens = list(queryset[:self.por_pagina + 1])
+        ha_mais = len(itens) > self.por_pagina
+        itens = itens[:self.por_pagina]
+        if direcao == ANTERIOR:
+            itens.reverse()
+
+        if direcao == PROXIMA:
+            tem_proxima, tem_anterior = ha_mais, bool(cursor)
+        else:
+            tem_proxima, tem_anterior = True, ha_mais
+
+        cursor_proximo = cursor_anterior = None
+        if itens:
+            if tem_proxima:
+                cursor_proximo = codificar_cursor(PROXIMA, itens[-1])
+            if tem_anterior:
+                cursor_anterior = codificar_cursor(ANTERIOR, itens[0])
+        elif cursor:
+            # Página vazia (itens removidos desde que o cursor foi gerado): a
+            # volta parte da mesma chave, na direção oposta e incluindo o item
+            # dela (os ids são inteiros, então id > pk - 1 equivale a id >= pk)
+            if direcao == PROXIMA:
+                cursor_anterior = codificar_posicao(ANTERIOR, data, pk - 1)
+            else:
+                cursor_proximo = codificar_posicao(PROXIMA, data, pk + 1)
+
+        total = self.queryset.count() if self.contar else None
+        return PaginaCursor(itens, cursor_proximo, cursor_anterior, total)
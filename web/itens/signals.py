@@ -0,0 +1,265 @@
+"""
+Signals do app Itens
+
+Mantém estruturas derivadas (índice de busca, contadores do painel e de
+notificações, registro de itens removidos, rendições e arquivos das fotos,
+sugestões de correspondência, índice de itens similares)
+sincronizadas com os modelos Item, Comentario e ContatoItem, invalida as
+páginas guardadas em cache para visitantes anônimos e publica os eventos de
+novos itens e novos contatos (ver itens.eventos).
+"""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from itens import (
+    cache_filtros, cache_paginas, contadores, correspondencias, em_lote, eventos, imagens, notificacoes, similares
+)
+from itens.busca import obter_backend
+from itens.models import Item, Comentario, ContatoItem, ItemRemovido
+
+
+def tipo_status_no_banco(instance):
+    """Retorna o (tipo, status) atualmente gravado no banco para o item"""
+    originais = getattr(instance, '_valores_originais', {})
+    if 'tipo' in originais and 'status' in originais:
+        return originais['tipo'], originais['status']
+    return Item.objects.filter(pk=instance.pk).values_list('tipo', 'status').first()
+
+
+@receiver(pre_save, sender=Item, dispatch_uid='itens_guardar_estado_anterior')
+def guardar_estado_anterior(sender, instance, raw=False, **kwargs):
+    """Guarda o (tipo, status) anterior para ajustar os contadores após salvar"""
+    if raw or instance._state.adding:
+        instance._tipo_status_anterior = None
+    else:
+        instance._tipo_status_anterior = tipo_status_no_banco(instance)
+
+
+@receiver(post_save, sender=Item, dispatch_uid='itens_atualizar_contadores')
+def atualizar_contadores(sender, instance, raw=False, **kwargs):
+    """Atualiza os contadores do painel após salvar o item"""
+    if raw:
+        return
+    atual = (instance.tipo, instance.status)
+    contadores.registrar_transicao(getattr(instance, '_tipo_status_anterior', None), atual)
+    instance._valores_originais = {
+        **getattr(instance, '_valores_originais', {}),
+        'tipo': instance.tipo,
+        'status': instance.status,
+    }
+
+
+@receiver(post_delete, sender=Item, dispatch_uid='itens_descontar_contadores')
+def descontar_contadores(sender, instance, **kwargs):
+    """Desconta o item removido dos contadores do painel (arquivado continua contando)"""
+    if em_lote.contadores_mantidos():
+        return
+    contadores.ajustar(instance.tipo, instance.status, -1)
+
+
+@receiver(post_save, sender=User, dispatch_uid='itens_usuario_salvo')
+def usuario_salvo(sender, instance, created=False, update_fields=None, **kwargs):
+    """Invalida o total de usuários quando um usuário é criado ou (des)ativado"""
+    if created or update_fields is None or 'is_active' in update_fields:
+        contadores.invalidar_cache()
+        cache_paginas.invalidar()
+
+
+@receiver(post_delete, sender=User, dispatch_uid='itens_usuario_removido')
+def usuario_removido(sender, instance, **kwargs):
+    """Invalida o total de usuários quando um usuário é removido"""
+    contadores.invalidar_cache()
+    cache_paginas.invalidar()
+
+
+@receiver(post_save, sender=Item, dispatch_uid='itens_indexar_busca')
+def indexar_item_busca(sender, instance, raw=False, **kwargs):
+    """Atualiza o índice de busca após salvar o item"""
+    if raw:
+        return
+    obter_backend().indexar(instance)
+
+
+@receiver(post_delete, sender=Item, dispatch_uid='itens_remover_busca')
+def remover_item_busca(sender, instance, **kwargs):
+    """Remove o item do índice de busca"""
+    obter_backend().remover(instance.pk)
+
+
+@receiver(pre_save, sender=Item, dispatch_uid='itens_guardar_foto_anterior')
+def guardar_foto_anterior(sender, instance, raw=False, **kwargs):
+    """Guarda o nome da foto gravada no banco para liberar o arquivo se ela for trocada"""
+    originais = getattr(instance, '_valores_originais', {})
+    if raw or instance._state.adding:
+        instance._foto_anterior = ''
+    elif 'foto' in originais:
+        instance._foto_anterior = originais['foto'] or ''
+    else:
+        instance._foto_anterior = Item.objects.filter(pk=instance.pk).values_list('foto', flat=True).first() or ''
+
+
+@receiver(post_save, sender=Item, dispatch_uid='itens_gerar_rendicoes')
+def enfileirar_rendicoes_foto(sender, instance, created=False, raw=False, **kwargs):
+    """Enfileira as rendições quando o item recebe uma foto nova e libera a anterior"""
+    if raw:
+        return
+    originais = getattr(instance, '_valores_originais', {})
+    nome = instance.foto.name if instance.foto else ''
+    if nome and (created or originais.get('foto') != nome):
+        imagens.solicitar_rendicoes(nome)
+    anterior = getattr(instance, '_foto_anterior', '')
+    if anterior and anterior != nome:
+        transaction.on_commit(lambda: imagens.liberar_foto(anterior))
+    instance._valores_originais = {**originais, 'foto': nome}
+
+
+@receiver(post_delete, sender=Item, dispatch_uid='itens_liberar_foto')
+def liberar_foto_removida(sender, instance, **kwargs):
+    """Libera o arquivo da foto do item excluído (se nenhum outro item o usa)"""
+    if instance.foto:
+        nome = instance.foto.name
+        transaction.on_commit(lambda: imagens.liberar_foto(nome))
+
+
+# Campos cuja alteração dispara recálculos em segundo plano
+CAMPOS_MONITORADOS = frozenset(correspondencias.CAMPOS) | frozenset(similares.CAMPOS)
+
+
+@receiver(pre_save, sender=Item, dispatch_uid='itens_guardar_campos_alterados')
+def guardar_campos_alterados(sender, instance, raw=False, **kwargs):
+    """Guarda quais campos monitorados mudaram em relação ao banco (todos, se o item é novo)"""
+    if raw:
+        instance._campos_alterados = frozenset()
+    elif instance._state.adding:
+        instance._campos_alterados = CAMPOS_MONITORADOS
+    else:
+        originais = getattr(instance, '_valores_originais', {})
+        ausente = object()
+        instance._campos_alterados = frozenset(
+            campo for campo in CAMPOS_MONITORADOS
+            if originais.get(campo, ausente) != getattr(instance, campo)
+        )
+
+
+@receiver(post_save, sender=Item, dispatch_uid='itens_recalcular_correspondencias')
+def recalcular_correspondencias(sender, instance, **kwargs):
+    """Enfileira o recálculo das sugestões de correspondência do item"""
+    if getattr(instance, '_campos_alterados', frozenset()) & set(correspondencias.CAMPOS):
+        correspondencias.solicitar(instance)
+
+
+@receiver(post_save, sender=Item, dispatch_uid='itens_atualizar_similares')
+def atualizar_similares(sender, instance, **kwargs):
+    """Enfileira a reindexação do item no índice de itens similares"""
+    if getattr(instance, '_campos_alterados', frozenset()) & set(similares.CAMPOS):
+        similares.solicitar(instance)
+
+
+@receiver(post_save, sender=Item, dispatch_uid='itens_atualizar_valores_originais')
+def atualizar_valores_originais(sender, instance, **kwargs):
+    """Registra os valores salvos para que um novo save só detecte alterações posteriores"""
+    if getattr(instance, '_campos_alterados', None):
+        instance._valores_originais = {
+            **getattr(instance, '_valores_originais', {}),
+            **{campo: getattr(instance, campo) for campo in CAMPOS_MONITORADOS},
+        }
+
+
+@receiver(post_save, sender=Item, dispatch_uid='itens_invalidar_paginas')
+@receiver(post_delete, sender=Item, dispatch_uid='itens_invalidar_paginas_remocao')
+def invalidar_paginas(sender, instance, raw=False, **kwargs):
+    """Invalida as páginas em cache (listagens, contadores e similares exibem qualquer item)"""
+    if not raw:
+        cache_paginas.invalidar()
+
+
+@receiver(post_save, sender=Item, dispatch_uid='itens_invalidar_filtros')
+@receiver(post_delete, sender=Item, dispatch_uid='itens_invalidar_filtros_remocao')
+def invalidar_filtros(sender, instance, raw=False, **kwargs):
+    """Invalida as listas de ids da listagem em cache"""
+    if not raw:
+        cache_filtros.invalidar()
+
+
+@receiver(post_save, sender=Item, dispatch_uid='itens_publicar_novo_item')
+def publicar_novo_item(sender, instance, created=False, raw=False, **kwargs):
+    """Avisa as listagens abertas sobre o item cadastrado"""
+    if created and not raw and instance.status == 'ativo':
+        eventos.publicar_item(instance)
+
+
+@receiver(post_save, sender=Comentario, dispatch_uid='itens_comentario_salvo')
+@receiver(post_delete, sender=Comentario, dispatch_uid='itens_comentario_removido')
+def invalidar_pagina_comentario(sender, instance, raw=False, **kwargs):
+    """Invalida a página em cache do item comentado (os comentários só aparecem nela)"""
+    if not raw:
+        cache_paginas.invalidar(instance.item_id)
+
+
+@receiver(post_delete, sender=Item, dispatch_uid='itens_registrar_remocao')
+def registrar_remocao(sender, instance, **kwargs):
+    """Registra a exclusão para a sincronização por alterações"""
+    ItemRemovido.objects.create(item_id=instance.pk)
+
+
+def dono_do_item(item_id):
+    """Retorna o id do usuário que cadastrou o item"""
+    return Item.objects.filter(pk=item_id).values_list('usuario_id', flat=True).first()
+
+
+@receiver(pre_save, sender=ContatoItem, dispatch_uid='itens_contato_estado_anterior')
+def guardar_visualizado_anterior(sender, instance, raw=False, **kwargs):
+    """Guarda o valor anterior de visualizado para ajustar as notificações"""
+    if raw or instance._state.adding:
+        instance._visualizado_anterior = None
+    elif 'visualizado' in getattr(instance, '_valores_originais', {}):
+        instance._visualizado_anterior = instance._valores_originais['visualizado']
+    else:
+        instance._visualizado_anterior = ContatoItem.objects.filter(
+            pk=instance.pk
+        ).values_list('visualizado', flat=True).first()
+
+
+@receiver(post_save, sender=ContatoItem, dispatch_uid='itens_contato_notificacoes')
+def atualizar_notificacoes(sender, instance, created=False, raw=False, **kwargs):
+    """Ajusta o contador de não lidos do dono do item"""
+    if raw:
+        return
+    anterior = getattr(instance, '_visualizado_anterior', None)
+    if created:
+        delta = 0 if instance.visualizado else 1
+    elif anterior is None or anterior == instance.visualizado:
+        delta = 0
+    else:
+        delta = -1 if instance.visualizado else 1
+    if delta:
+        notificacoes.ajustar(dono_do_item(instance.item_id), delta)
+    instance._valores_originais = {
+        **getattr(instance, '_valores_originais', {}),
+        'visualizado': instance.visualizado,
+    }
+
+
+@receiver(post_save, sender=ContatoItem, dispatch_uid='itens_publicar_novo_contato')
+def publicar_novo_contato(sender, instance, created=False, raw=False, **kwargs):
+    """Avisa o dono do item sobre o contato recebido"""
+    if created and not raw:
+        # Na view de contato o item já está carregado: sem consulta extra
+        if ContatoItem.item.is_cached(instance):
+            dono_id = instance.item.usuario_id
+        else:
+            dono_id = dono_do_item(instance.item_id)
+        if dono_id is not None:
+            eventos.publicar_contato(instance, dono_id)
+
+
+@receiver(post_delete, sender=ContatoItem, dispatch_uid='itens_contato_removido')
+def descontar_notificacao(sender, instance, **kwargs):
+    """Desconta o contato não lido removido"""
+    if not instance.visualizado:
+        dono_id = dono_do_item(instance.item_id)
+        if dono_id is not None:
+            notificacoes.ajustar(dono_id, -1)
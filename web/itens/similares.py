@@ -0,0 +1,206 @@
+"""
+Índice de itens similares (TF-IDF + similaridade de cosseno)
+
+Cada item ativo é um vetor esparso TF-IDF dos radicais do título (com peso
+dobrado) e da descrição, guardado como linhas de TermoItem (item, termo,
+peso) com norma 1. O produto escalar entre um item e todos os outros é uma
+única agregação SQL sobre os termos do item, coberta pelo índice
+(termo, item, peso).
+
+Os ``SIMILARES_VIZINHOS`` vizinhos mais próximos de cada item ficam na
+tabela ItemSimilar: a página de detalhe só lê a lista, sem calcular nada.
+A atualização é incremental, em segundo plano pela fila de tarefas: quando
+um item é cadastrado ou muda de título, descrição ou status, recalculam-se o
+vetor e a lista dele, e o item entra na lista dos vizinhos em que supera o
+último colocado. O IDF de cada vetor é o do momento em que ele foi
+calculado; o comando ``reconstruir_similares`` recalcula tudo com o IDF atual.
+
+(Sem NumPy/SciPy: o projeto não os tem como dependência e os vetores, muito
+esparsos, cabem bem em tabela.)
+"""
+
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+
+from itens import cache_paginas, tarefas
+from itens.models import Item, ItemSimilar, TermoItem
+from itens.texto import tokenizar
+
+# Campos que alteram o vetor: mudou algum, o item é reindexado
+CAMPOS = ('titulo', 'descricao', 'status')
+
+# Termos de maior peso usados na consulta (limita o tamanho do produto escalar)
+TERMOS_CONSULTA = 30
+
+# Vizinhos cujas listas são atualizadas quando um item é (re)indexado
+CANDIDATOS = 50
+
+TAMANHO_TERMO = TermoItem._meta.get_field('termo').max_length
+
+
+def vizinhos():
+    return getattr(settings, 'SIMILARES_VIZINHOS', 8)
+
+
+def frequencias(item):
+    """Frequência de cada radical no item (o título conta em dobro)"""
+    termos = tokenizar(item.titulo) * 2 + tokenizar(item.descricao)
+    return Counter(termo[:TAMANHO_TERMO] for termo in termos)
+
+
+def idf(documentos, total):
+    """IDF suavizado: sempre positivo, mesmo para termos presentes em todos os itens"""
+    return math.log((1 + total) / (1 + documentos)) + 1
+
+
+def vetor(contagem, documentos, total):
+    """Vetor TF-IDF de norma 1 ({termo: peso}); ``documentos`` é {termo: nº de itens}"""
+    pesos = {
+        termo: (1 + math.log(frequencia)) * idf(documentos.get(termo, 0), total)
+        for termo, frequencia in contagem.items()
+    }
+    norma = math.sqrt(sum(peso * peso for peso in pesos.values()))
+    return {termo: peso / norma for termo, peso in pesos.items()} if norma else {}
+
+
+def produto_escalar(pesos, excluir=None, limite=CANDIDATOS):
+    """
+    [(id do item, similaridade)] dos itens mais próximos do vetor, em uma consulta
+
+    Soma, por item, peso do termo no vetor * peso do termo no item.
+    """
+    consulta_pesos = dict(sorted(pesos.items(), key=lambda par: -par[1])[:TERMOS_CONSULTA])
+    if not consulta_pesos:
+        return []
+    pontuacao = Sum(Case(
+        *[When(termo=termo, then=F('peso') * Value(peso)) for termo, peso in consulta_pesos.items()],
+        output_field=FloatField()
+    ))
+    consulta = TermoItem.objects.filter(termo__in=consulta_pesos)
+    if excluir is not None:
+        consulta = consulta.exclude(item_id=excluir)
+    return list(
+        consulta.values('item_id').annotate(pontuacao=pontuacao).order_by('-pontuacao', 'item_id')
+        .values_list('item_id', 'pontuacao')[:limite]
+    )
+
+
+def remover(item_ids):
+    """Tira os itens do índice (vetores, listas próprias e listas dos outros)"""
+    TermoItem.objects.filter(item_id__in=item_ids).delete()
+    ItemSimilar.objects.filter(Q(item_id__in=item_ids) | Q(similar_id__in=item_ids)).delete()
+
+
+def atualizar(item):
+    """Recalcula o vetor e os vizinhos do item e o insere nas listas dos vizinhos"""
+    with transaction.atomic():
+        # O item pode entrar ou sair da lista exibida no detalhe de outros itens
+        cache_paginas.invalidar()
+        remover([item.pk])
+        if item.status != 'ativo':
+            return
+
+        contagem = frequencias(item)
+        total = Item.objects.filter(status='ativo').count()
+        documentos = dict(
+            TermoItem.objects.filter(termo__in=contagem).values('termo').annotate(n=Count('id'))
+            .values_list('termo', 'n')
+        )
+        # O próprio item conta na frequência de documentos
+        documentos = {termo: documentos.get(termo, 0) + 1 for termo in contagem}
+        pesos = vetor(contagem, documentos, total)
+        TermoItem.objects.bulk_create([
+            TermoItem(item=item, termo=termo, peso=peso) for termo, peso in pesos.items()
+        ])
+
+        proximos = produto_escalar(pesos, excluir=item.pk)
+        k = vizinhos()
+        ItemSimilar.objects.bulk_create([
+            ItemSimilar(item=item, similar_id=similar_id, pontuacao=pontuacao)
+            for similar_id, pontuacao in proximos[:k]
+        ])
+
+        # Listas dos vizinhos: o item entra onde supera o último colocado
+        listas = defaultdict(list)
+        for vizinho_id, similar_id, pontuacao in ItemSimilar.objects.filter(
+            item_id__in=[vizinho_id for vizinho_id, _ in proximos]
+        ).values_list('item_id', 'similar_id', 'pontuacao'):
+            listas[vizinho_id].append((pontuacao, similar_id))
+        novos, excedentes = [], Q()
+        for vizinho_id, pontuacao in proximos:
+            lista = listas[vizinho_id]
+            if len(lista) >= k:
+                menor = min(lista)
+                if pontuacao <= menor[0]:
+                    continue
+                excedentes |= Q(item_id=vizinho_id, similar_id=menor[1])
+            novos.append(ItemSimilar(item_id=vizinho_id, similar=item, pontuacao=pontuacao))
+        if excedentes:
+            ItemSimilar.objects.filter(excedentes).delete()
+        ItemSimilar.objects.bulk_create(novos)
+
+
+@tarefas.registrar('atualizar_similares')
+def tarefa_atualizar(item_id):
+    """Tarefa em segundo plano: reindexa o item (ou o remove do índice, se excluído)"""
+    item = Item.objects.filter(pk=item_id).first()
+    if item is None:
+        remover([item_id])
+    else:
+        atualizar(item)
+
+
+def solicitar(item):
+    """Enfileira a reindexação do item (uma tarefa pendente por item)"""
+    tarefas.enfileirar('atualizar_similares', chave=f'similares:{item.pk}', item_id=item.pk)
+
+
+def reconstruir():
+    """Recalcula todos os vetores (com o IDF atual) e todas as listas; retorna o nº de itens"""
+    itens = Item.objects.filter(status='ativo').only('id', 'titulo', 'descricao').order_by('pk')
+    contagens = {item.pk: frequencias(item) for item in itens.iterator()}
+    documentos = Counter(termo for contagem in contagens.values() for termo in contagem)
+    total = len(contagens)
+    vetores = {pk: vetor(contagem, documentos, total) for pk, contagem in contagens.items()}
+
+    with transaction.atomic():
+        cache_paginas.invalidar()
+        TermoItem.objects.all().delete()
+        ItemSimilar.objects.all().delete()
+        TermoItem.objects.bulk_create((
+            TermoItem(item_id=pk, termo=termo, peso=peso)
+            for pk, pesos in vetores.items()
+            for termo, peso in pesos.items()
+        ), batch_size=1000)
+        k = vizinhos()
+        for pk, pesos in vetores.items():
+            ItemSimilar.objects.bulk_create([
+                ItemSimilar(item_id=pk, similar_id=similar_id, pontuacao=pontuacao)
+                for similar_id, pontuacao in produto_escalar(pesos, excluir=pk, limite=k)
+            ])
+    return total
+
+
+def similares(item, limite=4):
+    """
+    Itens ativos mais parecidos com o item, do índice (uma consulta)
+
+    Enquanto o item não tem vizinhos suficientes no índice (recém-cadastrado
+    ou sem termos em comum com outros), a lista é completada com itens ativos
+    da mesma categoria.
+    """
+    resultado = [
+        vizinho.similar for vizinho in ItemSimilar.objects.filter(
+            item=item, similar__status='ativo'
+        ).select_related('similar').order_by('-pontuacao')[:limite]
+    ]
+    if len(resultado) < limite:
+        resultado += list(
+            Item.objects.filter(categoria=item.categoria, status='ativo')
+            .exclude(pk__in=[item.pk, *(similar.pk for similar in resultado)])[:limite - len(resultado)]
+        )
+    return resultado
@@ -0,0 +1,158 @@
+"""
+Sincronização por alterações ("o que mudou desde o token") para o aplicativo
+
+O feed combina duas sequências ordenadas por tempo:
+
+* itens alterados, pela chave ``(data_atualizacao, id)``: novos, editados,
+  resolvidos, expirados...;
+* itens excluídos, pela chave ``(data_remocao, id)`` da tabela ItemRemovido,
+  preenchida pelo signal de exclusão (inclusive exclusões em cascata).
+
+O token guarda a posição alcançada em cada sequência. Cada chamada devolve no
+máximo ``limite`` alterações, na ordem em que ocorreram, e um novo token.
+Alterações mais recentes que ``SINCRONIZACAO_MARGEM`` segundos ficam para a
+próxima chamada: uma transação ainda não confirmada pode gravar um horário
+anterior ao de outra já visível, e a margem evita que ela seja pulada.
+
+Registros de remoção com mais de ``SINCRONIZACAO_RETENCAO_DIAS`` dias são
+apagados pelo comando ``limpar_remocoes``; um token mais antigo que isso
+exige sincronização completa (sem token).
+"""
+
+import base64
+import binascii
+import heapq
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from itens.models import Item, ItemRemovido
+
+STATUS_PUBLICOS = ['ativo', 'resolvido']
+
+
+class TokenInvalido(ValueError):
+    """Token de sincronização malformado"""
+
+
+class TokenExpirado(Exception):
+    """Token anterior à retenção dos registros de remoção"""
+
+
+def margem():
+    return timedelta(seconds=getattr(settings, 'SINCRONIZACAO_MARGEM', 5))
+
+
+def retencao():
+    return timedelta(days=getattr(settings, 'SINCRONIZACAO_RETENCAO_DIAS', 30))
+
+
+def codificar_posicao(posicao):
+    return [posicao[0].isoformat(), posicao[1]] if posicao else None
+
+
+def decodificar_posicao(valor):
+    if not valor:
+        return None
+    data = datetime.fromisoformat(valor[0])
+    # Os tokens emitidos sempre têm fuso; sem ele a comparação com as datas do banco falharia
+    if timezone.is_naive(data):
+        raise ValueError('Posição sem fuso horário')
+    return data, int(valor[1])
+
+
+def codificar_token(posicao_itens, posicao_remocoes):
+    dados = json.dumps(
+        [codificar_posicao(posicao_itens), codificar_posicao(posicao_remocoes)],
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip('=')
+
+
+def decodificar_token(token):
+    """Retorna (posição nos itens, posição nas remoções) do token"""
+    try:
+        preenchimento = '=' * (-len(token) % 4)
+        itens, remocoes = json.loads(base64.urlsafe_b64decode(token + preenchimento))
+        return decodificar_posicao(itens), decodificar_posicao(remocoes)
+    except (binascii.Error, UnicodeDecodeError, TypeError, IndexError, ValueError) as erro:
+        raise TokenInvalido('Token de sincronização inválido') from erro
+
+
+def depois_de(campo_data, posicao):
+    """Filtro das linhas com chave (campo_data, id) maior que a posição"""
+    if posicao is None:
+        return Q()
+    data, pk = posicao
+    return Q(**{f'{campo_data}__gte': data}) & (Q(**{f'{campo_data}__gt': data}) | Q(id__gt=pk))
+
+
+def alteracoes(token=None, limite=100):
+    """
+    Retorna as alterações posteriores ao token
+
+    Resultado: dicionário com ``alterados`` (itens públicos novos ou
+    alterados), ``removidos`` (ids de itens excluídos ou que deixaram de ser
+    públicos), ``token`` para a próxima chamada e ``mais`` (há mais alterações).
+    Sem token, ``alterados`` traz todos os itens e as remoções começam do
+    momento atual.
+    """
+    ate = timezone.now() - margem()
+    if token:
+        posicao_itens, posicao_remocoes = decodificar_token(token)
+        if posicao_remocoes is not None and posicao_remocoes[0] < timezone.now() - retencao():
+            raise TokenExpirado('Token expirado: sincronize novamente sem token')
+    else:
+        posicao_itens = None
+        ultima = ItemRemovido.objects.filter(data_remocao__lte=ate).order_by('-data_remocao', '-id').first()
+        posicao_remocoes = (ultima.data_remocao, ultima.pk) if ultima else (ate, 0)
+
+    # Um registro a mais em cada sequência indica se há mais alterações
+    itens = list(Item.objects.filter(
+        depois_de('data_atualizacao', posicao_itens), data_atualizacao__lte=ate
+    ).select_related('usuario').order_by('data_atualizacao', 'id')[:limite + 1])
+    remocoes = list(ItemRemovido.objects.filter(
+        depois_de('data_remocao', posicao_remocoes), data_remocao__lte=ate
+    ).order_by('data_remocao', 'id')[:limite + 1])
+
+    sequencia = heapq.merge(
+        ((item.data_atualizacao, 0, item.pk, item) for item in itens),
+        ((remocao.data_remocao, 1, remocao.pk, remocao) for remocao in remocoes),
+    )
+    alterados, removidos = [], []
+    consumidos = remocoes_consumidas = 0
+    for data, origem, pk, registro in sequencia:
+        if consumidos == limite:
+            break
+        consumidos += 1
+        if origem == 1:
+            remocoes_consumidas += 1
+            posicao_remocoes = (data, pk)
+            removidos.append(registro.item_id)
+        else:
+            posicao_itens = (data, pk)
+            if registro.status in STATUS_PUBLICOS:
+                alterados.append(registro)
+            else:
+                removidos.append(registro.pk)
+
+    if remocoes_consumidas == len(remocoes):
+        # Todas as remoções até ``ate`` foram entregues: avança a posição
+        # mesmo sem remoções novas, para o token não expirar à toa
+        posicao_remocoes = max(posicao_remocoes, (ate, 0))
+
+    return {
+        'alterados': alterados,
+        'removidos': removidos,
+        'token': codificar_token(posicao_itens, posicao_remocoes),
+        'mais': len(itens) + len(remocoes) > consumidos,
+    }
+
+
+def limpar_remocoes():
+    """Apaga os registros de remoção além do prazo de retenção; retorna quantos"""
+    apagados, _ = ItemRemovido.objects.filter(data_remocao__lt=timezone.now() - retencao()).delete()
+    return apagados
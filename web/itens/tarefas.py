@@ -0,0 +1,173 @@
+"""
+Fila local de tarefas em segundo plano, guardada no próprio banco
+
+Serve para trabalho lento que não deve atrasar a resposta (ex.: gerar as
+rendições de uma foto de 10 MB). Não precisa de broker externo: as tarefas
+são linhas do modelo Tarefa, gravadas na mesma transação de quem as
+enfileira, e o comando ``processar_tarefas`` as executa em um ou mais
+processos.
+
+Uso:
+
+    @registrar('gerar_rendicoes')
+    def gerar(nome):
+        ...
+
+    enfileirar('gerar_rendicoes', chave=f'rendicoes:{nome}', nome=nome)
+
+Com ``chave``, enfileirar de novo a mesma chave não cria outra tarefa
+enquanto a primeira não tiver sido executada (idempotência). Se ela já estiver
+em execução, é marcada para rodar de novo ao terminar (``repetir``): o pedido
+pode vir de uma mudança que a execução atual não viu. Uma tarefa
+que lança exceção volta para a fila com espera crescente até
+``max_tentativas``; depois fica com status ``falhou``.
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from itens.models import Tarefa
+
+logger = logging.getLogger('achados_perdidos_uft')
+
+# Nome -> função
+TAREFAS = {}
+
+# Espera antes da nova tentativa: ESPERA_BASE * 2 ** (tentativas - 1)
+ESPERA_BASE = timedelta(seconds=30)
+
+# Tarefas "executando" há mais tempo que isso são consideradas abandonadas
+# (processo encerrado no meio da execução) e voltam para a fila
+TEMPO_LIMITE = timedelta(minutes=10)
+
+
+def registrar(nome):
+    """Decorator que registra a função como tarefa"""
+    def decorator(funcao):
+        TAREFAS[nome] = funcao
+        return funcao
+    return decorator
+
+
+def enfileirar(nome_tarefa, /, chave=None, max_tentativas=3, atraso=None, **argumentos):
+    """
+    Enfileira a tarefa ``nome_tarefa`` com os argumentos (serializáveis em JSON)
+
+    ``atraso`` (timedelta) adia a primeira execução. Retorna a tarefa criada,
+    ou a já existente com a mesma ``chave`` ainda não executada. Uma tarefa
+    com a chave que já terminou (concluída ou falha) volta para a fila; uma
+    em execução volta ao terminar (ver ``finalizar``).
+    """
+    if nome_tarefa not in TAREFAS:
+        raise ValueError(f'Tarefa não registrada: {nome_tarefa}')
+    executar_apos = timezone.now() + (atraso or timedelta())
+    if chave is not None:
+        existente = Tarefa.objects.filter(chave=chave).first()
+        if existente is not None:
+            # As duas atualizações são condicionais ao status: se a execução
+            # terminar entre elas, a segunda devolve a tarefa à fila
+            Tarefa.objects.filter(pk=existente.pk, status='executando').update(
+                repetir=True, argumentos=argumentos, max_tentativas=max_tentativas
+            )
+            Tarefa.objects.filter(pk=existente.pk, status__in=('concluida', 'falhou')).update(
+                status='pendente', tentativas=0, erro='', repetir=False, argumentos=argumentos,
+                max_tentativas=max_tentativas, executar_apos=executar_apos,
+                data_atualizacao=timezone.now()
+            )
+            existente.refresh_from_db()
+            return existente
+    try:
+        with transaction.atomic():
+            return Tarefa.objects.create(
+                nome=nome_tarefa, chave=chave, argumentos=argumentos, max_tentativas=max_tentativas,
+                executar_apos=executar_apos
+            )
+    except IntegrityError:
+        # Outro processo enfileirou a mesma chave ao mesmo tempo
+        return Tarefa.objects.get(chave=chave)
+
+
+def reservar(limite=10):
+    """
+    Reserva até ``limite`` tarefas prontas para execução
+
+    A reserva é um UPDATE condicionado ao status e à data de atualização
+    lidos: entre vários processos disputando a mesma tarefa, só um consegue
+    alterá-la.
+    """
+    agora = timezone.now()
+    candidatas = Tarefa.objects.filter(
+        status='pendente', executar_apos__lte=agora
+    ) | Tarefa.objects.filter(
+        status='executando', data_atualizacao__lt=agora - TEMPO_LIMITE
+    )
+    reservadas = []
+    for tarefa in candidatas.order_by('executar_apos', 'id')[:limite]:
+        atualizadas = Tarefa.objects.filter(
+            pk=tarefa.pk, status=tarefa.status, data_atualizacao=tarefa.data_atualizacao
+        ).update(status='executando', data_atualizacao=agora)
+        if atualizadas:
+            tarefa.status = 'executando'
+            tarefa.data_atualizacao = agora
+            reservadas.append(tarefa)
+    return reservadas
+
+
+def finalizar(tarefa, **campos):
+    """
+    Grava o resultado da execução, só se a tarefa ainda for desta reserva
+
+    Uma tarefa marcada com ``repetir`` durante a execução volta para a fila
+    em vez de receber o resultado.
+    """
+    agora = timezone.now()
+    reserva = Tarefa.objects.filter(pk=tarefa.pk, status='executando', data_atualizacao=tarefa.data_atualizacao)
+    if not reserva.filter(repetir=False).update(data_atualizacao=agora, **campos):
+        reserva.filter(repetir=True).update(
+            status='pendente', tentativas=0, erro='', repetir=False, executar_apos=agora, data_atualizacao=agora
+        )
+
+
+def executar(tarefa):
+    """Executa a tarefa reservada e registra o resultado; retorna True se concluiu"""
+    funcao = TAREFAS.get(tarefa.nome)
+    try:
+        if funcao is None:
+            raise LookupError(f'Tarefa não registrada: {tarefa.nome}')
+        funcao(**tarefa.argumentos)
+    except Exception:
+        tentativas = tarefa.tentativas + 1
+        erro = traceback.format_exc()
+        if tentativas >= tarefa.max_tentativas or funcao is None:
+            logger.error('Tarefa %s (%s) falhou: %s', tarefa.pk, tarefa.nome, erro)
+            finalizar(tarefa, status='falhou', tentativas=tentativas, erro=erro)
+        else:
+            finalizar(
+                tarefa, status='pendente', tentativas=tentativas, erro=erro,
+                executar_apos=timezone.now() + ESPERA_BASE * 2 ** (tentativas - 1)
+            )
+        return False
+    finalizar(tarefa, status='concluida', erro='')
+    return True
+
+
+def processar_pendentes(limite=10):
+    """
+    Executa as tarefas prontas até a fila esvaziar
+
+    Retorna (concluídas, falhas).
+    """
+    concluidas = falhas = 0
+    while True:
+        reservadas = reservar(limite)
+        if not reservadas:
+            return concluidas, falhas
+        for tarefa in reservadas:
+            if executar(tarefa):
+                concluidas += 1
+            else:
+                falhas += 1
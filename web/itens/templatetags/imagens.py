@@ -0,0 +1,38 @@
+"""
+Template tags para exibir as fotos dos itens com rendições responsivas
+"""
+
+from django import template
+
+from itens import imagens
+
+register = template.Library()
+
+
+@register.inclusion_tag('itens/imagem_item.html')
+def imagem_item(item, rendicao='card', classe='', estilo='', tamanhos='100vw'):
+    """
+    Foto do item em ``<picture>`` com ``srcset`` WebP/JPEG e placeholder
+
+    Uso: ``{% imagem_item item 'card' classe='card-img-top' tamanhos='(min-width: 992px) 25vw, 100vw' %}``.
+    Enquanto as rendições não existem (a geração é enfileirada), exibe a foto original.
+    """
+    foto = item.foto
+    contexto = {
+        'alt': item.titulo,
+        'classe': classe,
+        'estilo': estilo,
+        'tamanhos': tamanhos,
+        'original': foto.url,
+        'prontas': imagens.rendicoes_prontas(foto.name, foto.storage),
+    }
+    if not contexto['prontas']:
+        imagens.solicitar_rendicoes(foto.name)
+    else:
+        contexto.update({
+            'src': imagens.url_rendicao(foto.name, rendicao, 'jpg', foto.storage),
+            'srcset_webp': imagens.srcset(foto.name, rendicao, 'webp', foto.storage),
+            'srcset_jpg': imagens.srcset(foto.name, rendicao, 'jpg', foto.storage),
+            'placeholder': imagens.url_rendicao(foto.name, 'placeholder', 'jpg', foto.storage),
+        })
+    return contexto
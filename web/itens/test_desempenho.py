@@ -0,0 +1,270 @@
+"""
+Testes de regressão de desempenho (número de consultas SQL por view)
+
+Semeia um conjunto de dados realista (milhares de itens, comentários e
+contatos) e verifica, para cada URL nomeada do projeto, um limite superior de
+consultas SQL. Um N+1 introduzido em qualquer template ou view faz o teste
+falhar, pois o número de consultas passa a crescer com o tamanho da página.
+Também verifica que as consultas mais frequentes usam índices (EXPLAIN).
+
+O tempo de resposta de cada URL também é medido. Para gravar um relatório
+JSON e comparar branches:
+
+    DESEMPENHO_RELATORIO=desempenho.json python manage.py test itens.test_desempenho
+
+Variáveis de ambiente opcionais:
+    DESEMPENHO_ITENS       quantidade de itens semeados (padrão: 2000)
+    DESEMPENHO_REPETICOES  requisições por URL para medir o tempo (padrão: 3)
+"""
+
+import json
+import os
+import re
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from itens import contadores, similares, visualizacoes
+from itens.busca import obter_backend
+from itens.models import (
+    Item, Comentario, ContatoItem,
+    TIPO_ITEM_CHOICES, CATEGORIA_CHOICES, BLOCO_CHOICES
+)
+
+QUANTIDADE_ITENS = int(os.environ.get('DESEMPENHO_ITENS', 2000))
+REPETICOES = int(os.environ.get('DESEMPENHO_REPETICOES', 3))
+ARQUIVO_RELATORIO = os.environ.get('DESEMPENHO_RELATORIO')
+
+PALAVRAS = [
+    'celular', 'carteira', 'chave', 'óculos', 'mochila', 'caderno', 'garrafa',
+    'fone', 'carregador', 'documento', 'crachá', 'casaco', 'livro', 'relógio',
+    'preto', 'azul', 'vermelho', 'couro', 'pequeno', 'grande', 'samsung',
+]
+
+
+def texto_sintetico(semente, quantidade):
+    """Texto determinístico a partir de uma semente numérica"""
+    return ' '.join(PALAVRAS[(semente * 7 + i * 3) % len(PALAVRAS)] for i in range(quantidade))
+
+
+def semear_dados(quantidade_itens):
+    """Cria usuários, itens, comentários e contatos em lote"""
+    agora = timezone.now()
+    usuarios = User.objects.bulk_create([
+        User(username=f'usuario{i}', email=f'usuario{i}@uft.edu.br', first_name=f'Usuário {i}')
+        for i in range(50)
+    ])
+    usuarios = list(User.objects.order_by('pk'))
+
+    tipos = [codigo for codigo, _ in TIPO_ITEM_CHOICES]
+    categorias = [codigo for codigo, _ in CATEGORIA_CHOICES]
+    blocos = [codigo for codigo, _ in BLOCO_CHOICES]
+    status = ['ativo'] * 7 + ['resolvido'] * 2 + ['expirado']
+
+    Item.objects.bulk_create([
+        Item(
+            titulo=texto_sintetico(i, 3).title(),
+            descricao=texto_sintetico(i + 1, 40),
+            categoria=categorias[i % len(categorias)],
+            tipo=tipos[i % 2],
+            bloco=blocos[i % len(blocos)],
+            local_especifico=f'Sala {i % 300}',
+            data_ocorrencia=agora - timedelta(hours=i),
+            usuario=usuarios[i % len(usuarios)],
+            status=status[i % len(status)],
+        )
+        for i in range(quantidade_itens)
+    ], batch_size=500)
+    # data_postagem (auto_now_add) é igual para todos no bulk_create; espalha no tempo
+    for i, pk in enumerate(Item.objects.order_by('pk').values_list('pk', flat=True)):
+        if i % 100 == 0:
+            Item.objects.filter(pk__gte=pk).update(data_postagem=agora - timedelta(days=i // 100))
+
+    item_ids = list(Item.objects.values_list('pk', 'usuario_id'))
+    Comentario.objects.bulk_create([
+        Comentario(item_id=item_id, usuario=usuarios[(i + j) % len(usuarios)], texto=texto_sintetico(i + j, 12))
+        for i, (item_id, _) in enumerate(item_ids)
+        for j in range(2)
+    ], batch_size=1000)
+    ContatoItem.objects.bulk_create([
+        ContatoItem(
+            item_id=item_id,
+            usuario_interessado=usuarios[(i + 1) % len(usuarios)],
+            mensagem=texto_sintetico(i, 10),
+            visualizado=i % 3 == 0,
+        )
+        for i, (item_id, usuario_id) in enumerate(item_ids)
+        if usuarios[(i + 1) % len(usuarios)].pk != usuario_id
+    ], batch_size=1000)
+
+    # bulk_create não dispara signals: reconstrói as estruturas derivadas
+    obter_backend().reconstruir()
+    contadores.reconciliar()
+    similares.reconstruir()
+    return usuarios
+
+
+@override_settings(VISUALIZACOES_INTERVALO_DESCARGA=3600)
+class ConsultasPorViewTest(TestCase):
+    """
+    Limite de consultas SQL por view com o banco populado
+
+    Cada entrada: (nome da URL, kwargs, parâmetros GET, usuário logado?, máximo de consultas).
+    Os valores dos kwargs são nomes de atributos da classe com o objeto alvo.
+    Ficam de fora as URLs que só alteram estado (logout, adicionar-comentario,
+    marcar-resolvido) e o admin.
+    """
+    CENARIOS = [
+        ('pagina-inicial', None, {}, False, 1),
+        ('pagina-inicial', None, {}, True, 3),
+        ('login', None, {}, False, 0),
+        ('registro', None, {}, False, 0),
+        ('sobre', None, {}, False, 0),
+        ('sobre', None, {}, True, 2),
+        ('itens:listar-itens', None, {}, False, 2),
+        ('itens:listar-itens', None, {'page': 5}, False, 2),
+        ('itens:listar-itens', None, {'busca': 'celular preto'}, False, 2),
+        ('itens:listar-itens', None, {'tipo': 'perdido', 'categoria': 'eletronicos', 'status': 'ativo'}, False, 2),
+        ('itens:listar-itens', None, {'modo': 'cursor'}, False, 1),
+        ('itens:listar-itens', None, {'modo': 'cursor', 'total': 1}, False, 2),
+        ('itens:listar-itens', None, {}, True, 4),
+        ('itens:detalhe-item', {'pk': 'item'}, {}, False, 4),
+        ('itens:detalhe-item', {'pk': 'item'}, {}, True, 7),
+        ('itens:criar-item', None, {}, True, 2),
+        ('itens:editar-item', {'pk': 'item'}, {}, True, 3),
+        ('itens:deletar-item', {'pk': 'item'}, {}, True, 5),
+        ('itens:contato-direto', {'item_id': 'item_outro'}, {}, True, 5),
+        ('itens:meus-itens', None, {}, True, 7),
+        ('itens:contatos-recebidos', None, {}, True, 7),
+        ('itens:itens-recentes-api', None, {}, False, 1),
+        ('itens:itens-api', None, {}, False, 2),
+        ('itens:itens-api', None, {'busca': 'celular', 'total': 1}, False, 3),
+        ('api-v1:listar-itens', None, {}, False, 2),
+        ('api-v1:listar-itens', None, {'busca': 'celular', 'categoria': 'eletronicos'}, False, 2),
+        ('api-v1:detalhe-item', {'pk': 'item'}, {}, False, 2),
+        ('api-v1:comentarios-item', {'pk': 'item'}, {}, False, 3),
+        ('api-v1:alteracoes-itens', None, {}, False, 3),
+    ]
+
+    resultados = []
+
+    @classmethod
+    def setUpTestData(cls):
+        usuarios = semear_dados(QUANTIDADE_ITENS)
+        cls.usuario = usuarios[0]
+        cls.item = Item.objects.filter(usuario=cls.usuario, status='ativo').first()
+        cls.item_outro = Item.objects.exclude(usuario=cls.usuario).filter(status='ativo').exclude(
+            contatos__usuario_interessado=cls.usuario
+        ).first()
+
+    @classmethod
+    def tearDownClass(cls):
+        if ARQUIVO_RELATORIO and cls.resultados:
+            with open(ARQUIVO_RELATORIO, 'w', encoding='utf-8') as arquivo:
+                json.dump({
+                    'itens': QUANTIDADE_ITENS,
+                    'repeticoes': REPETICOES,
+                    'resultados': cls.resultados,
+                }, arquivo, ensure_ascii=False, indent=2)
+        super().tearDownClass()
+
+    def setUp(self):
+        # O log de consultas é limitado; a semeadura o deixa cheio
+        connection.queries_log.clear()
+        cache.clear()
+        # Ocupa o intervalo de descarga para não misturar o UPDATE das visualizações
+        visualizacoes.descarregar_se_necessario()
+
+    def requisitar(self, url, parametros):
+        response = self.client.get(url, parametros)
+        self.assertIn(response.status_code, (200, 302))
+        # Força a renderização de respostas preguiçosas
+        getattr(response, 'content', None)
+        return response
+
+    def test_consultas_por_view(self):
+        """Testa o limite de consultas SQL de cada URL"""
+        for nome, kwargs, parametros, autenticado, maximo in self.CENARIOS:
+            if kwargs:
+                kwargs = {chave: getattr(self, atributo).pk for chave, atributo in kwargs.items()}
+            url = reverse(nome, kwargs=kwargs)
+            with self.subTest(url=nome, parametros=parametros, autenticado=autenticado):
+                self.client.logout()
+                if autenticado:
+                    self.client.force_login(self.usuario)
+
+                # Primeira requisição aquece caches; a segunda é a medida
+                self.requisitar(url, parametros)
+                with CaptureQueriesContext(connection) as captura:
+                    self.requisitar(url, parametros)
+                # Copia antes das próximas requisições limparem o log de consultas
+                consultas = [consulta['sql'] for consulta in captura.captured_queries]
+
+                tempos = []
+                for _ in range(REPETICOES):
+                    inicio = time.perf_counter()
+                    self.requisitar(url, parametros)
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+
+                self.resultados.append({
+                    'url': nome,
+                    'parametros': parametros,
+                    'autenticado': autenticado,
+                    'consultas': len(consultas),
+                    'limite': maximo,
+                    'tempo_ms': round(statistics.median(tempos), 2),
+                })
+                self.assertLessEqual(
+                    len(consultas), maximo,
+                    f'{nome} executou {len(consultas)} consultas (limite {maximo}):\n' +
+                    '\n'.join(consultas)
+                )
+
+
+class PlanosConsultaTest(TestCase):
+    """
+    Planos (EXPLAIN QUERY PLAN) das consultas mais frequentes
+
+    Cada consulta deve ser resolvida por busca em índice: um SCAN da tabela
+    (leitura de todas as linhas) indica que um índice foi removido ou deixou de
+    corresponder ao formato da consulta.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = semear_dados(300)[0]
+
+    def consultas(self):
+        publicos = Item.objects.filter(status__in=['ativo', 'resolvido'])
+        return {
+            'listagem': publicos.order_by('-data_postagem')[:12],
+            'listagem por tipo': publicos.filter(tipo='perdido').order_by('-data_postagem')[:12],
+            'listagem por categoria': publicos.filter(categoria='eletronicos').order_by('-data_postagem')[:12],
+            'listagem por bloco': publicos.filter(bloco='bloco_a').order_by('-data_postagem')[:12],
+            'listagem por cursor': publicos.order_by('-data_postagem', '-id')[:13],
+            'ativos recentes': Item.objects.filter(status='ativo').order_by('-data_postagem')[:10],
+            'ativos por categoria': Item.objects.filter(status='ativo', categoria='eletronicos')
+                .order_by('-data_postagem')[:4],
+            'contatos não lidos': ContatoItem.objects.filter(
+                item__usuario_id=self.usuario.pk, visualizado=False
+            ).order_by(),
+        }
+
+    def test_consultas_usam_indices(self):
+        """Testa que nenhuma consulta frequente percorre a tabela inteira"""
+        for nome, consulta in self.consultas().items():
+            with self.subTest(consulta=nome):
+                plano = consulta.explain()
+                varreduras = [
+                    linha for linha in plano.splitlines()
+                    if re.search(r'\bSCAN (itens_item|itens_contatoitem)\b', linha) and 'INDEX' not in linha
+                ]
+                self.assertFalse(varreduras, f'{nome} percorre a tabela inteira:\n{plano}')
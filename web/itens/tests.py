@@ -2,14 +2,57 @@
 Testes unitários para o sistema de Achados & Perdidos da UFT Palmas
 """
 
-from django.test import TestCase
+from django.test import RequestFactory, TestCase, override_settings
 from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.template import Context, Template
+from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
+from io import BytesIO, StringIO
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
 
-from itens.models import Item, Comentario
+from asgiref.sync import async_to_sync, sync_to_async
+from PIL import Image
+
+from itens.models import (
+    BuscaSalva, Item, Comentario, ContatoItem, ItemArquivado, ItemRemovido, ItemSimilar, SugestaoCorrespondencia,
+    Tarefa, TermoItem
+)
 from itens.forms import FormularioItem, FormularioComentario
+from itens import (
+    alertas, arquivo, cache_filtros, contadores, correspondencias, em_lote, eventos, expiracao, imagens, notificacoes,
+    similares, sincronizacao, tarefas, visualizacoes
+)
+from itens.busca import obter_backend
+from itens.paginacao import PaginadorCursor, CursorInvalido, decodificar_cursor
+from itens.texto import tokenizar
+from itens.views import ListarItens
+from itens.views_assincronas import ListarItensAssincrona, DetalheItemAssincrona
+from achados_perdidos_uft import banco, caches
+from achados_perdidos_uft.context_processors import notificacoes_usuario
+
 
+def criar_item(usuario, **campos):
+    """Cria um item do usuário; os campos não informados recebem valores padrão"""
+    titulo = campos.pop('titulo', 'Item de teste')
+    dados = {
+        'descricao': f'{titulo} no campus',
+        'categoria': 'outros',
+        'tipo': 'perdido',
+        'bloco': 'bloco_a',
+        'data_ocorrencia': timezone.now(),
+        **campos,
+    }
+    return Item.objects.create(titulo=titulo, usuario=usuario, **dados)
 
 
 class ItemModelTest(TestCase):
@@ -231,3 +274,1925 @@ class ItemManagerTest(TestCase):
         """Testa filtro por status de item"""
         ativos = Item.objects.filter(status='ativo')
         self.assertEqual(ativos.count(), 2)
+
+
+class BuscaItensTest(TestCase):
+    """Testes do índice de busca textual"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(username='user', password='pass')
+        self.oculos = Item.objects.create(
+            titulo='Óculos de grau',
+            descricao='Óculos com armação preta dentro de um estojo azul',
+            categoria='oculos',
+            tipo='perdido',
+            bloco='bloco_1',
+            data_ocorrencia=timezone.now(),
+            usuario=self.usuario
+        )
+        self.carteira = Item.objects.create(
+            titulo='Carteira marrom',
+            descricao='Carteira de couro com documentos, esquecida no restaurante',
+            categoria='carteira_bolsa',
+            tipo='encontrado',
+            bloco='restaurante_ru',
+            local_especifico='Mesa próxima aos óculos de sol da vitrine',
+            data_ocorrencia=timezone.now(),
+            usuario=self.usuario
+        )
+
+    def buscar(self, termo):
+        return list(obter_backend().filtrar(Item.objects.all(), termo).order_by('-relevancia'))
+
+    def test_tokenizar_ignora_acentos_e_plural(self):
+        """Testa que variações de acento e plural geram o mesmo radical"""
+        self.assertEqual(tokenizar('Óculos'), tokenizar('oculo'))
+        self.assertEqual(tokenizar('celulares'), tokenizar('celular'))
+        self.assertEqual(tokenizar('o celular da carteira'), ['celular', 'carteir'])
+
+    def test_busca_sem_acento(self):
+        """Testa que a busca encontra itens independente de acentos"""
+        self.assertIn(self.oculos, self.buscar('oculos'))
+        self.assertEqual(self.buscar('carteiras'), [self.carteira])
+
+    def test_busca_ordenada_por_relevancia(self):
+        """Testa que ocorrências no título pesam mais que no local"""
+        self.assertEqual(self.buscar('óculos'), [self.oculos, self.carteira])
+
+    def test_busca_prefixo(self):
+        """Testa busca por palavra incompleta"""
+        self.assertEqual(self.buscar('estoj'), [self.oculos])
+
+    def test_busca_por_juncao(self):
+        """Testa que a busca junta a tabela do índice uma vez, sem subconsulta por linha"""
+        sql = str(obter_backend().filtrar(Item.objects.all(), 'óculos').query)
+        self.assertEqual(sql.count('JOIN "itens_item_busca"'), 1)
+        self.assertNotIn('SELECT', sql[1:])
+
+    def test_indice_sincronizado(self):
+        """Testa atualização do índice ao editar e remover itens"""
+        self.oculos.titulo = 'Guarda-chuva'
+        self.oculos.descricao = 'Guarda-chuva vermelho'
+        self.oculos.save()
+        self.assertEqual(self.buscar('estojo'), [])
+
+        self.carteira.delete()
+        self.assertEqual(self.buscar('carteira'), [])
+
+    def test_reindexar_busca(self):
+        """Testa o comando de reconstrução do índice"""
+        obter_backend().limpar()
+        self.assertEqual(self.buscar('carteira'), [])
+        call_command('reindexar_busca', stdout=StringIO())
+        self.assertEqual(self.buscar('carteira'), [self.carteira])
+
+    def test_listagem_com_busca(self):
+        """Testa a listagem filtrada pelo campo de busca"""
+        response = self.client.get(reverse('itens:listar-itens'), {'busca': 'oculos'})
+        self.assertEqual(list(response.context['itens']), [self.oculos, self.carteira])
+
+
+class ContadoresTest(TestCase):
+    """Testes dos contadores do painel"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user(username='user', password='pass')
+        self.itens = [
+            Item.objects.create(
+                titulo=f'Item {tipo} {i}',
+                descricao='Descrição',
+                categoria='outros',
+                tipo=tipo,
+                bloco='bloco_1',
+                data_ocorrencia=timezone.now(),
+                usuario=self.usuario
+            )
+            for i, tipo in enumerate(['perdido', 'perdido', 'encontrado'])
+        ]
+
+    def test_contadores_apos_criacao(self):
+        """Testa contadores após criar itens"""
+        totais = contadores.totais()
+        self.assertEqual(totais['total_perdidos'], 2)
+        self.assertEqual(totais['total_encontrados'], 1)
+        self.assertEqual(totais['total_resolvidos'], 0)
+        self.assertEqual(totais['total_usuarios'], 1)
+
+    def test_contadores_em_cache(self):
+        """Testa que a leitura repetida não consulta o banco"""
+        contadores.totais()
+        with self.assertNumQueries(0):
+            contadores.totais()
+
+    def test_contadores_resolucao_e_remocao(self):
+        """Testa contadores ao resolver e remover itens"""
+        self.itens[0].marcar_como_resolvido()
+        self.itens[2].delete()
+        totais = contadores.totais()
+        self.assertEqual(totais['total_perdidos'], 1)
+        self.assertEqual(totais['total_encontrados'], 0)
+        self.assertEqual(totais['total_resolvidos'], 1)
+
+    def test_contadores_atualizacao_em_lote(self):
+        """Testa contadores após ação em lote do admin"""
+        atualizados = em_lote.atualizar(Item.objects.all(), status='spam')
+        self.assertEqual(atualizados, 3)
+        totais = contadores.totais()
+        self.assertEqual(totais['total_perdidos'], 0)
+        self.assertEqual(totais['total_encontrados'], 0)
+        self.assertEqual(contadores.reconciliar(), [])
+
+    def test_reconciliar_corrige_divergencia(self):
+        """Testa que a reconciliação recalcula contadores divergentes"""
+        Item.objects.filter(pk=self.itens[0].pk).update(status='resolvido')
+        call_command('reconciliar_contadores', stdout=StringIO())
+        totais = contadores.totais()
+        self.assertEqual(totais['total_perdidos'], 1)
+        self.assertEqual(totais['total_resolvidos'], 1)
+
+
+@override_settings(VISUALIZACOES_INTERVALO_DESCARGA=3600)
+class VisualizacoesTest(TestCase):
+    """Testes do contador de visualizações com escrita adiada"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user(username='user', password='pass')
+        self.itens = [
+            Item.objects.create(
+                titulo=f'Item {i}',
+                descricao='Descrição',
+                categoria='outros',
+                tipo='perdido',
+                bloco='bloco_1',
+                data_ocorrencia=timezone.now(),
+                usuario=self.usuario
+            )
+            for i in range(3)
+        ]
+        # Ocupa o intervalo de descarga automática
+        visualizacoes.descarregar_se_necessario()
+
+    def test_registrar_nao_escreve_no_banco(self):
+        """Testa que registrar visualizações não consulta o banco"""
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                visualizacoes.registrar(self.itens[0].pk)
+        self.assertEqual(visualizacoes.pendentes(self.itens[0].pk), 5)
+
+    def test_descarregar_em_um_update(self):
+        """Testa que a descarga grava todos os itens em uma única consulta"""
+        for item, quantidade in zip(self.itens, [3, 1, 2]):
+            visualizacoes.registrar(item.pk, quantidade)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(visualizacoes.descarregar(), 3)
+
+        valores = dict(Item.objects.values_list('pk', 'visualizacoes'))
+        self.assertEqual([valores[item.pk] for item in self.itens], [3, 1, 2])
+        self.assertEqual(visualizacoes.pendentes(self.itens[0].pk), 0)
+
+    def test_registros_apos_descarga(self):
+        """Testa que visualizações posteriores entram na próxima descarga"""
+        visualizacoes.registrar(self.itens[0].pk)
+        visualizacoes.descarregar()
+        visualizacoes.registrar(self.itens[0].pk, 2)
+        visualizacoes.descarregar()
+
+        self.itens[0].refresh_from_db()
+        self.assertEqual(self.itens[0].visualizacoes, 3)
+        self.assertEqual(visualizacoes.descarregar(), 0)
+
+    def test_falha_na_gravacao_nao_perde_visualizacoes(self):
+        """Testa que, se o UPDATE falhar, as contagens ficam para a próxima descarga"""
+        visualizacoes.registrar(self.itens[0].pk, 2)
+        with patch.object(visualizacoes.Item.objects, 'filter', side_effect=RuntimeError('banco indisponível')):
+            with self.assertRaises(RuntimeError):
+                visualizacoes.descarregar()
+        self.assertEqual(visualizacoes.pendentes(self.itens[0].pk), 2)
+
+        self.assertEqual(visualizacoes.descarregar(), 1)
+        self.itens[0].refresh_from_db()
+        self.assertEqual(self.itens[0].visualizacoes, 2)
+
+    def test_comando_exige_cache_compartilhado(self):
+        """Testa o comando: recusado com o cache do processo, executado com cache em arquivo"""
+        with self.assertRaises(CommandError):
+            call_command('descarregar_visualizacoes', stdout=StringIO())
+
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        with override_settings(CACHES=caches.configuracao_cache(
+            Path(diretorio), {'CACHE_BACKEND': 'arquivo', 'CACHE_LOCAL': diretorio}
+        )):
+            visualizacoes.descarregar_se_necessario()
+            visualizacoes.registrar(self.itens[0].pk, 4)
+            saida = StringIO()
+            call_command('descarregar_visualizacoes', stdout=saida)
+        self.assertIn('1 item(ns)', saida.getvalue())
+        self.itens[0].refresh_from_db()
+        self.assertEqual(self.itens[0].visualizacoes, 4)
+
+    def test_descarga_nao_altera_data_atualizacao(self):
+        """Testa que visualizações não contam como edição do item"""
+        data_atualizacao = self.itens[0].data_atualizacao
+        visualizacoes.registrar(self.itens[0].pk)
+        visualizacoes.descarregar()
+        self.itens[0].refresh_from_db()
+        self.assertEqual(self.itens[0].data_atualizacao, data_atualizacao)
+
+
+@override_settings(VISUALIZACOES_INTERVALO_DESCARGA=3600)
+class DetalheItemTest(TestCase):
+    """Testes da página de detalhes do item"""
+
+    def setUp(self):
+        cache.clear()
+        visualizacoes.descarregar_se_necessario()
+        self.dono = User.objects.create_user(username='dono', password='pass')
+        self.visitante = User.objects.create_user(username='visitante', password='pass')
+        self.item = Item.objects.create(
+            titulo='Mochila azul',
+            descricao='Mochila azul com cadernos e livro de cálculo',
+            categoria='livros_material',
+            tipo='perdido',
+            bloco='bloco_a',
+            data_ocorrencia=timezone.now(),
+            usuario=self.dono,
+            resolvido_por=self.visitante
+        )
+        for i in range(5):
+            Comentario.objects.create(item=self.item, usuario=self.visitante, texto=f'Comentário {i}')
+            Item.objects.create(
+                titulo=f'Livro {i}',
+                descricao='Livro de cálculo',
+                categoria='livros_material',
+                tipo='encontrado',
+                bloco='biblioteca',
+                data_ocorrencia=timezone.now(),
+                usuario=self.visitante
+            )
+        ContatoItem.objects.create(
+            item=self.item, usuario_interessado=self.visitante, mensagem='É minha!', visualizado=True
+        )
+        # Índice de similares e sugestões calculados
+        tarefas.processar_pendentes()
+        self.url = reverse('itens:detalhe-item', kwargs={'pk': self.item.pk})
+
+    def test_numero_de_consultas_anonimo(self):
+        """Testa item, comentários, sugestões de correspondência e similares em 4 consultas"""
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['comentarios']), 5)
+        self.assertEqual(len(response.context['itens_similares']), 4)
+
+    def test_numero_de_consultas_autenticado(self):
+        """Testa que o usuário logado adiciona apenas sessão, usuário e contato"""
+        self.client.force_login(self.visitante)
+        # Badge de notificações já em cache: leitura sem consulta ao banco
+        notificacoes.contatos_nao_lidos(self.visitante.pk)
+        with self.assertNumQueries(7):
+            response = self.client.get(self.url)
+        self.assertIsNotNone(response.context['contato_existente'])
+
+    def test_uma_visualizacao_por_acesso(self):
+        """Testa que cada acesso conta apenas uma visualização"""
+        self.client.get(self.url)
+        self.assertEqual(visualizacoes.pendentes(self.item.pk), 1)
+
+
+class MeusItensTest(TestCase):
+    """Testes da página de itens do usuário"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(username='dono', password='pass')
+        self.outro = User.objects.create_user(username='outro', password='pass')
+        self.item = Item.objects.create(
+            titulo='Chaveiro',
+            descricao='Chaveiro com três chaves',
+            categoria='chaves',
+            tipo='perdido',
+            bloco='bloco_c',
+            data_ocorrencia=timezone.now(),
+            usuario=self.usuario
+        )
+        Item.objects.create(
+            titulo='Garrafa',
+            descricao='Garrafa térmica',
+            categoria='outros',
+            tipo='perdido',
+            bloco='bloco_c',
+            data_ocorrencia=timezone.now(),
+            usuario=self.usuario,
+            status='resolvido'
+        )
+        for i in range(3):
+            Comentario.objects.create(item=self.item, usuario=self.outro, texto=f'Comentário {i}')
+        ContatoItem.objects.create(item=self.item, usuario_interessado=self.outro, mensagem='Oi', visualizado=True)
+        ContatoItem.objects.create(item=self.item, usuario_interessado=self.usuario, mensagem='Oi')
+
+    def test_contagens_anotadas(self):
+        """Testa as contagens anotadas no queryset"""
+        item = Item.objects.com_contagens().get(pk=self.item.pk)
+        self.assertEqual(item.num_comentarios, 3)
+        self.assertEqual(item.num_contatos, 2)
+        self.assertEqual(item.num_contatos_nao_lidos, 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(item.contatos_nao_lidos(), 1)
+
+    def test_contagens_sem_juncao_multiplicada(self):
+        """Testa as contagens com vários comentários e contatos no mesmo item e num item sem nenhum"""
+        ContatoItem.objects.create(item=self.item, usuario_interessado=self.outro, mensagem='De novo')
+        Comentario.objects.create(item=self.item, usuario=self.usuario, texto='Resposta')
+        contagens = {
+            item.pk: (item.num_comentarios, item.num_contatos, item.num_contatos_nao_lidos)
+            for item in Item.objects.com_contagens().filter(usuario=self.usuario)
+        }
+        self.assertEqual(contagens[self.item.pk], (4, 3, 2))
+        self.assertEqual(set(contagens.values()) - {(4, 3, 2)}, {(0, 0, 0)})
+        sql = str(Item.objects.com_contagens().query)
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('GROUP BY "itens_item"', sql)
+
+    def test_totais_do_resumo(self):
+        """Testa os totais exibidos no resumo"""
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('itens:meus-itens'))
+        self.assertEqual(response.context['total_itens'], 2)
+        self.assertEqual(response.context['total_ativos'], 1)
+        self.assertEqual(response.context['total_resolvidos'], 1)
+        self.assertContains(response, '3 comentário(s)')
+
+
+class NotificacoesTest(TestCase):
+    """Testes do contador de contatos não lidos"""
+
+    def setUp(self):
+        cache.clear()
+        self.dono = User.objects.create_user(username='dono', password='pass')
+        self.interessado = User.objects.create_user(username='interessado', password='pass')
+        self.item = Item.objects.create(
+            titulo='Carteira',
+            descricao='Carteira de couro marrom',
+            categoria='documentos',
+            tipo='perdido',
+            bloco='bloco_a',
+            data_ocorrencia=timezone.now(),
+            usuario=self.dono
+        )
+        ContatoItem.objects.create(item=self.item, usuario_interessado=self.interessado, mensagem='É minha')
+
+    def test_contador_criado_sob_demanda(self):
+        """Testa a criação do contador na primeira leitura e a leitura do cache"""
+        self.assertEqual(notificacoes.contatos_nao_lidos(self.dono.pk), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(notificacoes.contatos_nao_lidos(self.dono.pk), 1)
+
+    def test_signals_ajustam_contador(self):
+        """Testa criação, leitura e remoção de contatos"""
+        notificacoes.contatos_nao_lidos(self.dono.pk)
+        contato = ContatoItem.objects.create(item=self.item, usuario_interessado=self.dono, mensagem='Oi')
+        self.assertEqual(notificacoes.contatos_nao_lidos(self.dono.pk), 2)
+
+        contato.visualizado = True
+        contato.save()
+        self.assertEqual(notificacoes.contatos_nao_lidos(self.dono.pk), 1)
+
+        ContatoItem.objects.filter(visualizado=False).delete()
+        self.assertEqual(notificacoes.contatos_nao_lidos(self.dono.pk), 0)
+
+    def test_contatos_recebidos_zera_contador(self):
+        """Testa que abrir os contatos recebidos zera o badge"""
+        notificacoes.contatos_nao_lidos(self.dono.pk)
+        self.client.force_login(self.dono)
+        response = self.client.get(reverse('itens:contatos-recebidos'))
+        self.assertEqual(response.context['total_contatos_nao_lidos'], 0)
+        self.assertEqual(notificacoes.contatos_nao_lidos(self.dono.pk), 0)
+
+    def test_badge_preguicoso_e_memorizado(self):
+        """Testa que o badge só é contado quando usado e uma vez por request"""
+        request = RequestFactory().get('/')
+        request.user = self.dono
+        with self.assertNumQueries(0):
+            contexto = notificacoes_usuario(request)
+        self.assertEqual(contexto['total_contatos_nao_lidos'], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(notificacoes_usuario(request)['total_contatos_nao_lidos'], 1)
+
+    def test_reconciliar(self):
+        """Testa a correção de contadores divergentes"""
+        notificacoes.contatos_nao_lidos(self.dono.pk)
+        ContatoItem.objects.update(visualizado=True)
+        divergencias = notificacoes.reconciliar()
+        self.assertEqual(divergencias, [(self.dono.pk, 1, 0)])
+        self.assertEqual(notificacoes.contatos_nao_lidos(self.dono.pk), 0)
+
+
+class PaginacaoCursorTest(TestCase):
+    """Testes da paginação por cursor da listagem e da API"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user(username='dono', password='pass')
+        agora = timezone.now()
+        for i in range(7):
+            Item.objects.create(
+                titulo=f'Item {i}',
+                descricao='Descrição',
+                categoria='outros',
+                tipo='perdido',
+                bloco='bloco_a',
+                data_ocorrencia=agora,
+                usuario=self.usuario
+            )
+        # Dois itens com a mesma data de postagem exigem o desempate pelo id
+        Item.objects.update(data_postagem=agora)
+        Item.objects.filter(titulo__in=['Item 0', 'Item 1']).update(data_postagem=agora - timedelta(days=1))
+        self.esperado = list(Item.objects.order_by('-data_postagem', '-id').values_list('pk', flat=True))
+
+    def test_percorre_todas_as_paginas(self):
+        """Testa ida e volta pelas páginas sem repetir nem pular itens"""
+        paginador = PaginadorCursor(Item.objects.all(), 3)
+        paginas = [paginador.pagina()]
+        while paginas[-1].has_next:
+            paginas.append(paginador.pagina(paginas[-1].cursor_proximo))
+        self.assertEqual([item.pk for pagina in paginas for item in pagina], self.esperado)
+        self.assertFalse(paginas[0].has_previous)
+
+        anterior = paginador.pagina(paginas[-1].cursor_anterior)
+        self.assertEqual([item.pk for item in anterior], [item.pk for item in paginas[-2]])
+        self.assertTrue(anterior.has_next)
+
+    def test_contagem_opcional(self):
+        """Testa que o total só é calculado quando pedido"""
+        with self.assertNumQueries(1):
+            self.assertIsNone(PaginadorCursor(Item.objects.all(), 3).pagina().total)
+        self.assertEqual(PaginadorCursor(Item.objects.all(), 3, contar=True).pagina().total, 7)
+
+    def test_cursor_invalido(self):
+        """Testa a rejeição de cursores malformados"""
+        with self.assertRaises(CursorInvalido):
+            decodificar_cursor('nao-e-um-cursor')
+        response = self.client.get(reverse('itens:itens-api'), {'cursor': 'xyz'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('itens:listar-itens'), {'modo': 'cursor', 'cursor': 'xyz'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_api_de_itens(self):
+        """Testa a API paginada com filtros e total"""
+        response = self.client.get(reverse('itens:itens-api'), {'limite': 5, 'total': 1})
+        dados = response.json()
+        self.assertEqual([item['id'] for item in dados['itens']], self.esperado[:5])
+        self.assertEqual(dados['total'], 7)
+        self.assertIsNone(dados['cursor_anterior'])
+
+        response = self.client.get(reverse('itens:itens-api'), {'limite': 5, 'cursor': dados['cursor_proximo']})
+        dados = response.json()
+        self.assertEqual([item['id'] for item in dados['itens']], self.esperado[5:])
+        self.assertIsNone(dados['cursor_proximo'])
+        self.assertNotIn('total', dados)
+
+        # Mesma view e mesma representação da API v1
+        parametros = {'limite': 3, 'tipo': 'perdido'}
+        self.assertEqual(
+            self.client.get(reverse('itens:itens-api'), parametros).json(),
+            self.client.get(reverse('api-v1:listar-itens'), parametros).json()
+        )
+
+    def test_listagem_modo_cursor(self):
+        """Testa a listagem HTML no modo cursor"""
+        response = self.client.get(reverse('itens:listar-itens'), {'modo': 'cursor'})
+        self.assertEqual(response.status_code, 200)
+        pagina = response.context['pagina_cursor']
+        self.assertEqual([item.pk for item in response.context['itens']], self.esperado)
+        self.assertFalse(pagina.has_other_pages())
+
+    def test_pagina_vazia_mantem_rodape(self):
+        """Testa que uma página vazia ainda mostra o total e o caminho de volta"""
+        response = self.client.get(
+            reverse('itens:listar-itens'), {'modo': 'cursor', 'total': 1, 'busca': 'inexistente'}
+        )
+        self.assertEqual(len(response.context['pagina_cursor']), 0)
+        self.assertContains(response, '0 item(ns) encontrado(s)')
+
+        # Os itens da página anterior foram removidos depois que o cursor foi gerado
+        paginador = PaginadorCursor(Item.objects.all(), 3)
+        segunda = paginador.pagina(paginador.pagina().cursor_proximo)
+        Item.objects.filter(pk__in=self.esperado[:3]).delete()
+        vazia = paginador.pagina(segunda.cursor_anterior)
+        self.assertEqual(list(vazia), [])
+        self.assertIsNone(vazia.cursor_anterior)
+        volta = paginador.pagina(vazia.cursor_proximo)
+        self.assertEqual([item.pk for item in volta], self.esperado[3:6])
+        response = self.client.get(
+            reverse('itens:listar-itens'), {'modo': 'cursor', 'cursor': segunda.cursor_anterior}
+        )
+        self.assertContains(response, f'cursor={vazia.cursor_proximo}')
+
+
+class ApiV1Test(TestCase):
+    """Testes da API JSON versionada"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(username='dono', password='pass', first_name='Ana')
+        self.item = Item.objects.create(
+            titulo='Celular Samsung',
+            descricao='Celular preto com capa azul',
+            categoria='eletronicos',
+            tipo='perdido',
+            bloco='bloco_a',
+            data_ocorrencia=timezone.now(),
+            usuario=self.usuario,
+            telefone_contato='63999999999'
+        )
+        Item.objects.create(
+            titulo='Guarda-chuva',
+            descricao='Guarda-chuva preto',
+            categoria='outros',
+            tipo='encontrado',
+            bloco='biblioteca',
+            data_ocorrencia=timezone.now(),
+            usuario=self.usuario
+        )
+        Comentario.objects.create(item=self.item, usuario=self.usuario, texto='Ainda procurando')
+        self.url_lista = reverse('api-v1:listar-itens')
+        self.url_detalhe = reverse('api-v1:detalhe-item', kwargs={'pk': self.item.pk})
+
+    def test_lista_com_filtros_e_campos(self):
+        """Testa filtros do FormularioFiltro e seleção de campos"""
+        response = self.client.get(self.url_lista, {'categoria': 'eletronicos', 'campos': 'id,titulo'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['itens'], [{'id': self.item.pk, 'titulo': 'Celular Samsung'}])
+
+    def test_parametros_invalidos(self):
+        """Testa respostas 400 para filtros, campos e limites inválidos"""
+        for parametros in ({'tipo': 'xyz'}, {'campos': 'senha'}, {'limite': 0}, {'limite': 'dez'}):
+            with self.subTest(parametros=parametros):
+                self.assertEqual(self.client.get(self.url_lista, parametros).status_code, 400)
+
+    def test_detalhe_sem_dados_de_contato(self):
+        """Testa que o detalhe não expõe telefone nem email"""
+        dados = self.client.get(self.url_detalhe).json()
+        self.assertEqual(dados['usuario'], 'Ana')
+        self.assertNotIn('telefone_contato', dados)
+        # Visualizações não alteram a ETag: ficam fora da representação
+        self.assertNotIn('visualizacoes', dados)
+        self.assertEqual(dados['comentarios'], reverse('api-v1:comentarios-item', kwargs={'pk': self.item.pk}))
+
+    def test_item_nao_publico(self):
+        """Testa 404 para itens expirados"""
+        Item.objects.filter(pk=self.item.pk).update(status='expirado')
+        self.assertEqual(self.client.get(self.url_detalhe).status_code, 404)
+
+    def test_revalidacao_com_etag(self):
+        """Testa o 304 com If-None-Match e a nova ETag após alteração"""
+        for url in (self.url_lista, self.url_detalhe):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+        etag = self.client.get(self.url_detalhe)['ETag']
+        self.item.titulo = 'Celular Samsung A10'
+        self.item.save()
+        self.assertEqual(self.client.get(self.url_detalhe, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_revalidacao_com_last_modified(self):
+        """Testa o 304 com If-Modified-Since"""
+        ultima = self.client.get(self.url_detalhe)['Last-Modified']
+        response = self.client.get(self.url_detalhe, HTTP_IF_MODIFIED_SINCE=ultima)
+        self.assertEqual(response.status_code, 304)
+
+    def test_comentarios(self):
+        """Testa a lista de comentários e a ETag que muda com novos comentários"""
+        url = reverse('api-v1:comentarios-item', kwargs={'pk': self.item.pk})
+        response = self.client.get(url)
+        self.assertEqual([c['texto'] for c in response.json()['comentarios']], ['Ainda procurando'])
+        Comentario.objects.create(item=self.item, usuario=self.usuario, texto='Novo')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+@override_settings(SINCRONIZACAO_MARGEM=0)
+class SincronizacaoTest(TestCase):
+    """Testes da sincronização por alterações"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(username='dono', password='pass')
+        self.outro = User.objects.create_user(username='outro', password='pass')
+        self.itens = [
+            Item.objects.create(
+                titulo=f'Item {i}',
+                descricao='Descrição',
+                categoria='outros',
+                tipo='perdido',
+                bloco='bloco_a',
+                data_ocorrencia=timezone.now(),
+                usuario=self.outro if i == 4 else self.usuario
+            )
+            for i in range(5)
+        ]
+        self.url = reverse('api-v1:alteracoes-itens')
+
+    def sincronizar(self, token=None, limite=100):
+        parametros = {'limite': limite, 'campos': 'id,status'}
+        if token:
+            parametros['token'] = token
+        response = self.client.get(self.url, parametros)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_lotes_limitados(self):
+        """Testa a sincronização completa em lotes com token de continuação"""
+        ids, token, chamadas = [], None, 0
+        while True:
+            dados = self.sincronizar(token, limite=2)
+            ids += [item['id'] for item in dados['alterados']]
+            token, chamadas = dados['token'], chamadas + 1
+            if not dados['mais']:
+                break
+        self.assertEqual(ids, [item.pk for item in self.itens])
+        self.assertEqual(chamadas, 3)
+        self.assertEqual(self.sincronizar(token)['alterados'], [])
+
+    def test_alteracoes_e_remocoes(self):
+        """Testa edição, exclusão pela view, exclusão em cascata e itens que deixam de ser públicos"""
+        token = self.sincronizar()['token']
+
+        self.itens[0].titulo = 'Editado'
+        self.itens[0].save()
+        self.client.force_login(self.usuario)
+        self.client.post(reverse('itens:deletar-item', kwargs={'pk': self.itens[1].pk}))
+        em_lote.atualizar(Item.objects.filter(pk=self.itens[2].pk), status='expirado')
+        self.outro.delete()
+
+        dados = self.sincronizar(token)
+        self.assertEqual([item['id'] for item in dados['alterados']], [self.itens[0].pk])
+        self.assertEqual(
+            sorted(dados['removidos']),
+            sorted([self.itens[1].pk, self.itens[2].pk, self.itens[4].pk])
+        )
+        self.assertFalse(dados['mais'])
+
+    def test_remocoes_anteriores_ignoradas_sem_token(self):
+        """Testa que a sincronização completa não devolve remoções antigas"""
+        self.itens[0].delete()
+        self.assertEqual(self.sincronizar()['removidos'], [])
+
+    def test_token_invalido_e_expirado(self):
+        """Testa as respostas 400 e 410"""
+        self.assertEqual(self.client.get(self.url, {'token': 'abc'}).status_code, 400)
+        antigo = sincronizacao.codificar_token(None, (timezone.now() - timedelta(days=60), 0))
+        self.assertEqual(self.client.get(self.url, {'token': antigo}).status_code, 410)
+        # Data sem fuso (token montado à mão) também é inválida, não erro 500
+        sem_fuso = sincronizacao.codificar_token(None, (timezone.now().replace(tzinfo=None), 0))
+        self.assertEqual(self.client.get(self.url, {'token': sem_fuso}).status_code, 400)
+
+    def test_limpar_remocoes(self):
+        """Testa a limpeza dos registros além da retenção"""
+        antigo, recente = self.itens[0].pk, self.itens[1].pk
+        Item.objects.filter(pk__in=[antigo, recente]).delete()
+        ItemRemovido.objects.filter(item_id=antigo).update(data_remocao=timezone.now() - timedelta(days=60))
+        self.assertEqual(sincronizacao.limpar_remocoes(), 1)
+        self.assertEqual(list(ItemRemovido.objects.values_list('item_id', flat=True)), [recente])
+
+
+class RendicoesImagemTest(TestCase):
+    """Testes das rendições das fotos"""
+
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=self.media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.usuario = User.objects.create_user(username='dono', password='pass')
+
+    def foto_de_celular(self):
+        """JPEG paisagem 2000x1000 com orientação EXIF de retrato (rotação de 90°)"""
+        imagem = Image.new('RGB', (2000, 1000), (200, 30, 30))
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        conteudo = BytesIO()
+        imagem.save(conteudo, 'JPEG', exif=exif)
+        return SimpleUploadedFile('celular.jpg', conteudo.getvalue(), content_type='image/jpeg')
+
+    def test_rendicoes_geradas_no_upload(self):
+        """Testa a geração pela fila, larguras, formatos e orientação EXIF aplicada"""
+        item = criar_item(self.usuario, foto=self.foto_de_celular())
+        self.assertFalse(imagens.rendicoes_prontas(item.foto.name))
+        tarefas.processar_pendentes()
+        self.assertEqual(Tarefa.objects.get(nome='gerar_rendicoes').status, 'concluida')
+        caminho = os.path.join(self.media, imagens.caminho_rendicao(item.foto.name, 320, 'webp'))
+        with Image.open(caminho) as rendicao:
+            self.assertEqual(rendicao.format, 'WEBP')
+            self.assertEqual(rendicao.size, (320, 640))
+            self.assertNotIn(0x0112, rendicao.getexif())
+        for extensao in imagens.FORMATOS:
+            self.assertTrue(os.path.exists(
+                os.path.join(self.media, imagens.caminho_rendicao(item.foto.name, 24, extensao))
+            ))
+
+    def test_template_tag_com_srcset(self):
+        """Testa o <picture> com srcset WebP e JPEG"""
+        item = criar_item(self.usuario, foto=self.foto_de_celular())
+        tarefas.processar_pendentes()
+        html = Template("{% load imagens %}{% imagem_item item 'card' %}").render(Context({'item': item}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(imagens.srcset(item.foto.name, 'card', 'webp'), html)
+        self.assertIn('640w', html)
+
+    def test_geracao_sob_demanda_e_comando(self):
+        """Testa a geração para fotos antigas: pelo comando e ao exibir"""
+        item = criar_item(self.usuario, foto=self.foto_de_celular())
+        # Foto cadastrada antes das rendições: sem arquivos nem tarefa
+        Tarefa.objects.all().delete()
+        cache.clear()
+
+        saida = StringIO()
+        call_command('gerar_rendicoes', stdout=saida)
+        self.assertIn('1 foto(s)', saida.getvalue())
+        self.assertTrue(imagens.rendicoes_prontas(item.foto.name))
+
+        imagens.remover_rendicoes(item.foto.name)
+        html = Template("{% load imagens %}{% imagem_item item 'detalhe' %}").render(Context({'item': item}))
+        self.assertIn(item.foto.url, html)
+        self.assertNotIn('<picture>', html)
+        self.assertEqual(Tarefa.objects.filter(nome='gerar_rendicoes').count(), 1)
+
+        tarefas.processar_pendentes()
+        html = Template("{% load imagens %}{% imagem_item item 'detalhe' %}").render(Context({'item': item}))
+        self.assertIn('1600w', html)
+
+    def test_diretorio_por_nome_completo(self):
+        """Testa que fotos com o mesmo nome e outra extensão ou pasta não dividem as rendições"""
+        nomes = ['itens/foo.jpg', 'itens/foo.png', 'itens/antigas/foo.jpg']
+        diretorios = {imagens.diretorio_rendicoes(nome) for nome in nomes}
+        self.assertEqual(len(diretorios), 3)
+        self.assertTrue(all(diretorio.startswith(imagens.DIRETORIO + '/') for diretorio in diretorios))
+
+    def test_foto_corrompida_usa_original(self):
+        """Testa que uma foto ilegível cai para a URL original"""
+        item = criar_item(self.usuario)
+        Item.objects.filter(pk=item.pk).update(foto='itens/fotos/inexistente.jpg')
+        item.refresh_from_db()
+        html = Template("{% load imagens %}{% imagem_item item %}").render(Context({'item': item}))
+        self.assertIn(item.foto.url, html)
+        self.assertNotIn('<picture>', html)
+
+
+class FilaTarefasTest(TestCase):
+    """Testes da fila de tarefas em segundo plano"""
+
+    def setUp(self):
+        self.execucoes = []
+        self.falhas_restantes = 0
+
+        def tarefa_teste(valor):
+            if self.falhas_restantes:
+                self.falhas_restantes -= 1
+                raise RuntimeError('falha temporária')
+            self.execucoes.append(valor)
+
+        tarefas.registrar('teste')(tarefa_teste)
+        self.addCleanup(tarefas.TAREFAS.pop, 'teste')
+
+    def test_idempotencia(self):
+        """Testa que a mesma chave só é enfileirada uma vez"""
+        primeira = tarefas.enfileirar('teste', chave='unica', valor=1)
+        segunda = tarefas.enfileirar('teste', chave='unica', valor=2)
+        self.assertEqual(primeira.pk, segunda.pk)
+        call_command('processar_tarefas', '--uma-vez', stdout=StringIO())
+        self.assertEqual(self.execucoes, [1])
+
+    def test_nova_tentativa_com_espera(self):
+        """Testa o reagendamento após falha e a conclusão na tentativa seguinte"""
+        self.falhas_restantes = 1
+        tarefa = tarefas.enfileirar('teste', valor=1)
+        self.assertEqual(tarefas.processar_pendentes(), (0, 1))
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), ('pendente', 1))
+        self.assertGreater(tarefa.executar_apos, timezone.now())
+        self.assertIn('falha temporária', tarefa.erro)
+
+        Tarefa.objects.update(executar_apos=timezone.now())
+        self.assertEqual(tarefas.processar_pendentes(), (1, 0))
+        self.assertEqual(self.execucoes, [1])
+
+    def test_falha_definitiva(self):
+        """Testa o status falhou ao esgotar as tentativas"""
+        self.falhas_restantes = 10
+        tarefa = tarefas.enfileirar('teste', max_tentativas=2, valor=1)
+        for _ in range(2):
+            Tarefa.objects.update(executar_apos=timezone.now())
+            tarefas.processar_pendentes()
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), ('falhou', 2))
+
+    def test_reserva_exclusiva_e_tarefa_abandonada(self):
+        """Testa que uma tarefa reservada não é reservada de novo, salvo se abandonada"""
+        tarefas.enfileirar('teste', valor=1)
+        self.assertEqual(len(tarefas.reservar()), 1)
+        self.assertEqual(tarefas.reservar(), [])
+        Tarefa.objects.update(data_atualizacao=timezone.now() - timedelta(hours=1))
+        self.assertEqual(len(tarefas.reservar()), 1)
+
+    def test_tarefa_nao_registrada(self):
+        """Testa a recusa de nomes desconhecidos"""
+        with self.assertRaises(ValueError):
+            tarefas.enfileirar('inexistente')
+
+    def test_enfileirada_durante_a_execucao(self):
+        """Testa que a mesma chave enfileirada durante a execução roda de novo em seguida"""
+        def tarefa_teste(valor):
+            self.execucoes.append(valor)
+            if valor == 1:
+                tarefas.enfileirar('teste', chave='unica', valor=2)
+
+        tarefas.registrar('teste')(tarefa_teste)
+        tarefas.enfileirar('teste', chave='unica', valor=1)
+        self.assertEqual(tarefas.processar_pendentes(), (2, 0))
+        self.assertEqual(self.execucoes, [1, 2])
+        tarefa = Tarefa.objects.get(chave='unica')
+        self.assertEqual((tarefa.status, tarefa.repetir), ('concluida', False))
+
+
+class UploadFotoTest(TestCase):
+    """Testes dos limites e da recodificação das fotos enviadas"""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=self.media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.usuario = User.objects.create_user(username='dono', password='pass')
+
+    def dados(self):
+        return {
+            'titulo': 'Mochila Azul',
+            'descricao': 'Mochila azul com chaveiro de ursinho no zíper',
+            'categoria': 'outros',
+            'tipo': 'perdido',
+            'bloco': 'bloco_1',
+            'data_ocorrencia': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+        }
+
+    def imagem(self, tamanho, formato='JPEG', nome='foto.jpg', **parametros):
+        conteudo = BytesIO()
+        Image.new('RGB', tamanho, (30, 120, 200)).save(conteudo, formato, **parametros)
+        return SimpleUploadedFile(nome, conteudo.getvalue())
+
+    def test_upload_acima_do_limite_descartado(self):
+        """Testa que o handler descarta o arquivo grande e o formulário informa o erro"""
+        self.client.login(username='dono', password='pass')
+        dados = self.dados()
+        dados['foto'] = SimpleUploadedFile('grande.jpg', b'x' * 4096)
+        with override_settings(UPLOAD_FOTO_TAMANHO_MAXIMO=1024):
+            resposta = self.client.post(reverse('itens:criar-item'), dados)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('foto', resposta.context['form'].errors)
+        self.assertFalse(Item.objects.exists())
+
+    def test_recodifica_reduz_e_remove_metadados(self):
+        """Testa a redução da maior dimensão, a conversão para JPEG e a remoção do EXIF"""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = 'Fabricante'
+        foto = self.imagem((3000, 1500), exif=exif)
+        dados = self.dados()
+        with override_settings(UPLOAD_FOTO_DIMENSAO_MAXIMA=1000):
+            form = FormularioItem(data=dados, files={'foto': foto})
+            self.assertTrue(form.is_valid(), form.errors)
+        recodificada = form.cleaned_data['foto']
+        self.assertEqual(recodificada.name, 'foto.jpg')
+        with Image.open(recodificada) as imagem:
+            self.assertEqual(imagem.format, 'JPEG')
+            # Orientação aplicada: retrato
+            self.assertEqual(imagem.size, (500, 1000))
+            self.assertEqual(len(imagem.getexif()), 0)
+
+    def test_png_convertido_para_jpeg(self):
+        """Testa que PNG é aceito e gravado como JPEG"""
+        form = FormularioItem(data=self.dados(), files={'foto': self.imagem((200, 100), 'PNG', 'print.png')})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['foto'].name, 'print.jpg')
+
+    def test_resolucao_acima_do_limite(self):
+        """Testa a recusa pelo número de pixels lido do cabeçalho"""
+        with override_settings(UPLOAD_FOTO_PIXELS_MAXIMO=10_000):
+            form = FormularioItem(data=self.dados(), files={'foto': self.imagem((200, 100))})
+            self.assertFalse(form.is_valid())
+        self.assertIn('resolução', form.errors['foto'][0])
+
+    def test_formato_nao_aceito(self):
+        """Testa a recusa de formatos fora de JPEG, PNG e WebP"""
+        form = FormularioItem(data=self.dados(), files={'foto': self.imagem((50, 50), 'TIFF', 'scan.tif')})
+        self.assertFalse(form.is_valid())
+        self.assertIn('Formato', form.errors['foto'][0])
+
+
+class ArmazenamentoFotosTest(TestCase):
+    """Testes do storage por conteúdo e da remoção das fotos sem referência"""
+
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=self.media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.usuario = User.objects.create_user(username='dono', password='pass')
+
+    def foto(self, cor=(10, 80, 160), nome='foto.jpg'):
+        conteudo = BytesIO()
+        Image.new('RGB', (40, 30), cor).save(conteudo, 'JPEG')
+        return SimpleUploadedFile(nome, conteudo.getvalue(), content_type='image/jpeg')
+
+    def arquivos_fotos(self):
+        return sorted(
+            os.path.relpath(os.path.join(raiz, nome), self.media)
+            for raiz, _, nomes in os.walk(os.path.join(self.media, 'itens', 'fotos'))
+            for nome in nomes
+        )
+
+    def executar_remocoes(self):
+        Tarefa.objects.update(executar_apos=timezone.now())
+        tarefas.processar_pendentes()
+
+    def test_mesmo_conteudo_compartilha_arquivo(self):
+        """Testa o nome pelo hash e a gravação única de fotos iguais"""
+        perdido = criar_item(self.usuario, foto=self.foto(nome='minha.jpg'))
+        encontrado = criar_item(self.usuario, foto=self.foto(nome='achei.JPG'), tipo='encontrado')
+        self.assertEqual(perdido.foto.name, encontrado.foto.name)
+        self.assertRegex(perdido.foto.name, r'^itens/fotos/([0-9a-f]{2})/\1[0-9a-f]{62}\.jpg$')
+        self.assertEqual(len(self.arquivos_fotos()), 1)
+
+    def test_arquivo_removido_com_a_ultima_referencia(self):
+        """Testa que a foto só sai do disco quando o último item deixa de usá-la"""
+        primeiro = criar_item(self.usuario, foto=self.foto())
+        segundo = criar_item(self.usuario, foto=self.foto())
+        nome = primeiro.foto.name
+        tarefas.processar_pendentes()
+        self.assertTrue(imagens.rendicoes_prontas(nome))
+
+        # Troca de foto no primeiro item: o segundo ainda usa o arquivo
+        with self.captureOnCommitCallbacks(execute=True):
+            primeiro.foto = self.foto(cor=(200, 200, 0))
+            primeiro.save()
+        self.assertFalse(Tarefa.objects.filter(nome='remover_foto').exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            segundo.delete()
+        tarefa = Tarefa.objects.get(nome='remover_foto')
+        self.assertGreater(tarefa.executar_apos, timezone.now())
+        self.assertIn(nome, self.arquivos_fotos())
+
+        self.executar_remocoes()
+        self.assertEqual(self.arquivos_fotos(), [primeiro.foto.name])
+        self.assertFalse(imagens.rendicoes_prontas(nome))
+
+    def test_arquivo_reaproveitado_antes_da_remocao(self):
+        """Testa que a remoção agendada desiste se a foto voltou a ser usada"""
+        item = criar_item(self.usuario, foto=self.foto())
+        nome = item.foto.name
+        with self.captureOnCommitCallbacks(execute=True):
+            item.delete()
+        criar_item(self.usuario, foto=self.foto())
+        self.executar_remocoes()
+        self.assertEqual(self.arquivos_fotos(), [nome])
+
+    def test_comando_limpar_fotos_orfas(self):
+        """Testa a varredura dos arquivos sem referência já existentes no disco"""
+        item = criar_item(self.usuario, foto=self.foto())
+        orfa = os.path.join(self.media, 'itens', 'fotos', 'antiga.jpg')
+        with open(orfa, 'wb') as arquivo:
+            arquivo.write(b'foto antiga')
+        recente = os.path.join(self.media, 'itens', 'fotos', 'recente.jpg')
+        with open(recente, 'wb') as arquivo:
+            arquivo.write(b'upload em andamento')
+        duas_horas = timezone.now().timestamp() - 7200
+        os.utime(orfa, (duas_horas, duas_horas))
+
+        saida = StringIO()
+        call_command('limpar_fotos_orfas', '--simular', stdout=saida)
+        self.assertIn('itens/fotos/antiga.jpg', saida.getvalue())
+        self.assertTrue(os.path.exists(orfa))
+
+        call_command('limpar_fotos_orfas', stdout=StringIO())
+        self.assertEqual(self.arquivos_fotos(), sorted([item.foto.name, 'itens/fotos/recente.jpg']))
+
+
+class CorrespondenciasTest(TestCase):
+    """Testes do motor de correspondência entre perdidos e encontrados"""
+
+    def setUp(self):
+        self.dono = User.objects.create_user(username='dono', password='pass')
+        self.achador = User.objects.create_user(username='achador', password='pass')
+        self.agora = timezone.now()
+
+    def criar_item(self, usuario, tipo, titulo, descricao, **campos):
+        campos.setdefault('data_ocorrencia', self.agora)
+        return criar_item(usuario, tipo=tipo, titulo=titulo, descricao=descricao, **campos)
+
+    def sugestoes_de(self, item):
+        return [sugestao.outro for sugestao in correspondencias.sugestoes(item)]
+
+    def test_par_provavel_sugerido(self):
+        """Testa a sugestão nos dois sentidos após a fila processar o item novo"""
+        perdido = self.criar_item(self.dono, 'perdido', 'Celular Samsung preto', 'Celular com capinha azul e tela trincada')
+        encontrado = self.criar_item(
+            self.achador, 'encontrado', 'Celular preto encontrado', 'Samsung com capa azul, tela trincada',
+            data_ocorrencia=self.agora + timedelta(hours=3)
+        )
+        tarefas.processar_pendentes()
+        self.assertEqual(self.sugestoes_de(perdido), [encontrado])
+        self.assertEqual(self.sugestoes_de(encontrado), [perdido])
+        sugestao = SugestaoCorrespondencia.objects.get()
+        self.assertEqual(sugestao.detalhes['bloco'], 1.0)
+        self.assertGreater(sugestao.pontuacao, 0.7)
+
+    def test_bloqueio_por_categoria_tipo_e_data(self):
+        """Testa que itens de outra categoria, mesmo tipo, fora da janela ou do mesmo dono não são candidatos"""
+        perdido = self.criar_item(self.dono, 'perdido', 'Celular Samsung preto', 'Celular com capinha azul')
+        texto = ('Celular Samsung preto', 'Celular com capinha azul')
+        self.criar_item(self.achador, 'encontrado', *texto, categoria='documentos')
+        self.criar_item(self.achador, 'perdido', *texto)
+        self.criar_item(self.achador, 'encontrado', *texto, data_ocorrencia=self.agora + timedelta(days=90))
+        self.criar_item(self.dono, 'encontrado', *texto)
+        self.assertEqual(list(correspondencias.candidatos(perdido)), [])
+
+    def test_encontrado_antes_de_perdido_pontua_menos(self):
+        """Testa a proximidade de tempo: encontrado muito antes da perda não combina"""
+        perdido = self.criar_item(self.dono, 'perdido', 'Chave', 'Chaveiro vermelho')
+        depois = self.criar_item(self.achador, 'encontrado', 'Chave', 'Chaveiro vermelho',
+                                 data_ocorrencia=self.agora + timedelta(days=1))
+        antes = self.criar_item(self.achador, 'encontrado', 'Chave', 'Chaveiro vermelho',
+                                data_ocorrencia=self.agora - timedelta(days=5))
+        self.assertGreater(correspondencias.pontuar(perdido, depois)[1]['tempo'], 0.9)
+        self.assertEqual(correspondencias.pontuar(perdido, antes)[1]['tempo'], 0.0)
+
+    def test_recalculo_ao_editar_e_resolver(self):
+        """Testa o recálculo incremental quando o item muda e quando deixa de estar ativo"""
+        perdido = self.criar_item(self.dono, 'perdido', 'Notebook Dell', 'Notebook cinza com adesivo da UFT')
+        encontrado = self.criar_item(self.achador, 'encontrado', 'Fone de ouvido', 'Fone branco sem fio')
+        tarefas.processar_pendentes()
+        self.assertEqual(self.sugestoes_de(perdido), [])
+
+        encontrado.titulo = 'Notebook Dell cinza'
+        encontrado.descricao = 'Notebook com adesivo da UFT na tampa'
+        encontrado.save()
+        tarefas.processar_pendentes()
+        self.assertEqual(self.sugestoes_de(perdido), [encontrado])
+
+        # Salvar sem alterar campos pontuados não enfileira recálculo
+        Tarefa.objects.all().delete()
+        encontrado.prioridade = True
+        encontrado.save()
+        self.assertFalse(Tarefa.objects.exists())
+
+        encontrado.marcar_como_resolvido(self.dono)
+        tarefas.processar_pendentes()
+        self.assertFalse(SugestaoCorrespondencia.objects.exists())
+
+    def test_recalculo_nas_acoes_em_massa(self):
+        """Testa que as mudanças de status em lote (admin) tiram e devolvem as sugestões"""
+        perdido = self.criar_item(self.dono, 'perdido', 'Celular Samsung preto', 'Celular com capinha azul')
+        self.criar_item(self.achador, 'encontrado', 'Celular Samsung preto', 'Samsung com capinha azul')
+        tarefas.processar_pendentes()
+        self.assertTrue(SugestaoCorrespondencia.objects.exists())
+
+        em_lote.atualizar(Item.objects.filter(pk=perdido.pk), status='spam')
+        self.assertFalse(SugestaoCorrespondencia.objects.exists())
+
+        em_lote.atualizar(Item.objects.filter(pk=perdido.pk), status='ativo')
+        tarefas.processar_pendentes()
+        self.assertEqual(SugestaoCorrespondencia.objects.get().perdido, perdido)
+
+    def test_sugestoes_exibidas(self):
+        """Testa a exibição na página do item e em Meus itens"""
+        perdido = self.criar_item(self.dono, 'perdido', 'Mochila azul Nike', 'Mochila azul com cadernos de cálculo')
+        encontrado = self.criar_item(self.achador, 'encontrado', 'Mochila azul', 'Mochila Nike azul com cadernos')
+        call_command('calcular_correspondencias', stdout=StringIO())
+
+        resposta = self.client.get(reverse('itens:detalhe-item', kwargs={'pk': encontrado.pk}))
+        self.assertContains(resposta, 'Pode ser de alguém que perdeu')
+        self.assertContains(resposta, reverse('itens:detalhe-item', kwargs={'pk': perdido.pk}))
+
+        self.client.login(username='dono', password='pass')
+        resposta = self.client.get(reverse('itens:meus-itens'))
+        self.assertContains(resposta, 'Possíveis correspondências')
+        self.assertContains(resposta, reverse('itens:detalhe-item', kwargs={'pk': encontrado.pk}))
+
+
+class SimilaresTest(TestCase):
+    """Testes do índice TF-IDF de itens similares"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(username='dono', password='pass')
+
+    def criar_item(self, titulo, descricao, **campos):
+        return criar_item(self.usuario, titulo=titulo, descricao=descricao, **campos)
+
+    def vizinhos(self, item):
+        return list(ItemSimilar.objects.filter(item=item).values_list('similar_id', flat=True))
+
+    def test_vizinhos_por_texto_e_nao_por_categoria(self):
+        """Testa que o vizinho mais próximo é o de texto parecido, mesmo em outra categoria"""
+        garrafa = self.criar_item('Garrafa térmica prata', 'Garrafa térmica prata da Stanley com adesivos')
+        self.criar_item('Caderno de física', 'Caderno espiral com anotações de física')
+        parecida = self.criar_item(
+            'Garrafa Stanley', 'Garrafa térmica prateada com adesivos', categoria='equipamentos_esportivos'
+        )
+        tarefas.processar_pendentes()
+        self.assertEqual(self.vizinhos(garrafa), [parecida.pk])
+        # O item cadastrado depois entrou na lista do anterior
+        self.assertEqual(self.vizinhos(parecida), [garrafa.pk])
+        self.assertEqual(similares.similares(garrafa, limite=1), [parecida])
+
+    def test_vetor_normalizado_e_produto_escalar(self):
+        """Testa a norma 1 dos vetores e a similaridade de um item consigo mesmo"""
+        item = self.criar_item('Óculos de grau', 'Óculos de grau com armação preta')
+        self.criar_item('Óculos escuros', 'Óculos de sol Ray-Ban')
+        tarefas.processar_pendentes()
+        pesos = dict(TermoItem.objects.filter(item=item).values_list('termo', 'peso'))
+        self.assertAlmostEqual(sum(peso * peso for peso in pesos.values()), 1.0)
+        self.assertAlmostEqual(similares.produto_escalar(pesos)[0][1], 1.0)
+        self.assertEqual(similares.produto_escalar(pesos)[0][0], item.pk)
+
+    def test_item_inativo_sai_do_indice(self):
+        """Testa a remoção do índice e das listas dos outros ao resolver o item"""
+        primeiro = self.criar_item('Chave do carro', 'Chave do carro com chaveiro do Flamengo')
+        segundo = self.criar_item('Chave com chaveiro', 'Chave do carro com chaveiro vermelho')
+        tarefas.processar_pendentes()
+        self.assertEqual(self.vizinhos(primeiro), [segundo.pk])
+
+        segundo.marcar_como_resolvido()
+        tarefas.processar_pendentes()
+        self.assertFalse(TermoItem.objects.filter(item=segundo).exists())
+        self.assertEqual(self.vizinhos(primeiro), [])
+
+    def test_acoes_em_massa_reindexam(self):
+        """Testa que as mudanças de status em lote (admin) tiram e devolvem o item ao índice"""
+        primeiro = self.criar_item('Chave do carro', 'Chave do carro com chaveiro do Flamengo')
+        segundo = self.criar_item('Chave com chaveiro', 'Chave do carro com chaveiro vermelho')
+        tarefas.processar_pendentes()
+
+        em_lote.atualizar(Item.objects.filter(pk=segundo.pk), status='spam')
+        self.assertFalse(TermoItem.objects.filter(item=segundo).exists())
+        self.assertEqual(self.vizinhos(primeiro), [])
+
+        em_lote.atualizar(Item.objects.filter(pk=segundo.pk), status='ativo')
+        tarefas.processar_pendentes()
+        self.assertTrue(TermoItem.objects.filter(item=segundo).exists())
+        self.assertEqual(self.vizinhos(primeiro), [segundo.pk])
+
+    def test_lista_limitada_aos_mais_proximos(self):
+        """Testa que cada item guarda só os k vizinhos mais próximos"""
+        with override_settings(SIMILARES_VIZINHOS=2):
+            itens = [
+                self.criar_item(f'Guarda-chuva {cor}', f'Guarda-chuva {cor} dobrável')
+                for cor in ('preto', 'azul', 'verde', 'roxo')
+            ]
+            tarefas.processar_pendentes()
+            for item in itens:
+                self.assertEqual(len(self.vizinhos(item)), 2)
+
+    def test_comando_reconstruir(self):
+        """Testa a reconstrução completa para itens sem índice (ex.: importados em lote)"""
+        Item.objects.bulk_create([
+            Item(titulo=titulo, descricao='Bolsa de couro', categoria='carteira_bolsa', tipo='perdido',
+                 bloco='bloco_a', data_ocorrencia=timezone.now(), usuario=self.usuario)
+            for titulo in ('Bolsa marrom', 'Bolsa preta', 'Carteira')
+        ])
+        saida = StringIO()
+        call_command('reconstruir_similares', stdout=saida)
+        self.assertIn('3 item(ns)', saida.getvalue())
+        self.assertEqual(ItemSimilar.objects.count(), 6)
+
+
+@override_settings(EXPIRACAO_DIAS=90, EXPIRACAO_DIAS_POR_REGRA={'documentos': 180, 'chaves:encontrado': 10})
+class ExpiracaoTest(TestCase):
+    """Testes da expiração automática de itens antigos"""
+
+    def setUp(self):
+        cache.clear()
+        self.dono = User.objects.create_user(username='dono', password='pass', email='dono@uft.edu.br')
+        self.outro = User.objects.create_user(username='outro', password='pass', email='outro@uft.edu.br')
+
+    def criar_item(self, titulo, dias, usuario=None, **campos):
+        item = criar_item(usuario or self.dono, titulo=titulo, **campos)
+        Item.objects.filter(pk=item.pk).update(data_postagem=timezone.now() - timedelta(days=dias))
+        return item
+
+    def status(self, item):
+        item.refresh_from_db()
+        return item.status
+
+    def test_regras_por_categoria_e_tipo(self):
+        """Testa o prazo padrão e as regras mais específicas"""
+        antigo = self.criar_item('Guarda-chuva', 100)
+        recente = self.criar_item('Garrafa', 30)
+        documento = self.criar_item('RG', 100, categoria='documentos')
+        chave = self.criar_item('Chave', 15, categoria='chaves', tipo='encontrado')
+        chave_perdida = self.criar_item('Chave de casa', 15, categoria='chaves')
+        resolvido = self.criar_item('Fone', 200, status='resolvido')
+
+        call_command('expirar_itens', '--pausa', '0', '--sem-aviso', stdout=StringIO())
+        self.assertEqual(self.status(antigo), 'expirado')
+        self.assertEqual(self.status(chave), 'expirado')
+        self.assertEqual(self.status(recente), 'ativo')
+        self.assertEqual(self.status(documento), 'ativo')
+        self.assertEqual(self.status(chave_perdida), 'ativo')
+        self.assertEqual(self.status(resolvido), 'resolvido')
+
+    def test_lotes_contadores_e_indices(self):
+        """Testa lotes pequenos, contadores do painel consistentes e saída dos índices derivados"""
+        itens = [self.criar_item(f'Caderno de cálculo {i}', 120) for i in range(5)]
+        tarefas.processar_pendentes()
+        self.assertTrue(ItemSimilar.objects.exists())
+        self.assertEqual(contadores.totais()['total_perdidos'], 5)
+
+        expirados = expiracao.expirar(lote=2)
+        self.assertEqual(sorted(expirados[self.dono.pk]), [item.pk for item in itens])
+        self.assertEqual(contadores.totais()['total_perdidos'], 0)
+        self.assertEqual(contadores.reconciliar(), [])
+        self.assertFalse(ItemSimilar.objects.exists())
+        self.assertFalse(TermoItem.objects.exists())
+
+    def test_um_email_por_dono(self):
+        """Testa o resumo por e-mail com todos os itens expirados de cada dono"""
+        self.criar_item('Mochila azul', 100)
+        self.criar_item('Estojo verde', 100)
+        self.criar_item('Casaco preto', 100, usuario=self.outro)
+        Tarefa.objects.all().delete()
+
+        saida = StringIO()
+        call_command('expirar_itens', '--pausa', '0', stdout=saida)
+        self.assertIn('3 item(ns) expirado(s) de 2 usuário(s)', saida.getvalue())
+        tarefas.processar_pendentes()
+
+        self.assertEqual(len(mail.outbox), 2)
+        email_dono = next(email for email in mail.outbox if email.to == ['dono@uft.edu.br'])
+        self.assertIn('Mochila azul', email_dono.body)
+        self.assertIn('Estojo verde', email_dono.body)
+        self.assertIn(reverse('itens:meus-itens'), email_dono.body)
+
+    def test_simular_nao_altera(self):
+        """Testa que --simular só conta"""
+        item = self.criar_item('Guarda-chuva', 100)
+        saida = StringIO()
+        call_command('expirar_itens', '--simular', stdout=saida)
+        self.assertIn('1 item(ns) expirariam', saida.getvalue())
+        self.assertEqual(self.status(item), 'ativo')
+
+
+class ArquivoTest(TestCase):
+    """Testes do arquivamento de itens antigos"""
+
+    def setUp(self):
+        cache.clear()
+        self.dono = User.objects.create_user(username='dono', password='pass')
+        self.outro = User.objects.create_user(username='outro', password='pass')
+
+    def criar_item(self, titulo, dias, status='resolvido', **campos):
+        item = criar_item(self.dono, titulo=titulo, status=status, **campos)
+        Item.objects.filter(pk=item.pk).update(data_atualizacao=timezone.now() - timedelta(days=dias))
+        return item
+
+    def test_move_item_comentarios_e_contatos(self):
+        """Testa a cópia para o arquivo e a saída da tabela principal"""
+        item = self.criar_item('Carteira marrom', 200)
+        Comentario.objects.create(item=item, usuario=self.outro, texto='Vi no bloco A')
+        ContatoItem.objects.create(item=item, usuario_interessado=self.outro, mensagem='É minha')
+        antes = contadores.totais()
+
+        self.assertEqual(arquivo.arquivar(lote=10), 1)
+        self.assertFalse(Item.objects.filter(pk=item.pk).exists())
+        self.assertFalse(Comentario.objects.exists())
+        self.assertFalse(ContatoItem.objects.exists())
+
+        arquivado = ItemArquivado.objects.get(pk=item.pk)
+        self.assertEqual(arquivado.titulo, 'Carteira marrom')
+        self.assertEqual(arquivado.comentarios.get().texto, 'Vi no bloco A')
+        self.assertEqual(arquivado.contatos.get().mensagem, 'É minha')
+        # Os totais do painel continuam contando o item arquivado
+        self.assertEqual(contadores.totais(), antes)
+        self.assertEqual(contadores.reconciliar(), [])
+        # A sincronização do aplicativo informa a remoção
+        self.assertTrue(ItemRemovido.objects.filter(item_id=item.pk).exists())
+
+    def test_link_permanente_e_aba_arquivados(self):
+        """Testa o detalhe do item arquivado e a aba em "Meus itens\""""
+        item = self.criar_item('Carteira marrom', 200)
+        Comentario.objects.create(item=item, usuario=self.outro, texto='Vi no bloco A')
+        arquivo.arquivar()
+
+        response = self.client.get(reverse('itens:detalhe-item', kwargs={'pk': item.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'itens/detalhe_arquivado.html')
+        self.assertContains(response, 'Carteira marrom')
+        self.assertContains(response, 'Vi no bloco A')
+
+        self.client.login(username='dono', password='pass')
+        response = self.client.get(reverse('itens:meus-itens'))
+        self.assertEqual(response.context['total_arquivados'], 1)
+        self.assertNotContains(response, 'Carteira marrom')
+        response = self.client.get(reverse('itens:meus-itens') + '?aba=arquivados')
+        self.assertContains(response, 'Carteira marrom')
+
+    def test_foto_continua_em_uso(self):
+        """Testa que a foto do item arquivado não é liberada"""
+        item = self.criar_item('Carteira marrom', 200, foto='itens/fotos/ab/carteira.jpg')
+        Tarefa.objects.all().delete()
+        arquivo.arquivar()
+        self.assertTrue(imagens.foto_em_uso('itens/fotos/ab/carteira.jpg'))
+        self.assertFalse(Tarefa.objects.filter(nome='remover_foto').exists())
+        self.assertEqual(ItemArquivado.objects.get(pk=item.pk).foto.name, 'itens/fotos/ab/carteira.jpg')
+
+    def test_comando_em_lotes_e_candidatos(self):
+        """Testa o comando com lotes de um item e os itens que ficam na tabela principal"""
+        antigos = [self.criar_item(f'Fone {i}', 200) for i in range(3)]
+        spam = self.criar_item('Anúncio', 200, status='spam')
+        recente = self.criar_item('Garrafa', 10)
+        ativo = self.criar_item('Guarda-chuva', 400, status='ativo')
+
+        saida = StringIO()
+        call_command('arquivar_itens', '--simular', stdout=saida)
+        self.assertIn('4 item(ns) seriam arquivados', saida.getvalue())
+        self.assertEqual(ItemArquivado.objects.count(), 0)
+
+        saida = StringIO()
+        call_command('arquivar_itens', '--lote', '1', '--pausa', '0', stdout=saida)
+        self.assertIn('4 item(ns) arquivado(s)', saida.getvalue())
+        self.assertEqual(
+            set(ItemArquivado.objects.values_list('pk', flat=True)),
+            {item.pk for item in antigos} | {spam.pk}
+        )
+        self.assertEqual(set(Item.objects.values_list('pk', flat=True)), {recente.pk, ativo.pk})
+
+
+class BancoSqliteTest(TestCase):
+    """Testes da configuração do SQLite (PRAGMAs, timeout e BEGIN IMMEDIATE)"""
+
+    def test_opcoes_padrao(self):
+        """Testa os PRAGMAs e o modo de transação padrão"""
+        opcoes = banco.opcoes_sqlite({})
+        self.assertEqual(opcoes['transaction_mode'], 'IMMEDIATE')
+        self.assertEqual(opcoes['timeout'], 20)
+        self.assertIn('PRAGMA journal_mode=WAL', opcoes['init_command'])
+        self.assertIn('PRAGMA synchronous=NORMAL', opcoes['init_command'])
+
+    def test_variaveis_de_ambiente(self):
+        """Testa a troca dos valores pelo ambiente e a recusa de valores inválidos"""
+        opcoes = banco.opcoes_sqlite({
+            'SQLITE_SYNCHRONOUS': 'full', 'SQLITE_MMAP_SIZE': '0', 'SQLITE_TIMEOUT': '5',
+            'SQLITE_TRANSACAO': 'deferred',
+        })
+        self.assertIn('PRAGMA synchronous=FULL', opcoes['init_command'])
+        self.assertIn('PRAGMA mmap_size=0', opcoes['init_command'])
+        self.assertEqual(opcoes['timeout'], 5)
+        self.assertEqual(opcoes['transaction_mode'], 'DEFERRED')
+
+        for ambiente in ({'SQLITE_JOURNAL_MODE': 'rapido'}, {'SQLITE_CACHE_SIZE': 'muito'}, {'SQLITE_TIMEOUT': 'x'}):
+            with self.subTest(ambiente=ambiente):
+                with self.assertRaises(ImproperlyConfigured):
+                    banco.opcoes_sqlite(ambiente)
+
+    def test_comando_mostra_pragmas_em_vigor(self):
+        """Testa que a conexão recebeu os PRAGMAs e o comando os informa"""
+        saida = StringIO()
+        call_command('verificar_banco', '--integridade', stdout=saida)
+        self.assertIn('synchronous = NORMAL', saida.getvalue())
+        self.assertIn('temp_store = MEMORY', saida.getvalue())
+        self.assertIn('Início das transações: IMMEDIATE', saida.getvalue())
+        self.assertIn('quick_check = ok', saida.getvalue())
+
+
+class CachePaginasTest(TestCase):
+    """Testes do cache de páginas para visitantes anônimos"""
+
+    def setUp(self):
+        cache.clear()
+        visualizacoes.descarregar_se_necessario()
+        self.usuario = User.objects.create_user(username='dono', password='pass')
+        self.itens = [
+            Item.objects.create(
+                titulo=f'Garrafa térmica {i}',
+                descricao='Garrafa térmica prata',
+                categoria='outros',
+                tipo='perdido',
+                bloco='bloco_a',
+                data_ocorrencia=timezone.now(),
+                usuario=self.usuario
+            )
+            for i in range(2)
+        ]
+        tarefas.processar_pendentes()
+        self.url_detalhe = reverse('itens:detalhe-item', kwargs={'pk': self.itens[0].pk})
+
+    def test_paginas_servidas_do_cache(self):
+        """Testa a segunda requisição anônima sem consultas ao banco"""
+        for url in (reverse('pagina-inicial'), reverse('itens:listar-itens'), self.url_detalhe, reverse('sobre')):
+            with self.subTest(url=url):
+                primeira = self.client.get(url)
+                with self.assertNumQueries(0):
+                    segunda = self.client.get(url)
+                self.assertEqual(segunda.status_code, 200)
+                self.assertEqual(segunda.content, primeira.content)
+
+    def test_query_string_normalizada(self):
+        """Testa que a ordem dos parâmetros e os vazios não geram outra entrada"""
+        url = reverse('itens:listar-itens')
+        self.client.get(url + '?page=1&ordenacao=titulo')
+        with self.assertNumQueries(0):
+            self.client.get(url + '?ordenacao=titulo&busca=&page=1')
+
+    def test_filtros_e_usuarios_logados_nao_usam_cache(self):
+        """Testa que buscas filtradas, páginas distantes e usuários logados passam pela view"""
+        url = reverse('itens:listar-itens')
+        for parametros in ({'busca': 'garrafa'}, {'tipo': 'perdido'}, {'page': 10}):
+            with self.subTest(parametros=parametros):
+                self.client.get(url, parametros)
+                response = self.client.get(url, parametros)
+                self.assertIsNotNone(response.context)
+
+        self.client.force_login(self.usuario)
+        self.client.get(url)
+        self.assertIsNotNone(self.client.get(url).context)
+
+    def test_visualizacao_contada_no_acerto(self):
+        """Testa que o detalhe servido do cache ainda conta a visualização"""
+        self.client.get(self.url_detalhe)
+        self.client.get(self.url_detalhe)
+        self.assertEqual(visualizacoes.pendentes(self.itens[0].pk), 2)
+
+    def test_invalidacao_por_item(self):
+        """Testa que salvar um item invalida as páginas"""
+        url = reverse('itens:listar-itens')
+        self.client.get(url)
+        self.itens[1].titulo = 'Garrafa azul'
+        self.itens[1].save()
+        self.assertContains(self.client.get(url), 'Garrafa azul')
+
+    def test_invalidacao_por_comentario(self):
+        """Testa que o comentário invalida só a página do item comentado"""
+        url_outro = reverse('itens:detalhe-item', kwargs={'pk': self.itens[1].pk})
+        self.client.get(self.url_detalhe)
+        self.client.get(url_outro)
+
+        Comentario.objects.create(item=self.itens[0], usuario=self.usuario, texto='Está na portaria')
+        self.assertContains(self.client.get(self.url_detalhe), 'Está na portaria')
+        with self.assertNumQueries(0):
+            self.client.get(url_outro)
+
+    def test_invalidacao_por_acao_em_lote(self):
+        """Testa que as ações em massa do admin (update sem signals) invalidam as páginas"""
+        url = reverse('pagina-inicial')
+        self.assertContains(self.client.get(url), 'Garrafa térmica 0')
+        em_lote.atualizar(Item.objects.all(), status='spam')
+        self.assertNotContains(self.client.get(url), 'Garrafa térmica 0')
+
+    def test_mensagens_pendentes_nao_usam_cache(self):
+        """Testa que a página com mensagem (ex.: após o logout) não é guardada nem servida do cache"""
+        url = reverse('pagina-inicial')
+        self.client.get(url)
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('logout'), follow=True)
+        self.assertContains(response, 'Logout realizado com sucesso')
+        self.assertNotContains(self.client.get(url), 'Logout realizado com sucesso')
+
+    def test_configuracao_do_ambiente(self):
+        """Testa a escolha do backend de cache pelas variáveis de ambiente"""
+        base = Path('/srv/achados')
+        self.assertEqual(
+            caches.configuracao_cache(base, {})['default']['BACKEND'],
+            'django.core.cache.backends.locmem.LocMemCache'
+        )
+        arquivo_cache = caches.configuracao_cache(base, {'CACHE_BACKEND': 'arquivo'})['default']
+        self.assertEqual(arquivo_cache['LOCATION'], '/srv/achados/cache')
+        redis = caches.configuracao_cache(base, {'CACHE_BACKEND': 'redis', 'CACHE_LOCAL': 'redis://cache:6379/0'})
+        self.assertEqual(redis['default']['LOCATION'], 'redis://cache:6379/0')
+        with self.assertRaises(ImproperlyConfigured):
+            caches.configuracao_cache(base, {'CACHE_BACKEND': 'memcached'})
+
+    @override_settings(CACHE_PRAZO_LOCAL=45)
+    def test_prazo_das_entradas_invalidadas(self):
+        """Testa o prazo limitado num cache do processo e sem prazo num cache compartilhado"""
+        self.assertEqual(caches.prazo_invalidacao(), 45)
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        with override_settings(CACHES=caches.configuracao_cache(
+            Path(diretorio), {'CACHE_BACKEND': 'arquivo', 'CACHE_LOCAL': diretorio}
+        )):
+            self.assertIsNone(caches.prazo_invalidacao())
+
+
+class CacheFiltrosTest(TestCase):
+    """Testes das listas de ids da listagem em cache por combinação de filtros"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user(username='user', password='pass')
+        for i in range(15):
+            Item.objects.create(
+                titulo=f'Documento {i:02d}',
+                descricao='RG e CPF',
+                categoria='documentos',
+                tipo='perdido' if i % 3 else 'encontrado',
+                bloco='bloco_a',
+                data_ocorrencia=timezone.now(),
+                usuario=self.usuario
+            )
+        self.url = reverse('itens:listar-itens')
+        self.client.force_login(self.usuario)
+        # Sessão, usuário e badge de notificações já resolvidos fora da medição
+        notificacoes.contatos_nao_lidos(self.usuario.pk)
+
+    def titulos(self, response):
+        return [item.titulo for item in response.context['itens']]
+
+    def test_combinacao_repetida_em_uma_consulta(self):
+        """Testa que a mesma combinação (em outra ordem e com vazios) reaproveita a lista de ids"""
+        primeira = self.client.get(self.url + '?tipo=perdido&categoria=documentos&ordenacao=titulo')
+        with self.assertNumQueries(3):
+            # Sessão, usuário e a página (id__in)
+            segunda = self.client.get(self.url + '?categoria=documentos&bloco=&ordenacao=titulo&tipo=perdido')
+        self.assertEqual(self.titulos(segunda), self.titulos(primeira))
+        self.assertEqual(segunda.context['paginator'].count, 10)
+        self.assertEqual(self.titulos(segunda)[:2], ['Documento 01', 'Documento 02'])
+
+    def test_escrita_em_item_invalida(self):
+        """Testa que salvar, excluir ou atualizar em lote gera novas listas"""
+        parametros = {'tipo': 'perdido', 'ordenacao': 'titulo'}
+        self.client.get(self.url, parametros)
+        item = Item.objects.get(titulo='Documento 01')
+        item.tipo = 'encontrado'
+        item.save()
+        self.assertNotIn('Documento 01', self.titulos(self.client.get(self.url, parametros)))
+
+        em_lote.atualizar(Item.objects.filter(titulo='Documento 02'), status='spam')
+        self.assertNotIn('Documento 02', self.titulos(self.client.get(self.url, parametros)))
+
+    def test_paginas_alem_do_limite(self):
+        """Testa as páginas além dos ids guardados, buscadas direto no banco"""
+        with override_settings(CACHE_FILTROS_IDS=12):
+            response = self.client.get(self.url, {'ordenacao': 'titulo', 'page': 2})
+        self.assertEqual(response.context['paginator'].count, 15)
+        self.assertEqual(self.titulos(response), ['Documento 12', 'Documento 13', 'Documento 14'])
+
+    def test_ordenacao_por_visualizacoes_fora_do_cache(self):
+        """Testa que a ordenação por visualizações (gravadas sem signals) não usa o cache"""
+        self.assertIsNone(cache_filtros.chave({}, ('-visualizacoes',)))
+        self.assertIsNotNone(cache_filtros.chave({}, ('-data_postagem',)))
+
+
+@override_settings(VISUALIZACOES_INTERVALO_DESCARGA=3600)
+class ViewsAssincronasTest(TestCase):
+    """Testes das views assíncronas servidas sob ASGI (itens.views_assincronas)"""
+
+    def setUp(self):
+        cache.clear()
+        visualizacoes.descarregar_se_necessario()
+        self.usuario = User.objects.create_user(username='dono', password='pass')
+        self.interessado = User.objects.create_user(username='interessado', password='pass')
+        self.itens = [
+            Item.objects.create(
+                titulo=f'Caderno {i:02d}',
+                descricao='Caderno de capa azul',
+                categoria='livros_material',
+                tipo='perdido' if i % 2 else 'encontrado',
+                bloco='bloco_a',
+                data_ocorrencia=timezone.now(),
+                usuario=self.usuario
+            )
+            for i in range(15)
+        ]
+        tarefas.processar_pendentes()
+        self.url = reverse('itens:listar-itens')
+        self.url_detalhe = reverse('itens:detalhe-item', kwargs={'pk': self.itens[0].pk})
+
+    def get_asgi(self, url, parametros=None):
+        return async_to_sync(self.async_client.get)(url, parametros)
+
+    def ids(self, response):
+        return [item.pk for item in response.context['itens']]
+
+    def test_requisicoes_asgi_usam_views_assincronas(self):
+        """Testa o roteamento: views assíncronas sob ASGI, síncronas sob WSGI"""
+        self.assertIs(self.get_asgi(self.url).resolver_match.func.view_class, ListarItensAssincrona)
+        self.assertIs(self.get_asgi(self.url_detalhe).resolver_match.func.view_class, DetalheItemAssincrona)
+        self.assertIs(self.client.get(self.url).resolver_match.func.view_class, ListarItens)
+        # As demais rotas continuam as mesmas
+        self.assertEqual(self.get_asgi(reverse('itens:criar-item')).status_code, 302)
+
+    def test_listagem_igual_a_sincrona(self):
+        """Testa filtros, ordenação, páginas e modo cursor iguais aos da view síncrona"""
+        self.client.force_login(self.interessado)
+        self.async_client.force_login(self.interessado)
+        for parametros in (
+            {}, {'page': 2}, {'page': 'last'}, {'tipo': 'perdido', 'ordenacao': 'titulo'},
+            {'busca': 'caderno'}, {'ordenacao': '-visualizacoes'}, {'modo': 'cursor', 'total': 1},
+        ):
+            with self.subTest(parametros=parametros):
+                sincrona = self.client.get(self.url, parametros)
+                assincrona = self.get_asgi(self.url, parametros)
+                self.assertEqual(assincrona.status_code, 200)
+                self.assertEqual(self.ids(assincrona), self.ids(sincrona))
+                self.assertEqual(assincrona.context['total_perdidos'], sincrona.context['total_perdidos'])
+        self.assertEqual(self.get_asgi(self.url, {'page': 9}).status_code, 404)
+        self.assertEqual(self.get_asgi(self.url, {'page': 'x'}).status_code, 404)
+
+    def test_detalhe_marca_contato_e_conta_visualizacao(self):
+        """Testa o detalhe: comentários, contato marcado como visualizado e visualização"""
+        item = self.itens[0]
+        Comentario.objects.create(item=item, usuario=self.interessado, texto='É meu!')
+        contato = ContatoItem.objects.create(
+            item=item, usuario_interessado=self.interessado, mensagem='Posso buscar?'
+        )
+        self.async_client.force_login(self.interessado)
+        response = self.get_asgi(self.url_detalhe)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c.texto for c in response.context['comentarios']], ['É meu!'])
+        self.assertEqual(response.context['contato_existente'], contato)
+        contato.refresh_from_db()
+        self.assertTrue(contato.visualizado)
+        self.assertEqual(visualizacoes.pendentes(item.pk), 1)
+        self.assertEqual(self.get_asgi(reverse('itens:detalhe-item', kwargs={'pk': 999999})).status_code, 404)
+
+    def test_detalhe_de_item_arquivado(self):
+        """Testa o link permanente de um item arquivado sob ASGI"""
+        Item.objects.filter(pk=self.itens[0].pk).update(
+            status='resolvido', data_atualizacao=timezone.now() - timedelta(days=400)
+        )
+        arquivo.arquivar()
+        response = self.get_asgi(self.url_detalhe)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'itens/detalhe_arquivado.html')
+
+    def test_pagina_inicial_e_api_recentes(self):
+        """Testa a página inicial e a API de itens recentes iguais às síncronas"""
+        # Logados: anônimos receberiam do cache a página gerada pela outra view
+        self.client.force_login(self.interessado)
+        self.async_client.force_login(self.interessado)
+        sincrona = self.client.get(reverse('pagina-inicial'))
+        assincrona = self.get_asgi(reverse('pagina-inicial'))
+        self.assertEqual(assincrona.context['total_encontrados'], sincrona.context['total_encontrados'])
+        self.assertEqual(
+            [item.pk for item in assincrona.context['itens_recentes']],
+            [item.pk for item in sincrona.context['itens_recentes']]
+        )
+        url = reverse('itens:itens-recentes-api')
+        self.assertEqual(self.get_asgi(url).json(), self.client.get(url).json())
+
+    def test_paginas_servidas_do_cache(self):
+        """Testa o cache de páginas para visitantes anônimos também sob ASGI"""
+        for url in (reverse('pagina-inicial'), self.url, self.url_detalhe):
+            with self.subTest(url=url):
+                primeira = self.get_asgi(url)
+                with self.assertNumQueries(0):
+                    segunda = self.get_asgi(url)
+                self.assertEqual(segunda.content, primeira.content)
+        self.assertEqual(visualizacoes.pendentes(self.itens[0].pk), 2)
+
+
+@override_settings(EVENTOS_INTERVALO_PING=0.05, EVENTOS_DURACAO_MAXIMA=0.3)
+class EventosTest(TestCase):
+    """Testes dos eventos em tempo real (itens.eventos)"""
+
+    def setUp(self):
+        self.dono = User.objects.create_user(username='dono', password='pass')
+        self.interessado = User.objects.create_user(username='interessado', password='pass')
+        self.item = Item.objects.create(
+            titulo='Chave do laboratório',
+            descricao='Chaveiro vermelho',
+            categoria='chaves',
+            tipo='encontrado',
+            bloco='bloco_a',
+            data_ocorrencia=timezone.now(),
+            usuario=self.dono
+        )
+        self.url = reverse('itens:eventos')
+
+    def eventos_durante(self, canais, acao):
+        """Eventos recebidos pelos canais enquanto ``acao`` é executada (e confirmada)"""
+        def executar():
+            with self.captureOnCommitCallbacks(execute=True):
+                acao()
+
+        async def coletar():
+            assinatura = eventos.obter_backend().assinar(canais)
+            try:
+                # Na thread do banco, onde os on_commit são registrados
+                await sync_to_async(executar)()
+                recebidos = []
+                while (evento := await assinatura.proximo(0.1)) is not None:
+                    recebidos.append(evento)
+                return recebidos
+            finally:
+                assinatura.fechar()
+        return async_to_sync(coletar)()
+
+    def test_novo_item_publicado_apos_commit(self):
+        """Testa o evento de item ativo cadastrado (e nenhum para edições ou itens não ativos)"""
+        recebidos = self.eventos_durante(
+            [eventos.CANAL_ITENS], lambda: criar_item(self.dono, titulo='Crachá', categoria='documentos')
+        )
+        self.assertEqual(len(recebidos), 1)
+        self.assertEqual(recebidos[0]['tipo'], 'item')
+        self.assertEqual(recebidos[0]['dados']['categoria'], 'documentos')
+
+        def editar_e_cadastrar_spam():
+            self.item.titulo = 'Chave do laboratório 2'
+            self.item.save()
+            criar_item(self.dono, status='spam')
+        self.assertEqual(self.eventos_durante([eventos.CANAL_ITENS], editar_e_cadastrar_spam), [])
+
+    def test_contato_publicado_so_para_o_dono(self):
+        """Testa o evento de contato no canal do dono do item"""
+        def contatar():
+            ContatoItem.objects.create(item=self.item, usuario_interessado=self.interessado, mensagem='É minha')
+        canais = [eventos.canal_usuario(self.dono.pk), eventos.canal_usuario(self.interessado.pk)]
+        recebidos = self.eventos_durante(canais, contatar)
+        self.assertEqual([evento['tipo'] for evento in recebidos], ['contato'])
+        self.assertEqual(recebidos[0]['dados']['item_id'], self.item.pk)
+        self.assertEqual(eventos.obter_backend().assinantes(eventos.canal_usuario(self.dono.pk)), 0)
+
+    def test_stream_filtrado_sob_asgi(self):
+        """Testa o stream: eventos no formato SSE, filtrados por categoria, e pings"""
+        async def ler():
+            response = await self.async_client.get(self.url, {'canais': 'itens', 'categoria': 'chaves'})
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            partes = aiter(response.streaming_content)
+            primeira = await anext(partes)
+            backend = eventos.obter_backend()
+            backend.publicar(eventos.CANAL_ITENS, {'tipo': 'item', 'dados': {'id': 1, 'categoria': 'documentos'}})
+            backend.publicar(eventos.CANAL_ITENS, {'tipo': 'item', 'dados': {'id': 2, 'categoria': 'chaves'}})
+            return primeira, b''.join([parte async for parte in partes]).decode()
+
+        primeira, corpo = async_to_sync(ler)()
+        self.assertEqual(primeira, b'retry: 5000\n\n')
+        self.assertIn('event: item\ndata: {"id": 2, "categoria": "chaves"}\n\n', corpo)
+        self.assertNotIn('"id": 1', corpo)
+        self.assertIn(': ping', corpo)
+
+    def test_contatos_exigem_login_e_wsgi_responde_204(self):
+        """Testa o 204 (fim das reconexões) sem canais permitidos e sob WSGI"""
+        resposta = async_to_sync(self.async_client.get)(self.url, {'canais': 'contatos'})
+        self.assertEqual(resposta.status_code, 204)
+        self.assertEqual(self.client.get(self.url).status_code, 204)
+
+
+@override_settings(ALERTAS_MARGEM=0)
+class AlertasBuscasTest(TestCase):
+    """Testes das buscas salvas e dos alertas por e-mail dos itens novos"""
+
+    def setUp(self):
+        cache.clear()
+        self.dono = User.objects.create_user(username='dono', password='pass', email='dono@uft.edu.br')
+        self.aluno = User.objects.create_user(username='aluno', password='pass', email='aluno@uft.edu.br')
+        self.colega = User.objects.create_user(username='colega', password='pass', email='colega@uft.edu.br')
+        self.antigo = self.criar_item('Carteira preta antiga')
+
+    def criar_item(self, titulo, usuario=None, **campos):
+        # As buscas dos testes filtram por documentos encontrados
+        campos = {'categoria': 'documentos', 'tipo': 'encontrado', **campos}
+        return criar_item(usuario or self.dono, titulo=titulo, **campos)
+
+    def salvar(self, usuario, nome, **filtros):
+        return BuscaSalva.objects.create(usuario=usuario, nome=nome, **filtros)
+
+    def test_indice_filtros_texto_e_prioridade(self):
+        """Testa o casamento por filtros, prefixo dos termos e prioridade, sem os itens do próprio usuário"""
+        carteira = self.salvar(self.aluno, 'Carteira', busca='carteiras pretas', tipo='encontrado')
+        chaves = self.salvar(self.aluno, 'Chaves', categoria='chaves', bloco='bloco_b')
+        urgente = self.salvar(self.colega, 'Urgente', prioridade=True)
+
+        achada = self.criar_item('Carteira preta de couro')
+        perdida = self.criar_item('Carteira preta', tipo='perdido')
+        chave = self.criar_item('Chaveiro', categoria='chaves', bloco='bloco_b', prioridade=True)
+        self.criar_item('Chave do aluno', usuario=self.aluno, categoria='chaves', bloco='bloco_b')
+
+        encontrados, fim = alertas.avaliar()
+        self.assertEqual(fim, Item.objects.order_by('-pk').first().pk)
+        self.assertEqual(encontrados[self.aluno.pk], {carteira.pk: [achada.pk], chaves.pk: [chave.pk]})
+        self.assertEqual(encontrados[self.colega.pk], {urgente.pk: [chave.pk]})
+        # Nem o item perdido (a busca é de encontrados) nem o antigo, anterior às buscas
+        self.assertNotIn(perdida.pk, encontrados[self.aluno.pk][carteira.pk])
+        self.assertNotIn(self.antigo.pk, encontrados[self.aluno.pk][carteira.pk])
+
+    def test_um_email_por_usuario_e_marca_avaliados(self):
+        """Testa o resumo único por usuário, via fila, e que a execução seguinte não repete os itens"""
+        self.salvar(self.aluno, 'Carteira', busca='carteira')
+        self.salvar(self.aluno, 'Documentos no bloco A', categoria='documentos', bloco='bloco_a')
+        desligada = self.salvar(self.colega, 'Carteira', busca='carteira', alerta=False)
+        self.criar_item('Carteira azul')
+        self.criar_item('RG de Maria')
+        Tarefa.objects.all().delete()
+
+        saida = StringIO()
+        call_command('enviar_alertas', stdout=saida)
+        self.assertIn('1 usuário(s) receberão aviso de 2 busca(s)', saida.getvalue())
+        tarefas.processar_pendentes()
+
+        self.assertEqual(len(mail.outbox), 1)
+        email = mail.outbox[0]
+        self.assertEqual(email.to, ['aluno@uft.edu.br'])
+        self.assertTrue(email.subject.startswith('2 item(ns) novo(s)'))
+        self.assertIn('Carteira azul', email.body)
+        self.assertIn('RG de Maria', email.body)
+        self.assertIn(reverse('itens:buscas-salvas'), email.body)
+
+        # Sem itens novos, nada a enviar; a busca sem alerta também avançou
+        self.assertEqual(alertas.executar(), {})
+        desligada.refresh_from_db()
+        self.assertEqual(desligada.ultimo_item, Item.objects.order_by('-pk').first().pk)
+
+    @override_settings(ALERTAS_MARGEM=60)
+    def test_margem_para_itens_recentes(self):
+        """Testa que os itens dentro da margem, que podem ter ids fora da ordem de confirmação, esperam"""
+        busca = self.salvar(self.aluno, 'Carteira', busca='carteira')
+        inicio = busca.ultimo_item
+        primeira = self.criar_item('Carteira azul')
+        segunda = self.criar_item('Carteira verde')
+
+        self.assertEqual(alertas.executar(), {})
+        busca.refresh_from_db()
+        self.assertEqual(busca.ultimo_item, inicio)
+
+        Item.objects.filter(pk__in=[primeira.pk, segunda.pk]).update(
+            data_postagem=timezone.now() - timedelta(minutes=2)
+        )
+        encontrados = alertas.executar()
+        self.assertEqual(encontrados[self.aluno.pk], {busca.pk: [primeira.pk, segunda.pk]})
+        busca.refresh_from_db()
+        self.assertEqual(busca.ultimo_item, segunda.pk)
+
+    def test_execucoes_sobrepostas(self):
+        """Testa que a execução que avaliou buscas já avisadas por outra simultânea não as repete"""
+        busca = self.salvar(self.aluno, 'Carteira', busca='carteira')
+        item = self.criar_item('Carteira azul')
+        Tarefa.objects.all().delete()
+
+        # A primeira lê as buscas; a segunda roda inteira antes de ela terminar
+        lidas = alertas.buscas_com_alerta()
+        self.assertEqual(alertas.executar(), {self.aluno.pk: {busca.pk: [item.pk]}})
+        with patch.object(alertas, 'buscas_com_alerta', return_value=lidas):
+            self.assertEqual(alertas.executar(), {})
+        self.assertEqual(Tarefa.objects.filter(nome='enviar_alerta_buscas').count(), 1)
+        busca.refresh_from_db()
+        self.assertEqual(busca.ultimo_item, item.pk)
+
+    def test_simular_nao_altera(self):
+        """Testa que --simular só conta, sem enfileirar nem avançar as buscas"""
+        busca = self.salvar(self.aluno, 'Carteira', busca='carteira')
+        inicio = busca.ultimo_item
+        self.criar_item('Carteira azul')
+        Tarefa.objects.all().delete()
+
+        saida = StringIO()
+        call_command('enviar_alertas', '--simular', stdout=saida)
+        self.assertIn('1 usuário(s) receberiam aviso de 1 busca(s)', saida.getvalue())
+        self.assertFalse(Tarefa.objects.exists())
+        busca.refresh_from_db()
+        self.assertEqual(busca.ultimo_item, inicio)
+
+    def test_salvar_listar_e_excluir(self):
+        """Testa as views: salvar a busca da listagem, exigir algum critério, alternar o alerta e excluir"""
+        self.client.login(username='aluno', password='pass')
+        url_listagem = reverse('itens:listar-itens')
+        resposta = self.client.get(url_listagem, {'busca': 'carteira', 'tipo': 'encontrado'})
+        self.assertContains(resposta, reverse('itens:salvar-busca'))
+
+        resposta = self.client.post(reverse('itens:salvar-busca'), {'nome': 'Minha carteira', 'busca': 'carteira'})
+        self.assertRedirects(resposta, reverse('itens:buscas-salvas'))
+        busca = self.aluno.buscas_salvas.get()
+        self.assertEqual(busca.ultimo_item, self.antigo.pk)
+        self.assertEqual(busca.get_absolute_url(), f'{url_listagem}?busca=carteira')
+        self.assertContains(self.client.get(reverse('itens:buscas-salvas')), 'Minha carteira')
+
+        resposta = self.client.post(reverse('itens:salvar-busca'), {'nome': 'Tudo'})
+        self.assertRedirects(resposta, url_listagem)
+        self.assertEqual(self.aluno.buscas_salvas.count(), 1)
+
+        self.client.post(reverse('itens:alternar-alerta-busca', args=[busca.pk]))
+        busca.refresh_from_db()
+        self.assertFalse(busca.alerta)
+
+        self.client.login(username='colega', password='pass')
+        self.client.post(reverse('itens:excluir-busca', args=[busca.pk]))
+        self.assertTrue(BuscaSalva.objects.filter(pk=busca.pk).exists())
+        self.client.login(username='aluno', password='pass')
+        self.client.post(reverse('itens:excluir-busca', args=[busca.pk]))
+        self.assertFalse(BuscaSalva.objects.filter(pk=busca.pk).exists())
+
+    @override_settings(BUSCAS_SALVAS_MAXIMO=1)
+    def test_limite_por_usuario(self):
+        """Testa o máximo de buscas salvas por usuário"""
+        self.salvar(self.aluno, 'Carteira', busca='carteira')
+        self.client.login(username='aluno', password='pass')
+        self.client.post(reverse('itens:salvar-busca'), {'nome': 'Chaves', 'categoria': 'chaves'})
+        self.assertEqual(self.aluno.buscas_salvas.count(), 1)
@@ -0,0 +1,76 @@
+"""
+Normalização de texto em português para busca e comparação de itens
+
+Remove acentos, descarta palavras vazias e reduz cada palavra a um radical
+simples (plural, gênero e diminutivos), de forma que "Óculos", "oculos" e
+"óculos" produzam o mesmo termo.
+"""
+
+import re
+import unicodedata
+
+# Palavras muito frequentes que não ajudam a distinguir itens
+PALAVRAS_VAZIAS = frozenset("""
+    a ao aos as com como da das de do dos e em entre na nas no nos o os ou
+    para pela pelas pelo pelos por que se sem sob sobre um uma umas uns
+    meu minha meus minhas seu sua seus suas foi era estava
+""".split())
+
+PADRAO_PALAVRA = re.compile(r'[a-z0-9]+')
+
+# Sufixos de plural e sua forma no singular, do mais longo ao mais curto
+SUFIXOS_PLURAL = (
+    ('oes', 'ao'),
+    ('aes', 'ao'),
+    ('ais', 'al'),
+    ('eis', 'el'),
+    ('ois', 'ol'),
+    ('res', 'r'),
+    ('ns', 'm'),
+)
+
+SUFIXOS_DIMINUTIVO = ('zinho', 'zinha', 'inho', 'inha')
+
+
+def remover_acentos(texto):
+    """Remove acentos e converte para minúsculas"""
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def radical(palavra):
+    """Reduz uma palavra sem acentos ao seu radical aproximado"""
+    if len(palavra) <= 3 or palavra.isdigit():
+        return palavra
+
+    # Plural
+    for sufixo, substituto in SUFIXOS_PLURAL:
+        if palavra.endswith(sufixo):
+            palavra = palavra[:-len(sufixo)] + substituto
+            break
+    else:
+        if palavra.endswith('s') and not palavra.endswith('ss'):
+            palavra = palavra[:-1]
+
+    # Diminutivo
+    for sufixo in SUFIXOS_DIMINUTIVO:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= 3:
+            palavra = palavra[:-len(sufixo)]
+            break
+
+    # Vogal temática / gênero
+    if len(palavra) > 3 and palavra[-1] in 'aeo':
+        palavra = palavra[:-1]
+
+    return palavra
+
+
+def tokenizar(texto):
+    """Retorna a lista de radicais significativos de um texto"""
+    palavras = PADRAO_PALAVRA.findall(remover_acentos(texto))
+    return [radical(p) for p in palavras if p not in PALAVRAS_VAZIAS]
+
+
+def documento_item(item):
+    """Texto pesquisável de um item (título, descrição e local específico)"""
+    return ' '.join(filter(None, [item.titulo, item.descricao, item.local_especifico]))
@@ -0,0 +1,47 @@
+"""
+Limite de tamanho aplicado durante o recebimento dos uploads
+
+O handler fica em primeiro lugar em ``FILE_UPLOAD_HANDLERS`` e conta os bytes
+de cada arquivo à medida que chegam. Quando um arquivo passa de
+``UPLOAD_FOTO_TAMANHO_MAXIMO``, o restante dele é descartado sem ser gravado
+em memória ou em disco, e o campo é anotado em ``request.uploads_recusados``
+para que o formulário informe o erro (ver FormularioItem).
+"""
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+
+def tamanho_maximo():
+    return getattr(settings, 'UPLOAD_FOTO_TAMANHO_MAXIMO', 5 * 1024 * 1024)
+
+
+class LimiteTamanhoUpload(FileUploadHandler):
+    """
+    Recusa arquivos maiores que o limite sem armazená-los
+    """
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if self.request is not None and not hasattr(self.request, 'uploads_recusados'):
+            self.request.uploads_recusados = {}
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        # O tamanho informado pelo cliente não é confiável, mas permite
+        # recusar de imediato quando já declara passar do limite
+        if self.content_length and self.content_length > tamanho_maximo():
+            self.recusar(self.content_length)
+
+    def receive_data_chunk(self, raw_data, start):
+        recebido = start + len(raw_data)
+        if recebido > tamanho_maximo():
+            self.recusar(recebido)
+        return raw_data
+
+    def file_complete(self, file_size):
+        # Os handlers seguintes montam o arquivo
+        return None
+
+    def recusar(self, tamanho):
+        if self.request is not None:
+            self.request.uploads_recusados[self.field_name] = tamanho
+        raise SkipFile
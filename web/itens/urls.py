@@ -3,11 +3,13 @@ URLs do app Itens - Sistema de Achados & Perdidos UFT Palmas
 """
 
 from django.urls import path
+from itens.api import listar_itens as itens_api
 from itens.views import (
     # Views principais para achados e perdidos
     ListarItens, DetalheItem, CriarItem, EditarItem, DeletarItem,
     adicionar_comentario, marcar_como_resolvido, meus_itens,
-    itens_recentes_api, contato_direto, contatos_recebidos
+    itens_recentes_api, contato_direto, contatos_recebidos, eventos,
+    buscas_salvas, salvar_busca, alternar_alerta_busca, excluir_busca
 )
 
 app_name = 'itens'
@@ -29,6 +31,17 @@ urlpatterns = [
     path('meus-itens/', meus_itens, name='meus-itens'),
     path('contatos-recebidos/', contatos_recebidos, name='contatos-recebidos'),
     
+    # Buscas salvas (com alerta por e-mail dos itens novos)
+    path('buscas-salvas/', buscas_salvas, name='buscas-salvas'),
+    path('buscas-salvas/nova/', salvar_busca, name='salvar-busca'),
+    path('buscas-salvas/<int:busca_id>/alerta/', alternar_alerta_busca, name='alternar-alerta-busca'),
+    path('buscas-salvas/<int:busca_id>/excluir/', excluir_busca, name='excluir-busca'),
+    
     # API endpoints
     path('api/recentes/', itens_recentes_api, name='itens-recentes-api'),
+    # Mesma view (e mesma representação) de /api/v1/itens/, mantida no endereço antigo
+    path('api/itens/', itens_api, name='itens-api'),
+    
+    # Eventos em tempo real (server-sent events, servidos sob ASGI)
+    path('eventos/', eventos, name='eventos'),
 ]
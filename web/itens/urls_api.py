@@ -0,0 +1,15 @@
+"""
+URLs da API JSON (versão 1) do app Itens
+"""
+
+from django.urls import path
+from itens.api import listar_itens, detalhe_item, comentarios_item, alteracoes_itens
+
+app_name = 'api-v1'
+
+urlpatterns = [
+    path('itens/', listar_itens, name='listar-itens'),
+    path('itens/<int:pk>/', detalhe_item, name='detalhe-item'),
+    path('itens/<int:pk>/comentarios/', comentarios_item, name='comentarios-item'),
+    path('itens/alteracoes/', alteracoes_itens, name='alteracoes-itens'),
+]
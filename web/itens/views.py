@@ -9,85 +9,152 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.db.models import Q, Count
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, Http404
 from django.utils import timezone
 from django.core.paginator import Paginator
 from django.conf import settings
+from urllib.parse import urlencode
 
-from itens.models import Item, Comentario, ContatoItem
+from itens.models import Item, Comentario, ContatoItem, ItemArquivado, BuscaSalva
+from itens import alertas, contadores, correspondencias, notificacoes, similares, visualizacoes
+from itens import cache_filtros
+from itens.cache_paginas import PaginaEmCache
+from itens.busca import obter_backend as obter_backend_busca
+from itens.paginacao import PaginadorCursor, CursorInvalido
 from itens.forms import (
     FormularioItem, FormularioComentario, 
-    FormularioFiltro, FormularioContato
+    FormularioFiltro, FormularioContato, FormularioBuscaSalva
 )
 from achados_perdidos_uft.bibliotecas import LoginObrigatorio
 
-class ListarItens(ListView):
+def filtrar_itens(parametros):
+    """
+    Aplica à listagem pública os filtros recebidos na query string
+
+    Usado pela listagem HTML e pela API de itens.
+    """
+    queryset = Item.objects.filter(
+        status__in=['ativo', 'resolvido']
+    ).select_related('usuario')
+    
+    # Aplicar filtros de busca (índice textual, ver itens.busca)
+    busca = parametros.get('busca')
+    if busca:
+        queryset = obter_backend_busca().filtrar(queryset, busca)
+    
+    # Filtros específicos
+    tipo = parametros.get('tipo')
+    if tipo:
+        queryset = queryset.filter(tipo=tipo)
+    
+    categoria = parametros.get('categoria')
+    if categoria:
+        queryset = queryset.filter(categoria=categoria)
+    
+    bloco = parametros.get('bloco')
+    if bloco:
+        queryset = queryset.filter(bloco=bloco)
+    
+    status = parametros.get('status')
+    if status:
+        queryset = queryset.filter(status=status)
+    
+    prioridade = parametros.get('prioridade')
+    if prioridade:
+        queryset = queryset.filter(prioridade=True)
+    
+    # Filtros de data
+    data_inicio = parametros.get('data_inicio')
+    if data_inicio:
+        queryset = queryset.filter(data_postagem__date__gte=data_inicio)
+    
+    data_fim = parametros.get('data_fim')
+    if data_fim:
+        queryset = queryset.filter(data_postagem__date__lte=data_fim)
+    
+    return queryset
+
+
+def ordenacao_listagem(parametros):
+    """Campos de ordenação da listagem (com busca e sem ordenação explícita, por relevância)"""
+    ordenacao = parametros.get('ordenacao')
+    if ordenacao in ['-data_postagem', 'data_postagem', 'titulo', '-visualizacoes']:
+        return (ordenacao,)
+    if parametros.get('busca'):
+        return ('-relevancia', '-data_postagem')
+    return ('-data_postagem',)
+
+
+def contexto_cursor(parametros, queryset, por_pagina):
+    """Contexto da listagem paginada por cursor (ver itens.paginacao)"""
+    paginador = PaginadorCursor(queryset, por_pagina, contar=bool(parametros.get('total')))
+    try:
+        pagina = paginador.pagina(parametros.get('cursor'))
+    except CursorInvalido:
+        raise Http404('Página inválida.')
+    parametros = parametros.copy()
+    parametros.pop('cursor', None)
+    return {
+        'itens': pagina,
+        'object_list': pagina,
+        'pagina_cursor': pagina,
+        'query_params_cursor': parametros.urlencode(),
+    }
+
+
+class ListarItens(PaginaEmCache, ListView):
     """
     View principal para listar itens perdidos/encontrados com filtros avançados
+    
+    Com ``modo=cursor`` a paginação é por cursor (ver itens.paginacao), sempre
+    do mais recente para o mais antigo e sem contagem total, a menos que
+    ``total=1`` seja informado.
+    
+    As primeiras ``CACHE_PAGINAS_LISTAGEM`` páginas sem filtros são servidas do
+    cache para visitantes anônimos (ver itens.cache_paginas).
     """
     model = Item
     context_object_name = 'itens'
     template_name = 'itens/listar_itens.html'
     paginate_by = 12
     
+    # Parâmetros que não filtram a listagem
+    PARAMETROS_SEM_FILTRO = {'page', 'ordenacao', 'modo'}
+    
+    def modo_cursor(self):
+        return self.request.GET.get('modo') == 'cursor'
+    
+    def pagina_cacheavel(self):
+        parametros = {chave for chave, valor in self.request.GET.items() if valor}
+        if not parametros <= self.PARAMETROS_SEM_FILTRO:
+            return False
+        pagina = self.request.GET.get('page') or '1'
+        return pagina.isdigit() and int(pagina) <= getattr(settings, 'CACHE_PAGINAS_LISTAGEM', 3)
+    
     def get_queryset(self):
-        queryset = Item.objects.filter(
-            status__in=['ativo', 'resolvido']
-        ).select_related('usuario').prefetch_related('comentarios')
-        
-        # Aplicar filtros de busca
-        busca = self.request.GET.get('busca')
-        if busca:
-            queryset = queryset.filter(
-                Q(titulo__icontains=busca) | 
-                Q(descricao__icontains=busca) |
-                Q(local_especifico__icontains=busca)
-            )
-        
-        # Filtros específicos
-        tipo = self.request.GET.get('tipo')
-        if tipo:
-            queryset = queryset.filter(tipo=tipo)
-        
-        categoria = self.request.GET.get('categoria')
-        if categoria:
-            queryset = queryset.filter(categoria=categoria)
-        
-        bloco = self.request.GET.get('bloco')
-        if bloco:
-            queryset = queryset.filter(bloco=bloco)
-        
-        status = self.request.GET.get('status')
-        if status:
-            queryset = queryset.filter(status=status)
-        
-        prioridade = self.request.GET.get('prioridade')
-        if prioridade:
-            queryset = queryset.filter(prioridade=True)
-        
-        # Filtros de data
-        data_inicio = self.request.GET.get('data_inicio')
-        if data_inicio:
-            queryset = queryset.filter(data_postagem__date__gte=data_inicio)
-        
-        data_fim = self.request.GET.get('data_fim')
-        if data_fim:
-            queryset = queryset.filter(data_postagem__date__lte=data_fim)
-        
-        # Ordenação
-        ordenacao = self.request.GET.get('ordenacao', '-data_postagem')
-        if ordenacao in ['-data_postagem', 'data_postagem', 'titulo', '-visualizacoes']:
-            queryset = queryset.order_by(ordenacao)
+        ordenacao = ordenacao_listagem(self.request.GET)
+        queryset = filtrar_itens(self.request.GET).order_by(*ordenacao)
         
+        # Paginação numerada: ids da combinação de filtros em cache (ver itens.cache_filtros)
+        chave = None if self.modo_cursor() else cache_filtros.chave(self.request.GET, ordenacao)
+        if chave is not None:
+            return cache_filtros.ListaIds(queryset, chave)
         return queryset
     
+    def get_paginate_by(self, queryset):
+        # No modo cursor a página é montada em get_context_data
+        if self.modo_cursor():
+            return None
+        return super().get_paginate_by(queryset)
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Estatísticas para exibir no topo
-        context['total_perdidos'] = Item.objects.filter(tipo='perdido', status='ativo').count()
-        context['total_encontrados'] = Item.objects.filter(tipo='encontrado', status='ativo').count()
-        context['total_resolvidos'] = Item.objects.filter(status='resolvido').count()
+        if self.modo_cursor():
+            context.update(contexto_cursor(self.request.GET, self.object_list, self.paginate_by))
+        
+        # Estatísticas para exibir no topo (contadores em cache)
+        context.update(contadores.totais())
         
         # Formulário de filtros
         context['form_filtro'] = FormularioFiltro(self.request.GET)
@@ -97,29 +164,52 @@ class ListarItens(ListView):
         
         return context
 
-class DetalheItem(DetailView):
+class DetalheItem(PaginaEmCache, DetailView):
     """
     View para exibir detalhes de um item específico
+    
+    O item é buscado uma única vez (com usuario e resolvido_por via
+    select_related) e o restante do contexto usa um número fixo de consultas.
+    Visitantes anônimos recebem a página do cache (ver itens.cache_paginas).
     """
     model = Item
     context_object_name = 'item'
     template_name = 'itens/detalhe_item.html'
     
+    def itens_da_pagina(self):
+        return [self.kwargs['pk']]
+    
+    def ao_servir_do_cache(self):
+        # A visualização conta mesmo sem renderizar a página
+        visualizacoes.registrar(self.kwargs['pk'])
+    
+    def get_queryset(self):
+        return Item.objects.select_related('usuario', 'resolvido_por')
+    
+    def get(self, request, *args, **kwargs):
+        try:
+            return super().get(request, *args, **kwargs)
+        except Http404:
+            # Item arquivado: o link permanente continua funcionando
+            return detalhe_arquivado(request, kwargs['pk'])
+    
     def get_object(self, queryset=None):
         obj = super().get_object(queryset)
-        # Incrementar visualizações
-        obj.incrementar_visualizacoes()
+        # Registrar visualização (acumulada no cache, gravada em lote)
+        visualizacoes.registrar(obj.pk)
         return obj
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        item = self.get_object()
+        item = self.object
         
         # Formulários para interação
         context['form_comentario'] = FormularioComentario()
         
         # Comentários do item
-        context['comentarios'] = item.comentarios.select_related('usuario').order_by('data_comentario')
+        context['comentarios'] = list(
+            item.comentarios.select_related('usuario').order_by('data_comentario')
+        )
         
         # Verificar se o usuário atual já fez contato
         if self.request.user.is_authenticated:
@@ -133,14 +223,25 @@ class DetalheItem(DetailView):
                 context['contato_existente'].visualizado = True
                 context['contato_existente'].save()
         
-        # Itens similares
-        context['itens_similares'] = Item.objects.filter(
-            categoria=item.categoria,
-            status='ativo'
-        ).exclude(pk=item.pk)[:4]
+        # Possíveis correspondências (perdido <-> encontrado)
+        context['sugestoes'] = correspondencias.sugestoes(item)
+        
+        # Itens similares (vizinhos pré-calculados no índice TF-IDF)
+        context['itens_similares'] = similares.similares(item)
         
         return context
 
+def detalhe_arquivado(request, pk):
+    """
+    Página (somente leitura) de um item arquivado, com seus comentários
+    """
+    item = get_object_or_404(ItemArquivado.objects.select_related('usuario', 'resolvido_por'), pk=pk)
+    context = {
+        'item': item,
+        'comentarios': list(item.comentarios.select_related('usuario')),
+    }
+    return render(request, 'itens/detalhe_arquivado.html', context)
+
 class CriarItem(LoginRequiredMixin, CreateView):
     """
     View para criar novo item perdido/encontrado
@@ -150,6 +251,12 @@ class CriarItem(LoginRequiredMixin, CreateView):
     template_name = 'itens/novo_item.html'
     success_url = reverse_lazy('itens:listar-itens')
     
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        # Fotos descartadas por tamanho durante o upload (ver itens.uploads)
+        kwargs['uploads_recusados'] = getattr(self.request, 'uploads_recusados', {})
+        return kwargs
+    
     def form_valid(self, form):
         form.instance.usuario = self.request.user
         messages.success(
@@ -177,6 +284,12 @@ class EditarItem(LoginRequiredMixin, UpdateView):
             return Item.objects.all()
         return Item.objects.filter(usuario=self.request.user)
     
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        # Fotos descartadas por tamanho durante o upload (ver itens.uploads)
+        kwargs['uploads_recusados'] = getattr(self.request, 'uploads_recusados', {})
+        return kwargs
+    
     def form_valid(self, form):
         messages.success(
             self.request, 
@@ -247,46 +360,80 @@ def marcar_como_resolvido(request, item_id):
 @login_required
 def meus_itens(request):
     """
-    View para listar itens do usuário logado
+    View para listar itens do usuário logado (``?aba=arquivados``: itens arquivados)
     """
-    itens = Item.objects.filter(usuario=request.user).order_by('-data_postagem')
+    itens = Item.objects.filter(usuario=request.user)
+    aba = 'arquivados' if request.GET.get('aba') == 'arquivados' else 'itens'
     
-    # Paginação
-    paginator = Paginator(itens, 10)
+    # Paginação (contagens de comentários/contatos anotadas na própria consulta)
+    if aba == 'arquivados':
+        consulta = ItemArquivado.objects.filter(usuario=request.user).order_by('-data_arquivamento')
+    else:
+        consulta = Item.objects.com_contagens().filter(usuario=request.user).order_by('-data_postagem')
+    paginator = Paginator(consulta, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
+    # Possíveis correspondências dos itens da página, em uma única consulta
+    if aba == 'itens':
+        page_obj.object_list = list(page_obj.object_list)
+        sugestoes = correspondencias.sugestoes_de(page_obj.object_list)
+        for item in page_obj.object_list:
+            item.sugestoes = sugestoes.get(item.pk, [])
+    
+    # Totais do resumo em uma única agregação condicional
+    totais = itens.aggregate(
+        total_itens=Count('id'),
+        total_ativos=Count('id', filter=Q(status='ativo')),
+        total_resolvidos=Count('id', filter=Q(status='resolvido')),
+    )
+    
     context = {
         'itens': page_obj,
-        'total_itens': itens.count(),
-        'total_ativos': itens.filter(status='ativo').count(),
-        'total_resolvidos': itens.filter(status='resolvido').count(),
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+        'aba': aba,
+        'total_arquivados': ItemArquivado.objects.filter(usuario=request.user).count(),
+        **totais,
     }
     
     return render(request, 'itens/meus_itens.html', context)
 
 
+def dados_item(item):
+    """Representação de um item nas respostas JSON"""
+    return {
+        'id': item.id,
+        'titulo': item.titulo,
+        'tipo': item.get_tipo_display(),
+        'categoria': item.get_categoria_display(),
+        'bloco': item.get_bloco_display(),
+        'data_postagem': item.data_postagem.strftime('%d/%m/%Y %H:%M'),
+        'url': reverse('itens:detalhe-item', kwargs={'pk': item.pk})
+    }
+
+
 def itens_recentes_api(request):
     """
     API para retornar itens recentes (JSON)
     """
     itens = Item.objects.filter(status='ativo').order_by('-data_postagem')[:10]
     
-    data = []
-    for item in itens:
-        data.append({
-            'id': item.id,
-            'titulo': item.titulo,
-            'tipo': item.get_tipo_display(),
-            'categoria': item.get_categoria_display(),
-            'bloco': item.get_bloco_display(),
-            'data_postagem': item.data_postagem.strftime('%d/%m/%Y %H:%M'),
-            'url': reverse('itens:detalhe-item', kwargs={'pk': item.pk})
-        })
+    data = [dados_item(item) for item in itens]
     
     return JsonResponse({'itens': data})
 
 
+def eventos(request):
+    """
+    Stream de eventos (itens.eventos): só é servido sob ASGI
+
+    Sob WSGI cada conexão prenderia uma thread do worker; o 204 faz o
+    EventSource parar de reconectar e as páginas funcionam como antes.
+    """
+    return HttpResponse(status=204)
+
+
 @login_required
 def contatos_recebidos(request):
     """
@@ -304,6 +451,7 @@ def contatos_recebidos(request):
     contatos_nao_visualizados = contatos.filter(visualizado=False)
     if contatos_nao_visualizados.exists():
         contatos_nao_visualizados.update(visualizado=True)
+        notificacoes.recalcular(request.user.pk)
     
     # Paginação
     paginator = Paginator(contatos, 10)
@@ -365,4 +513,73 @@ def contato_direto(request, item_id):
     return render(request, 'itens/contato_direto.html', context)
 
 
+@login_required
+def buscas_salvas(request):
+    """
+    View para listar as buscas salvas do usuário (com alerta de itens novos por e-mail)
+    """
+    context = {
+        'buscas': request.user.buscas_salvas.all(),
+        'maximo_buscas': alertas.maximo_por_usuario(),
+    }
+    return render(request, 'itens/buscas_salvas.html', context)
+
+
+@login_required
+def salvar_busca(request):
+    """
+    View para salvar a busca atual da listagem
+    """
+    if request.method != 'POST':
+        return redirect('itens:buscas-salvas')
+    
+    form = FormularioBuscaSalva(request.POST)
+    if request.user.buscas_salvas.count() >= alertas.maximo_por_usuario():
+        messages.error(request, 'Você atingiu o limite de buscas salvas. Exclua alguma para salvar outra.')
+    elif form.is_valid():
+        busca = form.save(commit=False)
+        busca.usuario = request.user
+        busca.save()
+        messages.success(
+            request,
+            f'Busca "{busca.nome}" salva! Você receberá um e-mail quando surgirem itens novos.'
+        )
+        return redirect('itens:buscas-salvas')
+    else:
+        for erro in form.errors.get('__all__', []) + form.errors.get('nome', []):
+            messages.error(request, erro)
+    
+    # Volta para a listagem com os mesmos filtros
+    campos = ['busca', 'tipo', 'categoria', 'bloco', 'prioridade']
+    parametros = {campo: request.POST[campo] for campo in campos if request.POST.get(campo)}
+    url = reverse('itens:listar-itens')
+    return redirect(f'{url}?{urlencode(parametros)}' if parametros else url)
+
+
+@login_required
+def alternar_alerta_busca(request, busca_id):
+    """
+    View para ligar ou desligar o alerta por e-mail de uma busca salva
+    """
+    busca = get_object_or_404(BuscaSalva, pk=busca_id, usuario=request.user)
+    if request.method == 'POST':
+        busca.alerta = not busca.alerta
+        busca.save(update_fields=['alerta'])
+        estado = 'ligado' if busca.alerta else 'desligado'
+        messages.success(request, f'Alerta da busca "{busca.nome}" {estado}.')
+    return redirect('itens:buscas-salvas')
+
+
+@login_required
+def excluir_busca(request, busca_id):
+    """
+    View para excluir uma busca salva
+    """
+    busca = get_object_or_404(BuscaSalva, pk=busca_id, usuario=request.user)
+    if request.method == 'POST':
+        busca.delete()
+        messages.success(request, f'Busca "{busca.nome}" excluída.')
+    return redirect('itens:buscas-salvas')
+
+
 # Fim do arquivo
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Views assíncronas das páginas de leitura (servidas sob ASGI)
+
+Sob ASGI as requisições são resolvidas por achados_perdidos_uft.urls_asgi
+(ver achados_perdidos_uft.rotas_asgi), que troca a listagem, o detalhe, a
+página inicial e a API de itens recentes pelas versões daqui. Elas usam o ORM
+assíncrono (``acount``, ``aget``, iteração com ``async for``) e disparam juntas,
+com ``asyncio.gather``, as consultas que não dependem umas das outras.
+
+O contexto e os templates são os mesmos das views síncronas. As respostas são
+``TemplateResponse``: a renderização (que pode consultar o banco, ex.: tags de
+imagem e context processors) é feita pelo handler fora do loop de eventos.
+
+As partes sem versão assíncrona (paginação por cursor, sugestões, similares,
+visualizações e o item arquivado) rodam com ``sync_to_async``. No SQLite todas
+as consultas do ORM assíncrono passam pela mesma thread do banco, então o
+``gather`` sobrepõe as esperas de cache e de E/S, não as consultas em si.
+
+Também fica aqui o stream de eventos (``eventos_assincrona``, ver itens.eventos),
+que sob WSGI prenderia uma thread por conexão.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.views.generic import View
+
+from itens import cache_filtros, contadores, correspondencias, eventos, similares, visualizacoes
+from itens.cache_paginas import PaginaEmCache
+from itens.forms import FormularioComentario, FormularioFiltro
+from itens.models import ContatoItem, Item
+from itens.views import (
+    ListarItens, DetalheItem, contexto_cursor, dados_item, detalhe_arquivado,
+    filtrar_itens, ordenacao_listagem,
+)
+
+
+async def listar(queryset):
+    """Avalia o queryset com o ORM assíncrono"""
+    return [objeto async for objeto in queryset]
+
+
+async def paginar(parametros, queryset, ordenacao, por_pagina):
+    """
+    Página numerada da listagem (``page``), como a do ListView
+
+    O total e os ids vêm do cache de filtros quando a ordenação permite (ver
+    itens.cache_filtros); senão, da contagem e da fatia do queryset.
+    """
+    chave = await cache_filtros.achave(parametros, ordenacao)
+    if chave is not None:
+        lista = cache_filtros.ListaIds(queryset, chave)
+        total, _ = await lista.adados()
+        buscar = lista.afatia
+    else:
+        total = await queryset.acount()
+
+        async def buscar(inicio, fim):
+            return await listar(queryset[inicio:fim])
+
+    paginador = Paginator(range(total), por_pagina)
+    numero = parametros.get('page') or 1
+    if numero == 'last':
+        numero = paginador.num_pages
+    try:
+        pagina = paginador.page(int(numero))
+    except (ValueError, InvalidPage):
+        raise Http404('Página inválida.')
+    inicio = (pagina.number - 1) * por_pagina
+    pagina.object_list = await buscar(inicio, inicio + por_pagina)
+    return pagina
+
+
+class ListarItensAssincrona(PaginaEmCache, View):
+    """
+    Versão assíncrona de ListarItens (mesmos filtros, paginação e cache)
+    """
+    template_name = ListarItens.template_name
+    paginate_by = ListarItens.paginate_by
+    PARAMETROS_SEM_FILTRO = ListarItens.PARAMETROS_SEM_FILTRO
+    pagina_cacheavel = ListarItens.pagina_cacheavel
+
+    async def get(self, request):
+        parametros = request.GET
+        ordenacao = ordenacao_listagem(parametros)
+        queryset = filtrar_itens(parametros).order_by(*ordenacao)
+
+        if parametros.get('modo') == 'cursor':
+            totais, context = await asyncio.gather(
+                contadores.atotais(),
+                sync_to_async(contexto_cursor)(parametros, queryset, self.paginate_by),
+            )
+        else:
+            totais, pagina = await asyncio.gather(
+                contadores.atotais(),
+                paginar(parametros, queryset, ordenacao, self.paginate_by),
+            )
+            context = {
+                'itens': pagina.object_list,
+                'object_list': pagina.object_list,
+                'page_obj': pagina,
+                'paginator': pagina.paginator,
+                'is_paginated': pagina.has_other_pages(),
+            }
+
+        context.update(totais)
+        context['view'] = self
+        context['form_filtro'] = FormularioFiltro(parametros)
+        context['query_params'] = parametros.urlencode()
+        return TemplateResponse(request, self.template_name, context)
+
+
+async def contato_existente(item, usuario):
+    """Contato já feito pelo usuário no item, marcado como visualizado"""
+    if not usuario.is_authenticated:
+        return None
+    contato = await ContatoItem.objects.filter(item=item, usuario_interessado=usuario).afirst()
+    if contato and not contato.visualizado:
+        contato.visualizado = True
+        await contato.asave()
+    return contato
+
+
+class DetalheItemAssincrona(PaginaEmCache, View):
+    """
+    Versão assíncrona de DetalheItem
+
+    Depois de buscar o item, comentários, contato, sugestões e similares são
+    consultados juntos.
+    """
+    template_name = DetalheItem.template_name
+    itens_da_pagina = DetalheItem.itens_da_pagina
+    ao_servir_do_cache = DetalheItem.ao_servir_do_cache
+
+    async def get(self, request, pk):
+        try:
+            item = await Item.objects.select_related('usuario', 'resolvido_por').aget(pk=pk)
+        except Item.DoesNotExist:
+            # Item arquivado: o link permanente continua funcionando
+            return await sync_to_async(detalhe_arquivado)(request, pk)
+
+        usuario = await request.auser()
+        comentarios, contato, sugestoes, itens_similares, _ = await asyncio.gather(
+            listar(item.comentarios.select_related('usuario').order_by('data_comentario')),
+            contato_existente(item, usuario),
+            sync_to_async(correspondencias.sugestoes)(item),
+            sync_to_async(similares.similares)(item),
+            # Visualização acumulada no cache, gravada em lote
+            sync_to_async(visualizacoes.registrar)(item.pk),
+        )
+
+        context = {
+            'object': item,
+            'item': item,
+            'view': self,
+            'form_comentario': FormularioComentario(),
+            'comentarios': comentarios,
+            'sugestoes': sugestoes,
+            'itens_similares': itens_similares,
+        }
+        if usuario.is_authenticated:
+            context['contato_existente'] = contato
+        return TemplateResponse(request, self.template_name, context)
+
+
+async def itens_recentes_api_assincrona(request):
+    """
+    Versão assíncrona de itens_recentes_api
+    """
+    itens = await listar(Item.objects.filter(status='ativo').order_by('-data_postagem')[:10])
+    return JsonResponse({'itens': [dados_item(item) for item in itens]})
+
+
+async def eventos_assincrona(request):
+    """
+    Stream de eventos (server-sent events, ver itens.eventos)
+
+    ``canais`` escolhe os eventos (``itens``, ``contatos`` ou os dois,
+    separados por vírgula); os de contato exigem login. Os eventos de item
+    podem ser filtrados por ``categoria``, ``bloco`` e ``tipo``.
+    """
+    usuario = await request.auser()
+    pedidos = set((request.GET.get('canais') or 'itens,contatos').split(','))
+    canais = []
+    if 'itens' in pedidos:
+        canais.append(eventos.CANAL_ITENS)
+    if 'contatos' in pedidos and usuario.is_authenticated:
+        canais.append(eventos.canal_usuario(usuario.pk))
+    if not canais:
+        return HttpResponse(status=204)
+
+    filtros = {campo: request.GET[campo] for campo in eventos.FILTROS if request.GET.get(campo)}
+    response = StreamingHttpResponse(eventos.transmitir(canais, filtros), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Sem buffer no nginx: cada evento sai assim que é gerado
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,136 @@
+"""
+Contador de visualizações com escrita adiada (write-behind)
+
+Cada visualização incrementa de forma atômica um contador no cache, sem tocar
+no banco. Periodicamente (``VISUALIZACOES_INTERVALO_DESCARGA`` segundos) os
+contadores acumulados são gravados em um único ``UPDATE`` com ``CASE``.
+
+Para saber quais itens têm visualizações pendentes, o primeiro registro de
+cada item desde a última descarga ocupa uma posição numerada no cache
+(``posicao:<n>``); a descarga percorre as posições novas desde a anterior.
+O marcador de pendência expira sozinho, então um item cuja posição se perca
+(ex.: despejo do cache) volta a ser registrado na próxima visualização.
+
+A descarga só marca as posições como descarregadas e desconta as contagens
+depois que o ``UPDATE`` é gravado: uma falha no meio dela deixa tudo para a
+próxima, sem perder visualizações.
+
+Com o cache padrão (LocMemCache) cada processo tem seu próprio acumulador e
+descarrega as próprias visualizações (``descarregar_se_necessario``); o
+comando ``descarregar_visualizacoes``, que roda em outro processo, exige um
+cache compartilhado (arquivo ou Redis, ver achados_perdidos_uft.caches).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, Value, When
+
+from itens.models import Item
+
+PREFIXO = 'itens:visualizacoes'
+CHAVE_SEQUENCIA = f'{PREFIXO}:sequencia'
+CHAVE_DESCARREGADO = f'{PREFIXO}:descarregado'
+CHAVE_INTERVALO = f'{PREFIXO}:intervalo'
+CHAVE_EXECUCAO = f'{PREFIXO}:execucao'
+
+
+def chave_contagem(item_id):
+    return f'{PREFIXO}:contagem:{item_id}'
+
+
+def chave_pendente(item_id):
+    return f'{PREFIXO}:pendente:{item_id}'
+
+
+def chave_posicao(posicao):
+    return f'{PREFIXO}:posicao:{posicao}'
+
+
+def intervalo_descarga():
+    """Intervalo mínimo, em segundos, entre descargas automáticas"""
+    return getattr(settings, 'VISUALIZACOES_INTERVALO_DESCARGA', 60)
+
+
+def incrementar(chave, delta=1):
+    """Incremento atômico que cria a chave quando ela não existe"""
+    try:
+        return cache.incr(chave, delta)
+    except ValueError:
+        if cache.add(chave, delta, None):
+            return delta
+        return cache.incr(chave, delta)
+
+
+def marcar_pendente(item_id):
+    """Garante que o item será visitado pela próxima descarga"""
+    validade = max(intervalo_descarga() * 10, 600)
+    if cache.add(chave_pendente(item_id), 1, validade):
+        posicao = incrementar(CHAVE_SEQUENCIA)
+        cache.set(chave_posicao(posicao), item_id, None)
+
+
+def registrar(item_id, quantidade=1):
+    """Registra visualizações do item sem escrever no banco"""
+    incrementar(chave_contagem(item_id), quantidade)
+    marcar_pendente(item_id)
+    descarregar_se_necessario()
+
+
+def pendentes(item_id):
+    """Número de visualizações do item ainda não gravadas no banco"""
+    return cache.get(chave_contagem(item_id)) or 0
+
+
+def descarregar_se_necessario():
+    """Descarrega as visualizações se o intervalo configurado já passou"""
+    if cache.add(CHAVE_INTERVALO, 1, intervalo_descarga()):
+        return descarregar()
+    return 0
+
+
+def descarregar():
+    """
+    Grava no banco todas as visualizações acumuladas
+
+    Retorna o número de itens atualizados.
+    """
+    if not cache.add(CHAVE_EXECUCAO, 1, 60):
+        return 0  # outra descarga em andamento
+    try:
+        ultima = cache.get(CHAVE_SEQUENCIA) or 0
+        inicio = (cache.get(CHAVE_DESCARREGADO) or 0) + 1
+        if ultima < inicio - 1:
+            inicio = 1  # a sequência foi reiniciada (cache limpo ou despejado)
+        if ultima < inicio:
+            return 0
+
+        chaves_posicao = [chave_posicao(n) for n in range(inicio, ultima + 1)]
+        item_ids = set(cache.get_many(chaves_posicao).values())
+        # Libera o marcador antes de ler a contagem: visualizações que
+        # chegarem a partir daqui ganham nova posição para a próxima descarga
+        # (posições repetidas de um item não contam duas vezes)
+        cache.delete_many([chave_pendente(item_id) for item_id in item_ids])
+
+        lidas = cache.get_many([chave_contagem(item_id) for item_id in item_ids])
+        contagens = {item_id: lidas.get(chave_contagem(item_id)) for item_id in item_ids}
+        contagens = {item_id: valor for item_id, valor in contagens.items() if valor}
+
+        # Se o UPDATE falhar, posições e contagens continuam no cache para a próxima descarga
+        if contagens:
+            Item.objects.filter(pk__in=contagens).update(
+                visualizacoes=F('visualizacoes') + Case(
+                    *[When(pk=item_id, then=Value(valor)) for item_id, valor in contagens.items()],
+                    default=Value(0)
+                )
+            )
+        for item_id, valor in contagens.items():
+            try:
+                # Decrementa apenas o que foi lido, preservando incrementos concorrentes
+                cache.decr(chave_contagem(item_id), valor)
+            except ValueError:
+                pass  # contagem despejada do cache: já está no banco
+        cache.set(CHAVE_DESCARREGADO, ultima, None)
+        cache.delete_many(chaves_posicao)
+        return len(contagens)
+    finally:
+        cache.delete(CHAVE_EXECUCAO)